@@ -21,6 +21,26 @@ PAPER_TRADING = {
 # Торговые пары
 TRADING_PAIRS = ['BTC/USDT', 'ETH/USDT', 'BNB/USDT']
 
+# Сбор исторических данных
+DATA_COLLECTION = {
+    'base_timeframe': '1m',      # Базовый ряд, из которого строятся старшие таймфреймы
+    'max_base_candles': 20000,   # Больше базовых свечей на запрос - грузим таймфрейм с биржи напрямую
+}
+
+# Кэш свечей в памяти (общий для всех стратегий и анализа)
+DATA_CACHE = {
+    'memory_budget_mb': 256,    # Бюджет памяти, при превышении вытесняются давние записи
+}
+
+# Запись тикеров и стаканов для последующего анализа
+TICK_RECORDING = {
+    'enabled': False,                # Записывать ли каждый полученный тикер и стакан
+    'path': 'collected_data/ticks',  # Каталог хранилища
+    'book_depth': 5,                 # Сколько уровней стакана сохранять
+    'block_size': 1024,              # Записей в сжатом блоке
+    'max_block_age': 300,            # Секунд, сколько неполный блок пары может ждать записи
+}
+
 # Пороги для уведомлений
 ALERT_THRESHOLDS = {
     'btc_upper': 70000,
@@ -30,6 +50,62 @@ ALERT_THRESHOLDS = {
     'arbitrage_percent': 0.5,   # Минимальная разница для арбитража
 }
 
+# Ценовые оповещения
+PRICE_ALERTS = {
+    'change_window_sec': 3600,  # Окно для оповещений об изменении цены в %
+    'window_capacity': 4096,    # Максимум цен в окне на пару
+    'adaptive': True,           # Подстраивать интервал проверки пары под волатильность и расстояние до порога
+    'min_interval': 5,          # Границы адаптивного интервала, секунд
+    'max_interval': 600,
+    'z_score': 3.0,             # Запас: во сколько стандартных отклонений цена может сдвинуться до проверки
+}
+
+# Оценка портфеля
+VALUATION = {
+    'quote': 'USDT',            # Валюта оценки
+    'bridges': ['USDT', 'BTC', 'USDC', 'ETH', 'BNB', 'FDUSD'],  # Предпочтительные промежуточные валюты
+    'max_hops': 3,              # Максимум пар в цепочке конвертации
+    'markets_ttl': 3600,        # Секунд хранения графа конвертаций
+}
+
+# История портфеля
+PORTFOLIO_HISTORY = {
+    'capacity': 1440,           # Снимков на каждом уровне детализации
+    'resolutions': [0, 60, 3600, 86400],  # Шаг уровней, секунд (0 - каждый снимок)
+}
+
+# Уведомления
+NOTIFICATIONS = {
+    'channels': ['console'],    # Каналы по умолчанию: 'console', 'email', 'telegram'
+    'queue_size': 1000,         # Максимум неотправленных сообщений на канал
+    'digest_window': 2.0,       # Сообщения, пришедшие за это время, отправляются одной сводкой, секунд
+    'max_digest': 20,           # Максимум сообщений в сводке
+    'retries': 5,               # Повторы при ошибке отправки
+    'backoff': 1.0,             # Первая пауза перед повтором (удваивается), секунд
+    'max_backoff': 60,
+    'smtp_host': 'smtp.gmail.com',
+    'smtp_port': 587,
+}
+
+# Сканирование арбитража
+ARBITRAGE = {
+    'max_quote_skew_ms': 1000,  # Котировки, полученные с большим разрывом во времени, не сравниваются
+    'max_quote_age_ms': None,   # Отбрасывать котировку старше (время получения - время биржи), None - не проверять
+    'book_depth': 20,           # Уровней стакана для расчета исполнимого объема
+    'default_taker_fee': 0.001, # Комиссия тейкера, если биржа ее не сообщает (0.1%)
+    'withdrawal_fee_ttl': 3600, # Секунд хранения комиссий за вывод в кэше
+    'withdrawal_fees': {},      # Ручные комиссии за вывод в базовой валюте, например {'BTC': 0.0002}
+    'triangular_min_profit': 0.1,  # Минимальная прибыль цикла на одной бирже, %
+    'poll_interval': 1.0,       # Минимальный период опроса котировок биржи при мониторинге, секунд
+    'adaptive_polling': True,   # Реже опрашивать пары, спред которых далек от min_spread
+    'max_poll_interval': 30,    # Максимальный интервал опроса пары, секунд
+    'spread_z_score': 3.0,      # Запас по волатильности спреда
+    'tracker_capacity': 100000, # Сколько закрытых возможностей хранить в памяти
+    'tracker_path': None,       # Файл для сохранения возможностей, например 'collected_data/opportunities.bin'
+    'sim_latency_ms': 150,      # Симуляция: задержка ордера до биржи
+    'sim_replenish_ms': 1000,   # Симуляция: через сколько выбранная нами ликвидность восстанавливается
+}
+
 # API ключи (будут загружены из .env файла)
 API_KEYS = {
     'bybit': {
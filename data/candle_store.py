@@ -0,0 +1,189 @@
+# data/candle_store.py
+import json
+import os
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Union
+
+# Колонки свечей и их типы на диске
+OHLCV_COLUMNS = {
+    'timestamp': 'int64',   # Время открытия свечи в мс
+    'open': 'float64',
+    'high': 'float64',
+    'low': 'float64',
+    'close': 'float64',
+    'volume': 'float64',
+}
+
+TimeLike = Union[int, str, pd.Timestamp, None]
+
+
+def to_ms(value: TimeLike) -> Optional[int]:
+    """Переводит время (мс, строку или Timestamp) в миллисекунды"""
+    if value is None:
+        return None
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    return int(round(pd.Timestamp(value).timestamp() * 1000))
+
+
+class CandleView:
+    """
+    Срез свечей поверх memory-mapped колонок
+    Все массивы - представления файлов хранилища, данные не копируются
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        self.columns = columns
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.columns
+
+    def __len__(self) -> int:
+        return len(self.columns['timestamp'])
+
+    @property
+    def timestamp(self) -> np.ndarray:
+        return self.columns['timestamp']
+
+    @property
+    def index(self) -> pd.DatetimeIndex:
+        """Индекс времени (int64 мс интерпретируются как datetime64[ms] без копирования)"""
+        return pd.DatetimeIndex(self.columns['timestamp'].view('datetime64[ms]'), name='timestamp')
+
+    def series(self, name: str) -> pd.Series:
+        """Колонка как pandas Series, разделяющая память с файлом"""
+        return pd.Series(self.columns[name], index=self.index, name=name, copy=False)
+
+    def slice(self, start: TimeLike = None, end: TimeLike = None) -> 'CandleView':
+        """Срез по времени [start, end] - тоже представление"""
+        ts = self.columns['timestamp']
+        lo = 0 if start is None else int(np.searchsorted(ts, to_ms(start), side='left'))
+        hi = len(ts) if end is None else int(np.searchsorted(ts, to_ms(end), side='right'))
+        return CandleView({name: values[lo:hi] for name, values in self.columns.items()})
+
+    def to_frame(self) -> pd.DataFrame:
+        """Копия среза в обычный DataFrame (для изменяемой работы)"""
+        return pd.DataFrame({name: np.array(values) for name, values in self.columns.items() if name != 'timestamp'},
+                            index=self.index.copy())
+
+
+class CandleStore:
+    """
+    Колоночное хранилище свечей
+    Каждая колонка - отдельный бинарный файл фиксированного типа, поэтому чтение
+    идет через memory map: процессы разделяют одни и те же страницы через кэш ОС,
+    а в память попадают только реально прочитанные участки
+    """
+
+    def __init__(self, root: str = 'collected_data/store'):
+        self.root = root
+
+    def _dir(self, exchange_id: str, symbol: str, timeframe: str) -> str:
+        return os.path.join(self.root, exchange_id, symbol.replace('/', '_').replace(':', '_'), timeframe)
+
+    def _columns(self, path: str) -> Dict[str, str]:
+        meta_file = os.path.join(path, 'meta.json')
+        if not os.path.exists(meta_file):
+            return dict(OHLCV_COLUMNS)
+        with open(meta_file, 'r') as f:
+            return json.load(f)['columns']
+
+    def length(self, exchange_id: str, symbol: str, timeframe: str) -> int:
+        """Количество сохраненных свечей"""
+        ts_file = os.path.join(self._dir(exchange_id, symbol, timeframe), 'timestamp.bin')
+        if not os.path.exists(ts_file):
+            return 0
+        return os.path.getsize(ts_file) // np.dtype('int64').itemsize
+
+    def updated_at(self, exchange_id: str, symbol: str, timeframe: str) -> Optional[float]:
+        """Время последней записи (unix-время) или None"""
+        ts_file = os.path.join(self._dir(exchange_id, symbol, timeframe), 'timestamp.bin')
+        return os.path.getmtime(ts_file) if os.path.exists(ts_file) else None
+
+    def last_timestamp(self, exchange_id: str, symbol: str, timeframe: str) -> Optional[int]:
+        """Время последней сохраненной свечи в мс (читается один элемент)"""
+        view = self.read(exchange_id, symbol, timeframe)
+        return int(view.timestamp[-1]) if view is not None else None
+
+    def read(self, exchange_id: str, symbol: str, timeframe: str, start: TimeLike = None,
+             end: TimeLike = None, columns: List[str] = None) -> Optional[CandleView]:
+        """
+        Возвращает срез свечей без копирования (memory map)
+        start, end: границы по времени включительно (мс, строка или Timestamp)
+        """
+        n = self.length(exchange_id, symbol, timeframe)
+        if n == 0:
+            return None
+
+        path = self._dir(exchange_id, symbol, timeframe)
+        dtypes = self._columns(path)
+        names = ['timestamp'] + [c for c in (columns or dtypes) if c != 'timestamp']
+
+        # Длина берется по колонке времени: она пишется последней
+        mapped = {name: np.memmap(os.path.join(path, f'{name}.bin'), dtype=dtypes[name], mode='r')[:n]
+                  for name in names}
+        return CandleView(mapped).slice(start, end)
+
+    def read_frame(self, exchange_id: str, symbol: str, timeframe: str, limit: int = None) -> Optional[pd.DataFrame]:
+        """Последние limit свечей в виде обычного (изменяемого) DataFrame"""
+        view = self.read(exchange_id, symbol, timeframe)
+        if view is None:
+            return None
+        if limit is not None:
+            view = CandleView({name: values[-limit:] for name, values in view.columns.items()})
+        return view.to_frame()
+
+    def write(self, exchange_id: str, symbol: str, timeframe: str, df: pd.DataFrame):
+        """
+        Записывает свечи с объединением по времени
+        Новые данные побеждают сохраненные (последняя свеча могла быть незакрытой).
+        Переписывается только хвост файлов начиная с первой новой свечи, поэтому
+        дописывание в конец стоит O(новых свечей); файлы никогда не укорачиваются
+        """
+        if df is None or df.empty:
+            return
+
+        path = self._dir(exchange_id, symbol, timeframe)
+        os.makedirs(path, exist_ok=True)
+
+        meta_file = os.path.join(path, 'meta.json')
+        if not os.path.exists(meta_file):
+            dtypes = {'timestamp': 'int64'}
+            dtypes.update({c: 'float64' for c in df.columns if c != 'timestamp'})
+            with open(meta_file, 'w') as f:
+                json.dump({'columns': dtypes}, f)
+        dtypes = self._columns(path)
+
+        new = df.sort_index()
+        new = new[~new.index.duplicated(keep='last')]
+        new_ts = new.index.as_unit('ms').asi8
+
+        existing = self.read(exchange_id, symbol, timeframe)
+        start = 0
+        if existing is not None:
+            start = int(np.searchsorted(existing.timestamp, new_ts[0], side='left'))
+            if start < len(existing):
+                # Пересечение с сохраненным хвостом - сливаем его с новыми данными
+                tail = CandleView({name: values[start:] for name, values in existing.columns.items()}).to_frame()
+                new = pd.concat([tail, new])
+                new = new[~new.index.duplicated(keep='last')].sort_index()
+                new_ts = new.index.as_unit('ms').asi8
+            existing = None  # Освобождаем memory map перед записью
+
+        # Колонку времени пишем последней: читатели определяют длину по ней
+        for name in [c for c in dtypes if c != 'timestamp'] + ['timestamp']:
+            if name == 'timestamp':
+                values = new_ts.astype(dtypes[name])
+            elif name in new.columns:
+                values = new[name].to_numpy(dtype=dtypes[name], na_value=np.nan)
+            else:
+                values = np.full(len(new), np.nan, dtype=dtypes[name])
+
+            column_file = os.path.join(path, f'{name}.bin')
+            with open(column_file, 'r+b' if os.path.exists(column_file) else 'wb') as f:
+                f.seek(start * values.dtype.itemsize)
+                f.write(np.ascontiguousarray(values).tobytes())
@@ -0,0 +1,92 @@
+# data/collection_job.py
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+from colorama import Fore
+from data.collector import DataCollector
+
+
+class CollectionJob:
+    """
+    Параллельный сбор свечей по матрице биржи × пары × таймфреймы
+    У каждой биржи свой поток и свое подключение: запросы к бирже ограничены только
+    ее собственным лимитом, и медленная биржа не задерживает остальные.
+    Все свечи записываются в хранилище свечей
+    """
+
+    def __init__(self, exchanges: List[str], symbols: List[str], timeframes: List[str] = None,
+                 limit: int = 100, force_refresh: bool = False):
+        self.exchanges = exchanges
+        self.symbols = symbols
+        self.timeframes = timeframes or ['1h']
+        self.limit = limit
+        self.force_refresh = force_refresh
+        self.stats = {}
+        self.elapsed = 0
+
+    def run(self) -> Dict[str, Dict]:
+        """Запускает сбор и возвращает статистику по биржам"""
+        print(f"{Fore.CYAN}📥 Сбор: {len(self.exchanges)} бирж × {len(self.symbols)} пар × {len(self.timeframes)} таймфреймов")
+        started = time.time()
+
+        with ThreadPoolExecutor(max_workers=len(self.exchanges) or 1) as pool:
+            for exchange_id, stats in zip(self.exchanges, pool.map(self._collect_exchange, self.exchanges)):
+                self.stats[exchange_id] = stats
+
+        self.elapsed = time.time() - started
+        return self.stats
+
+    def _collect_exchange(self, exchange_id: str) -> Dict:
+        """Собирает все пары и таймфреймы одной биржи"""
+        stats = {'ok': 0, 'failed': 0, 'skipped': 0, 'candles': 0, 'requests': 0,
+                 'elapsed': 0, 'throughput': 0, 'errors': []}
+        started = time.time()
+
+        try:
+            collector = DataCollector(exchange_id)
+            markets = collector.exchange.exchange.load_markets()
+        except Exception as e:
+            stats['failed'] = len(self.symbols) * len(self.timeframes)
+            stats['errors'].append(f"подключение: {e}")
+            stats['elapsed'] = time.time() - started
+            return stats
+
+        for symbol in self.symbols:
+            if symbol not in markets:
+                stats['skipped'] += len(self.timeframes)
+                continue
+
+            for timeframe in self.timeframes:
+                try:
+                    df = collector.get_historical_data(symbol, limit=self.limit, force_refresh=self.force_refresh,
+                                                       timeframe=timeframe)
+                except Exception as e:
+                    df = None
+                    stats['errors'].append(f"{symbol} {timeframe}: {e}")
+
+                if df is None:
+                    stats['failed'] += 1
+                else:
+                    stats['ok'] += 1
+                    stats['candles'] += len(df)
+
+        stats['requests'] = collector.requests
+        stats['elapsed'] = time.time() - started
+        stats['throughput'] = stats['candles'] / stats['elapsed'] if stats['elapsed'] > 0 else 0
+        return stats
+
+    def print_report(self):
+        """Выводит отчет по биржам"""
+        print(f"\n{Fore.CYAN}{'='*70}")
+        print(f"📊 ОТЧЕТ О СБОРЕ ДАННЫХ ({self.elapsed:.1f} с)")
+        print(f"{'='*70}")
+
+        for exchange_id, stats in self.stats.items():
+            color = Fore.GREEN if stats['failed'] == 0 else Fore.YELLOW if stats['ok'] else Fore.RED
+            print(f"{color}{exchange_id}: успешно {stats['ok']}, ошибок {stats['failed']}, пропущено {stats['skipped']}")
+            print(f"   Свечей: {stats['candles']}, запросов: {stats['requests']}, "
+                  f"время: {stats['elapsed']:.1f} с, {stats['throughput']:.0f} свечей/с")
+            for error in stats['errors'][:3]:
+                print(f"{Fore.RED}   ❌ {error}")
+
+        print(f"{Fore.CYAN}{'='*70}\n")
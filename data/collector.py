@@ -1,12 +1,19 @@
 # data/collector.py
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Union
 from datetime import datetime, timedelta
 import time
 from colorama import Fore, Style
 import os
 from exchanges.connector import ExchangeConnector
+from data.candle_store import CandleStore, CandleView
+from data.frame_cache import frame_cache
+from data.resampler import can_resample, resample_ohlcv
+from data.correlation import RollingCorrelation
+from data.indicators import indicator_pipeline
+from data.trade_aggregator import TradeAggregator
+from config import DATA_COLLECTION
 
 class DataCollector:
     """Сбор и обработка исторических данных"""
@@ -14,18 +21,25 @@ class DataCollector:
     def __init__(self, exchange_id: str = 'bybit'):
         self.exchange = ExchangeConnector(exchange_id)
         self.data_dir = 'collected_data'
+        self.store = CandleStore(os.path.join(self.data_dir, 'store'))
+        self.page_limit = 1000  # Максимум свечей за один запрос при докачке
+        self.base_timeframe = DATA_COLLECTION['base_timeframe']
+        self._empty_gaps = set()  # Пропуски, за которые биржа не вернула данных
+        self.requests = 0  # Запросов свечей к бирже
+        self._trade_feeds = {}  # Курсоры и агрегаторы сделок по (пара, таймфрейм)
         
-        # Создаем директорию для данных если её нет
-        if not os.path.exists(self.data_dir):
-            os.makedirs(self.data_dir)
+        # Создаем директорию для данных если её нет (коллекторы бирж создаются параллельно)
+        os.makedirs(self.data_dir, exist_ok=True)
     
-    def fetch_ohlcv(self, symbol: str, timeframe: str = '1h', limit: int = 500) -> Optional[pd.DataFrame]:
+    def fetch_ohlcv(self, symbol: str, timeframe: str = '1h', limit: int = 500, since: Optional[int] = None) -> Optional[pd.DataFrame]:
         """
         Получает исторические свечи (OHLCV)
         timeframe: '1m', '5m', '15m', '30m', '1h', '4h', '1d', '1w'
+        since: время первой свечи в мс (None - последние limit свечей)
         """
         try:
-            ohlcv = self.exchange.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+            self.requests += 1
+            ohlcv = self.exchange.exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=limit)
             
             df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
             df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
@@ -37,62 +51,288 @@ class DataCollector:
             print(f"{Fore.RED}Ошибка получения данных {symbol} {timeframe}: {e}")
             return None
     
-    def get_historical_data(self, symbol: str, limit: int = 100, force_refresh: bool = False) -> Optional[pd.DataFrame]:
+    def get_historical_data(self, symbol: str, limit: int = 100, force_refresh: bool = False,
+                            timeframe: str = '1h') -> Optional[pd.DataFrame]:
         """
         Получает исторические данные с кэшированием
+        Устаревший кэш обновляется инкрементально: докачиваются только новые свечи.
+        Старшие таймфреймы по возможности строятся из базового ряда (1m) локально.
+        Возвращаемый DataFrame общий для всех вызывающих: колонки добавлять можно,
+        изменять существующие значения нельзя
         """
-        cache_file = f"{self.data_dir}/{symbol.replace('/', '_')}_latest.csv"
+        cache_key = (self.exchange.exchange_id, symbol, timeframe)
+        
+        # Сначала кэш в памяти - он действителен до закрытия текущей свечи
+        if not force_refresh:
+            df = frame_cache.get(cache_key, limit)
+            if df is not None:
+                return df
+        
+        if self._is_derived(symbol, timeframe, limit):
+            df = self._derive_candles(symbol, timeframe, limit, force_refresh)
+        else:
+            df = self._load_candles(symbol, timeframe, limit, force_refresh)
+        
+        if df is not None:
+            df = frame_cache.put(cache_key, df, self._timeframe_ms(timeframe)).tail(limit)
+        
+        return df
+    
+    def _load_candles(self, symbol: str, timeframe: str, limit: int, force_refresh: bool) -> Optional[pd.DataFrame]:
+        """Загружает свечи таймфрейма с биржи через дисковый кэш"""
+        exchange_id = self.exchange.exchange_id
+        cached = self.store.read_frame(exchange_id, symbol, timeframe, limit=limit)
         
         # Проверяем кэш
-        if not force_refresh and os.path.exists(cache_file):
-            file_age = time.time() - os.path.getmtime(cache_file)
-            if file_age < 3600:  # Кэш валидн в течение часа
-                df = pd.read_csv(cache_file, index_col=0, parse_dates=True)
+        if cached is not None:
+            file_age = time.time() - self.store.updated_at(exchange_id, symbol, timeframe)
+            if not force_refresh and file_age < 3600 and self._covers_window(cached, timeframe, limit):  # Кэш валиден в течение часа
                 print(f"{Fore.GREEN}📂 Данные загружены из кэша ({file_age/60:.1f} мин. назад)")
-                return df
+                return cached
         
-        # Загружаем свежие данные
-        df = self.fetch_ohlcv(symbol, limit=limit)
+        if cached is None or cached.empty:
+            # Кэша нет - загружаем окно целиком
+            df = self._fetch_window(symbol, timeframe, limit)
+            self._save(symbol, timeframe, df)
+        else:
+            df = self._update_candles(symbol, timeframe, limit, cached)
         
         if df is not None:
-            df.to_csv(cache_file)
             print(f"{Fore.GREEN}💾 Данные сохранены в кэш")
         
         return df
     
-    def add_technical_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _is_derived(self, symbol: str, timeframe: str, limit: int) -> bool:
+        """
+        Строится ли таймфрейм из базового ряда, а не загружается отдельно
+        Таймфрейм, который есть на бирже, строится из базового ряда, только если
+        сохраненный ряд уже покрывает окно: иначе один запрос старшего таймфрейма
+        дешевле докачки тысяч базовых свечей
+        """
+        base_ms = self._timeframe_ms(self.base_timeframe)
+        tf_ms = self._timeframe_ms(timeframe)
+        if not can_resample(base_ms, tf_ms):
+            return False
+        
+        # Таймфреймы, которых нет на бирже, можно получить только агрегацией
+        native = getattr(self.exchange.exchange, 'timeframes', None) or {}
+        if timeframe not in native:
+            return True
+        if (limit + 1) * tf_ms // base_ms > DATA_COLLECTION['max_base_candles']:
+            return False
+        
+        base = self.store.read(self.exchange.exchange_id, symbol, self.base_timeframe, columns=['timestamp'])
+        return base is not None and int(base.timestamp[0]) <= self._window_start(timeframe, limit)
+    
+    def _derive_candles(self, symbol: str, timeframe: str, limit: int, force_refresh: bool) -> Optional[pd.DataFrame]:
+        """
+        Строит свечи старшего таймфрейма из базового ряда
+        Пересчитываются только периоды, затронутые новыми базовыми свечами:
+        от последней сохраненной старшей свечи (она могла быть незакрытой) и дальше
+        """
+        exchange_id = self.exchange.exchange_id
+        base_ms = self._timeframe_ms(self.base_timeframe)
+        tf_ms = self._timeframe_ms(timeframe)
+        
+        if self._load_candles(symbol, self.base_timeframe, (limit + 1) * tf_ms // base_ms, force_refresh) is None:
+            return None
+        
+        base_view = self.store.read(exchange_id, symbol, self.base_timeframe)
+        last = self.store.last_timestamp(exchange_id, symbol, timeframe)
+        bars = resample_ohlcv(base_view.slice(start=last), tf_ms)
+        
+        # Период, начавшийся раньше базового ряда, собран не полностью
+        first_full = -(-int(base_view.timestamp[0]) // tf_ms) * tf_ms
+        self._save(symbol, timeframe, bars[bars.index.as_unit('ms').asi8 >= first_full])
+        
+        return self.store.read_frame(exchange_id, symbol, timeframe, limit=limit)
+    
+    def get_candle_view(self, symbol: str, timeframe: str = '1h', start=None, end=None) -> Optional[CandleView]:
+        """
+        Сохраненные свечи без копирования (memory map)
+        start, end: границы среза по времени (мс, строка или Timestamp)
+        """
+        return self.store.read(self.exchange.exchange_id, symbol, timeframe, start, end)
+    
+    def _save(self, symbol: str, timeframe: str, df: Optional[pd.DataFrame]):
+        """Записывает загруженные свечи в хранилище"""
+        if df is not None and not df.empty:
+            self.store.write(self.exchange.exchange_id, symbol, timeframe, df)
+    
+    def _timeframe_ms(self, timeframe: str) -> int:
+        """Длительность таймфрейма в миллисекундах"""
+        return int(self.exchange.exchange.parse_timeframe(timeframe) * 1000)
+    
+    def _window_start(self, timeframe: str, limit: int) -> int:
+        """Время открытия первой из последних limit свечей (последняя - текущая)"""
+        tf_ms = self._timeframe_ms(timeframe)
+        now_ms = self.exchange.exchange.milliseconds()
+        return now_ms - now_ms % tf_ms - (limit - 1) * tf_ms
+    
+    def _covers_window(self, cached: pd.DataFrame, timeframe: str, limit: int) -> bool:
+        """Начинается ли кэш не позже окна (с допуском на одну еще не появившуюся свечу)"""
+        first = int(cached.index.as_unit('ms').asi8[0])
+        return first <= self._window_start(timeframe, limit) + self._timeframe_ms(timeframe)
+    
+    @staticmethod
+    def _merge_candles(old: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+        """Объединяет свечи; при совпадении времени побеждает более свежая загрузка"""
+        merged = pd.concat([old, new])
+        merged = merged[~merged.index.duplicated(keep='last')]
+        return merged.sort_index()
+    
+    def _update_candles(self, symbol: str, timeframe: str, limit: int, cached: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """
+        Инкрементальное обновление кэша
+        Докачивает свечи начиная с последней сохраненной (она могла быть еще не закрыта),
+        затем ищет и заполняет пропуски внутри окна
+        """
+        tf_ms = self._timeframe_ms(timeframe)
+        now_ms = self.exchange.exchange.milliseconds()
+        stamps = cached.index.as_unit('ms').asi8
+        
+        # Кэш не покрывает запрошенное окно - проще загрузить его заново
+        if not self._covers_window(cached, timeframe, limit) or stamps[-1] < self._window_start(timeframe, limit):
+            fresh = self._fetch_window(symbol, timeframe, limit)
+            if fresh is None:
+                return cached
+            self._save(symbol, timeframe, fresh)
+            return self._merge_candles(cached, fresh)
+        
+        fresh = self._fetch_since(symbol, timeframe, int(stamps[-1]), now_ms, tf_ms)
+        if fresh is None:
+            print(f"{Fore.YELLOW}⚠️ Не удалось обновить {symbol}, используем кэш")
+            return cached
+        
+        self._save(symbol, timeframe, fresh)
+        merged = self._merge_candles(cached, fresh) if not fresh.empty else cached
+        return self._backfill_gaps(symbol, timeframe, merged.tail(limit), tf_ms, merged)
+    
+    def _fetch_window(self, symbol: str, timeframe: str, limit: int) -> Optional[pd.DataFrame]:
+        """Загружает последние limit свечей (постранично, если окно больше лимита биржи)"""
+        if limit <= self.page_limit:
+            return self.fetch_ohlcv(symbol, timeframe, limit=limit)
+        
+        tf_ms = self._timeframe_ms(timeframe)
+        now_ms = self.exchange.exchange.milliseconds()
+        df = self._fetch_since(symbol, timeframe, self._window_start(timeframe, limit), now_ms, tf_ms)
+        return df if df is None or not df.empty else None
+    
+    def _fetch_since(self, symbol: str, timeframe: str, since: int, now_ms: int, tf_ms: int) -> Optional[pd.DataFrame]:
+        """Постранично загружает свечи от since до текущего момента"""
+        batches = []
+        
+        while since <= now_ms:
+            batch = self.fetch_ohlcv(symbol, timeframe, limit=self.page_limit, since=since)
+            if batch is None:
+                return None
+            if batch.empty:
+                break
+            
+            batches.append(batch)
+            last = int(batch.index.as_unit('ms').asi8[-1])
+            if last + tf_ms <= since:
+                break
+            since = last + tf_ms
+        
+        return pd.concat(batches) if batches else pd.DataFrame()
+    
+    def _backfill_gaps(self, symbol: str, timeframe: str, window: pd.DataFrame, tf_ms: int,
+                       merged: pd.DataFrame) -> pd.DataFrame:
+        """Находит пропущенные свечи в окне и догружает их"""
+        stamps = window.index.as_unit('ms').asi8
+        gaps = np.flatnonzero(np.diff(stamps) > tf_ms)
+        
+        for i in gaps:
+            gap_start = int(stamps[i]) + tf_ms
+            key = (symbol, timeframe, gap_start)
+            if key in self._empty_gaps:
+                continue
+            
+            missing = int((stamps[i + 1] - gap_start) // tf_ms)
+            batch = self.fetch_ohlcv(symbol, timeframe, limit=missing, since=gap_start)
+            if batch is None:
+                continue
+            if batch.empty:
+                # Биржа не торговала в этот период - больше не запрашиваем
+                self._empty_gaps.add(key)
+                continue
+            
+            print(f"{Fore.YELLOW}🩹 {symbol}: заполнен пропуск из {len(batch)} свечей")
+            self._save(symbol, timeframe, batch)
+            merged = self._merge_candles(merged, batch)
+        
+        return merged
+    
+    def ingest_trades(self, symbol: str, timeframe: str = '1m') -> Optional[pd.DataFrame]:
+        """
+        Опрашивает публичные сделки начиная с курсора и строит из них свечи
+        Подходит для бирж без OHLCV и для секундных таймфреймов ('10s').
+        Свечи с VWAP, числом сделок и объемами покупок/продаж сохраняются в хранилище
+        под таймфреймом '<timeframe>_trades'. Возвращает обновленные свечи
+        """
+        exchange_id = self.exchange.exchange_id
+        store_timeframe = f"{timeframe}_trades"
+        feed = self._trade_feeds.get((symbol, timeframe))
+        
+        if feed is None:
+            tf_ms = self._timeframe_ms(timeframe)
+            # Продолжаем с последней сохраненной свечи - она пересобирается целиком
+            cursor = self.store.last_timestamp(exchange_id, symbol, store_timeframe)
+            if cursor is None:
+                cursor = self.exchange.exchange.milliseconds()
+            feed = {'cursor': cursor - cursor % tf_ms, 'seen': set(), 'aggregator': TradeAggregator(tf_ms)}
+            self._trade_feeds[(symbol, timeframe)] = feed
+        
+        batches = []
+        while True:
+            try:
+                self.requests += 1
+                trades = self.exchange.exchange.fetch_trades(symbol, since=feed['cursor'], limit=self.page_limit)
+            except Exception as e:
+                print(f"{Fore.RED}Ошибка получения сделок {symbol}: {e}")
+                break
+            
+            # Сделки на границе курсора могли прийти в прошлый раз
+            cursor, seen = feed['cursor'], feed['seen']
+            new = [t for t in trades if t['timestamp'] > cursor or (t['timestamp'] == cursor and t['id'] not in seen)]
+            if new:
+                batches.append(feed['aggregator'].add_ccxt_trades(new))
+                last = max(t['timestamp'] for t in new)
+                at_last = {t['id'] for t in new if t['timestamp'] == last}
+                feed['seen'] = seen | at_last if last == cursor else at_last
+                feed['cursor'] = last
+            
+            if len(trades) < self.page_limit:
+                break
+            if feed['cursor'] == cursor:
+                # Вся страница в одной миллисекунде: since дальше не сдвинется, переходим
+                # к следующей (остальные сделки этой миллисекунды биржа по since не отдаст)
+                feed['cursor'], feed['seen'] = cursor + 1, set()
+        
+        if not batches:
+            return None
+        
+        candles = pd.concat(batches)
+        candles = candles[~candles.index.duplicated(keep='last')]
+        self.store.write(exchange_id, symbol, store_timeframe, candles)
+        return candles
+    
+    def add_technical_indicators(self, df: Union[pd.DataFrame, CandleView], indicators: List[str] = None) -> pd.DataFrame:
         """
         Добавляет технические индикаторы
+        indicators: имена нужных индикаторов ('MA50', 'RSI', 'BB_upper20_2.5'...), по умолчанию полный набор
+        Исходный DataFrame не изменяется - возвращается новый с добавленными колонками.
+        Для CandleView из хранилища возвращается DataFrame только с индикаторами
         """
-        # Скользящие средние
-        df['MA7'] = df['close'].rolling(window=7).mean()
-        df['MA25'] = df['close'].rolling(window=25).mean()
-        df['MA99'] = df['close'].rolling(window=99).mean()
-        
-        # RSI
-        delta = df['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        df['RSI'] = 100 - (100 / (1 + rs))
-        
-        # MACD
-        exp1 = df['close'].ewm(span=12, adjust=False).mean()
-        exp2 = df['close'].ewm(span=26, adjust=False).mean()
-        df['MACD'] = exp1 - exp2
-        df['Signal'] = df['MACD'].ewm(span=9, adjust=False).mean()
-        df['MACD_histogram'] = df['MACD'] - df['Signal']
-        
-        # Bollinger Bands
-        df['BB_middle'] = df['close'].rolling(window=20).mean()
-        bb_std = df['close'].rolling(window=20).std()
-        df['BB_upper'] = df['BB_middle'] + (bb_std * 2)
-        df['BB_lower'] = df['BB_middle'] - (bb_std * 2)
-        
-        # Объем
-        df['Volume_MA'] = df['volume'].rolling(window=20).mean()
+        values = indicator_pipeline.compute(df, indicators)
+        if isinstance(df, CandleView):
+            return values
         
-        return df
+        result = df.copy(deep=False)
+        for name in values.columns:
+            result[name] = values[name]
+        return result
     
     def collect_multiple_pairs(self, symbols: List[str], timeframe: str = '1h', limit: int = 100) -> Dict[str, pd.DataFrame]:
         """
@@ -102,28 +342,38 @@ class DataCollector:
         
         for symbol in symbols:
             print(f"{Fore.YELLOW}📊 Загрузка {symbol}...")
-            df = self.get_historical_data(symbol, limit)
+            df = self.get_historical_data(symbol, limit, timeframe=timeframe)
             if df is not None:
                 df = self.add_technical_indicators(df)
                 data[symbol] = df
-            time.sleep(1)  # Пауза между запросами
         
         return data
     
-    def calculate_correlation(self, symbols: List[str], period: str = '1d') -> pd.DataFrame:
+    def calculate_correlation(self, symbols: Union[List[str], Dict[str, Union[pd.DataFrame, CandleView]]],
+                              period: str = '1d') -> pd.DataFrame:
         """
         Рассчитывает корреляцию между парами
+        symbols: список пар (данные загружаются) или уже готовые данные {пара: DataFrame/CandleView}
         """
         prices = {}
         
-        for symbol in symbols:
-            df = self.get_historical_data(symbol, limit=100)
-            if df is not None:
-                prices[symbol] = df['close']
+        if isinstance(symbols, dict):
+            for symbol, data in symbols.items():
+                prices[symbol] = data.series('close') if isinstance(data, CandleView) else data['close']
+        else:
+            for symbol in symbols:
+                df = self.get_historical_data(symbol, limit=100)
+                if df is not None:
+                    prices[symbol] = df['close']
         
-        if len(prices) > 1:
-            price_df = pd.DataFrame(prices)
-            correlation = price_df.corr()
+        # Корреляция цен по барам, где есть цены всех пар
+        price_df = pd.DataFrame(prices).sort_index().dropna()
+        if len(prices) > 1 and len(price_df) > 1:
+            engine = RollingCorrelation(list(price_df.columns), window=len(price_df),
+                                        use_returns=False, history_size=0)
+            for ts, row in zip(price_df.index.as_unit('ms').asi8, price_df.to_numpy()):
+                engine.update(int(ts), dict(zip(price_df.columns, row)))
+            correlation = engine.to_frame()
             
             print(f"\n{Fore.CYAN}📈 Корреляционная матрица:")
             print(correlation.round(3))
@@ -132,6 +382,29 @@ class DataCollector:
         
         return None
     
+    def rolling_correlation(self, symbols: List[str], window: int = 100, timeframe: str = '1h') -> RollingCorrelation:
+        """
+        Создает движок скользящей корреляции, прогретый историческими данными
+        Дальше его можно обновлять новыми барами или отдельными ценами (on_price)
+        """
+        engine = RollingCorrelation(symbols, window=window, timeframe_ms=self._timeframe_ms(timeframe))
+        
+        closes = {}
+        for symbol in symbols:
+            df = self.get_historical_data(symbol, limit=window + 1, timeframe=timeframe)
+            if df is not None:
+                closes[symbol] = df['close']
+        
+        if not closes:
+            return engine
+        
+        # Выравниваем бары разных пар по времени
+        prices = pd.DataFrame(closes).sort_index().ffill()
+        for ts, row in zip(prices.index.as_unit('ms').asi8, prices.to_numpy()):
+            engine.update(int(ts), dict(zip(prices.columns, row)))
+        
+        return engine
+    
     def export_to_csv(self, symbol: str, format: str = 'full'):
         """
         Экспортирует данные в CSV
@@ -0,0 +1,166 @@
+# data/correlation.py
+import numpy as np
+import pandas as pd
+from collections import deque
+from typing import Dict, List, Optional
+
+
+class RollingCorrelation:
+    """
+    Скользящая корреляция и ковариация для большого набора пар
+    Хранит окно наблюдений и накопленные суммы Σx и Σxxᵀ: новый бар обновляет
+    матрицу N×N за O(N²) без пересчета всего окна. Суммы ведутся по отклонениям
+    от опорной точки (среднего окна на последнем пересчете): по сырым ценам
+    Σxxᵀ - n·x̄x̄ᵀ теряло бы точность из-за вычитания близких больших чисел.
+    Цены с разных бирж приходят в разное время - они выравниваются по барам,
+    у пары без новой цены в баре берется последняя известная
+    """
+
+    def __init__(self, symbols: List[str], window: int = 100, timeframe_ms: int = 60_000,
+                 use_returns: bool = True, history_size: int = 100):
+        """
+        symbols: пары (любые ключи, например 'binance:BTC/USDT')
+        window: размер окна в барах
+        use_returns: считать по лог-доходностям (True) или по ценам (False)
+        history_size: сколько последних матриц хранить для экспорта (0 - не хранить)
+        """
+        self.symbols = list(symbols)
+        self._index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        n = len(self.symbols)
+
+        self.window = window
+        self.timeframe_ms = timeframe_ms
+        self.use_returns = use_returns
+
+        # Кольцевой буфер наблюдений и суммы по окну
+        self._buffer = np.zeros((window, n))
+        self._pos = 0
+        self.count = 0
+        self._sum = np.zeros(n)
+        self._cross = np.zeros((n, n))
+        self._ref = None                  # Опорная точка: суммы ведутся по x - ref
+        self._updates_since_rebuild = 0
+
+        # Выравнивание по барам
+        self._prices = np.full(n, np.nan)        # Последние известные цены
+        self._prev_close = np.full(n, np.nan)    # Цены закрытия предыдущего бара
+        self._bar_start = None
+        self.last_timestamp = None
+
+        self.history = deque(maxlen=history_size) if history_size else None
+
+    def on_price(self, symbol: str, timestamp_ms: int, price: float):
+        """
+        Принимает отдельную цену (тикер, сделку) в произвольный момент
+        Когда приходит цена следующего бара, текущий бар закрывается
+        """
+        i = self._index.get(symbol)
+        if i is None or price is None:
+            return
+
+        bar_start = timestamp_ms - timestamp_ms % self.timeframe_ms
+        if self._bar_start is None:
+            self._bar_start = bar_start
+        elif bar_start > self._bar_start:
+            self._close_bar()
+            self._bar_start = bar_start
+
+        # Опоздавшие цены прошлых баров попадают в текущий бар
+        self._prices[i] = price
+
+    def flush(self, now_ms: int):
+        """Закрывает бар по часам, если за его пределами цен еще не пришло"""
+        if self._bar_start is not None and now_ms >= self._bar_start + self.timeframe_ms:
+            self._close_bar()
+            self._bar_start = now_ms - now_ms % self.timeframe_ms
+
+    def update(self, timestamp_ms: int, prices: Dict[str, float]):
+        """Добавляет уже выровненный бар {пара: цена закрытия}"""
+        for symbol, price in prices.items():
+            i = self._index.get(symbol)
+            if i is not None and price is not None and np.isfinite(price):
+                self._prices[i] = price
+        self._bar_start = timestamp_ms
+        self._close_bar()
+
+    def _close_bar(self):
+        """Фиксирует наблюдение бара и обновляет суммы за O(N²)"""
+        prices = self._prices.copy()
+        self.last_timestamp = self._bar_start
+
+        if self.use_returns:
+            ready = not np.isnan(self._prev_close).any()
+            x = np.log(prices / self._prev_close) if ready else None
+            self._prev_close = prices
+        else:
+            ready = True
+            x = prices
+
+        # Пока не у всех пар есть цена, наблюдение неполное
+        if not ready or np.isnan(x).any():
+            return
+
+        old = self._buffer[self._pos].copy()
+        self._buffer[self._pos] = x
+        self._pos = (self._pos + 1) % self.window
+
+        if self._ref is None:
+            self._ref = x.copy()
+        y = x - self._ref
+        if self.count < self.window:
+            self.count += 1
+            self._sum += y
+            self._cross += np.outer(y, y)
+        else:
+            old = old - self._ref
+            self._sum += y - old
+            self._cross += np.outer(y, y) - np.outer(old, old)
+
+        # Периодический пересчет по буферу убирает накопленную ошибку округления
+        # и переносит опорную точку к текущему среднему
+        self._updates_since_rebuild += 1
+        if self._updates_since_rebuild >= self.window:
+            self._rebuild()
+
+        if self.history is not None and self.count > 1:
+            self.history.append((self.last_timestamp, self.correlation().astype(np.float32)))
+
+    def _rebuild(self):
+        data = self._buffer[:self.count]
+        self._ref = data.mean(axis=0)
+        data = data - self._ref
+        self._sum = data.sum(axis=0)
+        self._cross = data.T @ data
+        self._updates_since_rebuild = 0
+
+    def covariance(self) -> Optional[np.ndarray]:
+        """Выборочная ковариационная матрица окна"""
+        if self.count < 2:
+            return None
+        mean = self._sum / self.count
+        return (self._cross - self.count * np.outer(mean, mean)) / (self.count - 1)
+
+    def correlation(self) -> Optional[np.ndarray]:
+        """Корреляционная матрица окна (NaN для пар без изменения цены)"""
+        cov = self.covariance()
+        if cov is None:
+            return None
+        std = np.sqrt(np.clip(np.diag(cov), 0, None))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = cov / np.outer(std, std)
+        return np.clip(corr, -1, 1)
+
+    def to_frame(self) -> Optional[pd.DataFrame]:
+        """Текущая корреляционная матрица как DataFrame"""
+        corr = self.correlation()
+        if corr is None:
+            return None
+        return pd.DataFrame(corr, index=self.symbols, columns=self.symbols)
+
+    def export_history(self, filename: str):
+        """Сохраняет историю матриц в .npz (timestamps, matrices, symbols)"""
+        if not self.history:
+            return
+        timestamps = np.array([ts for ts, _ in self.history], dtype=np.int64)
+        matrices = np.stack([matrix for _, matrix in self.history])
+        np.savez_compressed(filename, timestamps=timestamps, matrices=matrices, symbols=np.array(self.symbols))
@@ -0,0 +1,106 @@
+# data/frame_cache.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+import pandas as pd
+from config import DATA_CACHE
+
+CacheKey = Tuple[str, str, str]  # (биржа, пара, таймфрейм)
+
+
+class FrameCache:
+    """
+    LRU-кэш свечей в памяти процесса, общий для всех стратегий и анализа
+    Запись живет до закрытия текущей свечи, вытеснение - по бюджету памяти.
+    Наружу выдаются DataFrame поверх read-only массива: добавлять колонки можно,
+    а изменить общие данные - нет
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes_held = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: CacheKey, limit: int = None) -> Optional[pd.DataFrame]:
+        """Возвращает последние limit свечей или None, если их нет или свеча закрылась"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() * 1000 >= entry['expires_at']:
+                self._drop(key)
+                entry = None
+
+            if entry is None or (limit is not None and len(entry['index']) < limit):
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+        return self._view(entry, limit)
+
+    def put(self, key: CacheKey, df: pd.DataFrame, timeframe_ms: int) -> pd.DataFrame:
+        """
+        Кладет свечи в кэш до закрытия текущей свечи и возвращает read-only представление
+        """
+        values = df.to_numpy(dtype='float64', copy=True)
+        values.flags.writeable = False
+        entry = {
+            'index': df.index.copy(),
+            'columns': df.columns.copy(),
+            'values': values,
+            'nbytes': values.nbytes + df.index.nbytes,
+            'expires_at': (int(time.time() * 1000) // timeframe_ms + 1) * timeframe_ms,
+        }
+
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+
+            if entry['nbytes'] <= self.max_bytes:
+                self._entries[key] = entry
+                self.bytes_held += entry['nbytes']
+                while self.bytes_held > self.max_bytes:
+                    self._drop(next(iter(self._entries)))
+                    self.evictions += 1
+
+        return self._view(entry)
+
+    def invalidate(self, key: CacheKey = None):
+        """Сбрасывает одну запись или весь кэш"""
+        with self._lock:
+            for k in ([key] if key is not None else list(self._entries)):
+                if k in self._entries:
+                    self._drop(k)
+
+    def get_stats(self) -> Dict:
+        """Статистика кэша: попадания, промахи, занятая память"""
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes_held': self.bytes_held,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / requests * 100 if requests else 0,
+                'evictions': self.evictions,
+            }
+
+    def _drop(self, key: CacheKey):
+        entry = self._entries.pop(key)
+        self.bytes_held -= entry['nbytes']
+
+    @staticmethod
+    def _view(entry: Dict, limit: int = None) -> pd.DataFrame:
+        start = 0 if limit is None else max(len(entry['index']) - limit, 0)
+        return pd.DataFrame(entry['values'][start:], index=entry['index'][start:],
+                            columns=entry['columns'], copy=False)
+
+
+# Общий кэш процесса
+frame_cache = FrameCache(DATA_CACHE['memory_budget_mb'] * 1024 * 1024)
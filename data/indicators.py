@@ -0,0 +1,204 @@
+# data/indicators.py
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Tuple, Union
+import numpy as np
+import pandas as pd
+from data.candle_store import CandleView
+
+# Набор, который раньше всегда считал add_technical_indicators
+DEFAULT_INDICATORS = ['MA7', 'MA25', 'MA99', 'RSI', 'MACD', 'Signal', 'MACD_histogram',
+                      'BB_middle', 'BB_upper', 'BB_lower', 'Volume_MA']
+
+CLOSE = ('col', 'close')
+VOLUME = ('col', 'volume')
+
+
+def _macd(fast: int = 12, slow: int = 26) -> Tuple:
+    return ('sub', ('ewm', CLOSE, fast), ('ewm', CLOSE, slow))
+
+
+def _signal(fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple:
+    return ('ewm', _macd(fast, slow), signal)
+
+
+def _bollinger(band: str, window: str, k: str) -> Tuple:
+    n = int(window) if window else 20
+    k = float(k) if k else 2.0
+    middle = ('sma', CLOSE, n)
+    if band == 'middle':
+        return middle
+    return ('band', middle, ('std', CLOSE, n), k if band == 'upper' else -k)
+
+
+# Имя индикатора -> узел графа. Параметры задаются прямо в имени: MA50, RSI7, BB_upper20_2.5
+INDICATORS = [
+    (re.compile(r'MA(\d+)'), lambda n: ('sma', CLOSE, int(n))),
+    (re.compile(r'EMA(\d+)'), lambda n: ('ewm', CLOSE, int(n))),
+    (re.compile(r'STD(\d+)'), lambda n: ('std', CLOSE, int(n))),
+    (re.compile(r'RSI(\d*)'), lambda n: ('rsi', int(n) if n else 14)),
+    (re.compile(r'MACD'), lambda: _macd()),
+    (re.compile(r'Signal'), lambda: _signal()),
+    (re.compile(r'MACD_histogram'), lambda: ('sub', _macd(), _signal())),
+    (re.compile(r'BB_(upper|middle|lower)(\d*)(?:_([\d.]+))?'), _bollinger),
+    (re.compile(r'Volume_MA(\d*)'), lambda n: ('sma', VOLUME, int(n) if n else 20)),
+]
+
+
+def indicator_node(name: str) -> Tuple:
+    """Узел графа для имени индикатора (ValueError для неизвестного имени)"""
+    for pattern, build in INDICATORS:
+        match = pattern.fullmatch(name)
+        if match:
+            return build(*match.groups())
+    if name in ('open', 'high', 'low', 'close', 'volume'):
+        return ('col', name)
+    raise ValueError(f"Неизвестный индикатор: {name}")
+
+
+class _Graph:
+    """
+    Вычисление узлов на массивах NumPy с мемоизацией: общий промежуточный узел
+    (префиксные суммы, EWM) считается один раз
+    """
+
+    def __init__(self, source: Union[pd.DataFrame, CandleView], memo: Dict):
+        self.source = source
+        self.memo = memo
+
+    def get(self, key: Tuple):
+        value = self.memo.get(key)
+        if value is None:
+            value = self._compute(key)
+            self.memo[key] = value
+        return value
+
+    def _rolling_sum(self, base: Tuple, n: int) -> np.ndarray:
+        """Скользящая сумма (base - ref) через префиксные суммы; окно с NaN дает NaN"""
+        prefix, nans = self.get(('prefix', base))
+        total = np.full(len(prefix) - 1, np.nan)
+        if n <= len(total):
+            total[n - 1:] = prefix[n:] - prefix[:-n]
+            total[n - 1:][nans[n:] != nans[:-n]] = np.nan
+        return total
+
+    def _compute(self, key: Tuple):
+        kind = key[0]
+
+        if kind == 'col':
+            if isinstance(self.source, CandleView):
+                return np.asarray(self.source[key[1]], dtype='float64')
+            return self.source[key[1]].to_numpy(dtype='float64')
+        if kind == 'diff':
+            values = self.get(key[1])
+            return np.concatenate(([np.nan], np.diff(values))) if len(values) else values
+        if kind == 'gain':
+            delta = self.get(key[1])
+            return np.where(delta > 0, delta, 0.0)
+        if kind == 'loss':
+            delta = self.get(key[1])
+            return -np.where(delta < 0, delta, 0.0)
+        if kind == 'ref':
+            # Опорное значение: суммы считаются от него, чтобы не терять точность на больших ценах
+            values = self.get(key[1])
+            finite = values[np.isfinite(values)]
+            return finite[0] if len(finite) else 0.0
+        if kind == 'centered':
+            return self.get(key[1]) - self.get(('ref', key[1]))
+        if kind == 'square':
+            return self.get(key[1]) ** 2
+        if kind == 'prefix':
+            values = self.get(key[1])
+            nans = np.isnan(values)
+            prefix = np.concatenate(([0.0], np.cumsum(np.where(nans, 0.0, values))))
+            return prefix, np.concatenate(([0], np.cumsum(nans)))
+        if kind == 'rolling_sum':
+            return self._rolling_sum(key[1], key[2])
+        if kind == 'sma':
+            centered = ('centered', key[1])
+            return self.get(('rolling_sum', centered, key[2])) / key[2] + self.get(('ref', key[1]))
+        if kind == 'std':
+            # Стандартное отклонение из тех же скользящих сумм, что и у MA
+            n = key[2]
+            centered = ('centered', key[1])
+            total = self.get(('rolling_sum', centered, n))
+            squares = self.get(('rolling_sum', ('square', centered), n))
+            return np.sqrt(np.clip((squares - total ** 2 / n) / (n - 1), 0, None))
+        if kind == 'ewm':
+            values = pd.Series(self.get(key[1]), copy=False)
+            return values.ewm(span=key[2], adjust=False).mean().to_numpy()
+        if kind == 'sub':
+            return self.get(key[1]) - self.get(key[2])
+        if kind == 'band':
+            return self.get(key[1]) + self.get(key[2]) * key[3]
+        if kind == 'rsi':
+            delta = ('diff', CLOSE)
+            gain = self.get(('sma', ('gain', delta), key[1]))
+            loss = self.get(('sma', ('loss', delta), key[1]))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return 100 - (100 / (1 + gain / loss))
+
+        raise ValueError(f"Неизвестный узел: {kind}")
+
+
+class IndicatorPipeline:
+    """
+    Ленивый граф технических индикаторов
+    Считается только запрошенное, общие промежуточные узлы (скользящие суммы, EWM)
+    считаются один раз, результаты запоминаются для версии данных. Входные данные
+    не изменяются
+    """
+
+    def __init__(self, cache_size: int = 64):
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _version(data: Union[pd.DataFrame, CandleView]) -> Tuple:
+        """
+        Версия данных: хэш времени и всех значений OHLCV
+        (докачка пропусков переписывает свечи в середине ряда - границ недостаточно)
+        """
+        if len(data) == 0:
+            return (0,)
+        digest = hashlib.blake2b(digest_size=16)
+        if isinstance(data, CandleView):
+            timestamps = data.timestamp
+        elif isinstance(data.index, pd.DatetimeIndex):
+            timestamps = data.index.as_unit('ms').asi8
+        else:
+            timestamps = np.asarray(data.index, dtype=np.float64)
+        digest.update(np.ascontiguousarray(timestamps))
+        for column in ('open', 'high', 'low', 'close', 'volume'):
+            if column in data:
+                values = data[column] if isinstance(data, CandleView) else data[column].to_numpy()
+                digest.update(np.ascontiguousarray(values, dtype=np.float64))
+        return (len(data), digest.digest())
+
+    def compute(self, data: Union[pd.DataFrame, CandleView], names: List[str] = None, key=None) -> pd.DataFrame:
+        """
+        Возвращает DataFrame с запрошенными индикаторами
+        names: имена индикаторов ('MA50', 'RSI', 'BB_upper20_2.5', ...), по умолчанию DEFAULT_INDICATORS
+        key: дополнительный ключ версии (например, биржа и пара)
+        """
+        names = names or DEFAULT_INDICATORS
+        version = (key, self._version(data))
+
+        with self._lock:
+            memo = self._cache.pop(version, None)
+            if memo is None:
+                memo = {}
+            self._cache[version] = memo
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+        graph = _Graph(data, memo)
+        index = data.index
+        return pd.DataFrame({name: graph.get(indicator_node(name)) for name in names}, index=index)
+
+
+# Общий конвейер процесса
+indicator_pipeline = IndicatorPipeline()
@@ -0,0 +1,72 @@
+# data/resampler.py
+import numpy as np
+import pandas as pd
+from typing import Union
+from data.candle_store import CandleView
+
+# Как агрегируется каждая колонка при переходе на старший таймфрейм
+AGGREGATIONS = {
+    'open': 'first',
+    'high': 'max',
+    'low': 'min',
+    'close': 'last',
+    'volume': 'sum',
+    'trades': 'sum',
+    'buy_volume': 'sum',
+    'sell_volume': 'sum',
+    'vwap': 'vwap',       # Средневзвешенная по объему
+}
+
+DAY_MS = 86_400_000
+
+
+def can_resample(base_ms: int, timeframe_ms: int) -> bool:
+    """
+    Можно ли корректно получить таймфрейм из базового
+    Свечи бирж выровнены по суткам UTC, поэтому таймфрейм должен делить сутки
+    """
+    return timeframe_ms > base_ms and timeframe_ms % base_ms == 0 and DAY_MS % timeframe_ms == 0
+
+
+def resample_ohlcv(data: Union[pd.DataFrame, CandleView], timeframe_ms: int) -> pd.DataFrame:
+    """
+    Векторная агрегация свечей в старший таймфрейм за один проход
+    data: отсортированные по времени свечи (DataFrame или CandleView)
+    Колонки без известного правила агрегации пропускаются
+    """
+    if isinstance(data, CandleView):
+        ts = np.asarray(data.timestamp)
+        columns = {name: np.asarray(values) for name, values in data.columns.items() if name != 'timestamp'}
+    else:
+        ts = data.index.as_unit('ms').asi8
+        columns = {name: data[name].to_numpy(dtype='float64') for name in data.columns}
+
+    if len(ts) == 0:
+        return pd.DataFrame(columns=[c for c in columns if c in AGGREGATIONS],
+                            index=pd.DatetimeIndex([], dtype='datetime64[ms]', name='timestamp'))
+
+    # Границы групп: свечи с одинаковым началом старшего периода идут подряд
+    buckets = ts - ts % timeframe_ms
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(ts)] - 1
+
+    result = {}
+    for name, values in columns.items():
+        how = AGGREGATIONS.get(name)
+        if how == 'first':
+            result[name] = values[starts]
+        elif how == 'last':
+            result[name] = values[ends]
+        elif how == 'max':
+            result[name] = np.maximum.reduceat(values, starts)
+        elif how == 'min':
+            result[name] = np.minimum.reduceat(values, starts)
+        elif how == 'sum':
+            result[name] = np.add.reduceat(values, starts)
+        elif how == 'vwap' and 'volume' in columns:
+            volume = np.add.reduceat(columns['volume'], starts)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                result[name] = np.add.reduceat(values * columns['volume'], starts) / volume
+
+    index = pd.DatetimeIndex(buckets[starts].astype('datetime64[ms]'), name='timestamp')
+    return pd.DataFrame(result, index=index)
@@ -0,0 +1,258 @@
+# data/tick_store.py
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+from data.candle_store import TimeLike, to_ms
+
+# Запись индекса блока: границы по времени, положение в файле данных, число записей
+INDEX_DTYPE = np.dtype([('first_ts', '<i8'), ('last_ts', '<i8'), ('offset', '<i8'),
+                        ('length', '<i4'), ('count', '<i4')])
+
+
+def ticker_fields() -> List[str]:
+    return ['exchange_ts', 'bid', 'ask', 'last', 'volume']
+
+
+def book_fields(depth: int) -> List[str]:
+    fields = ['exchange_ts']
+    for i in range(depth):
+        fields += [f'bid_px_{i}', f'bid_sz_{i}', f'ask_px_{i}', f'ask_sz_{i}']
+    return fields
+
+
+def _encode_block(ts: np.ndarray, values: np.ndarray) -> bytes:
+    """
+    Время - дельты целых мс; значения - биты float64, XOR с предыдущей записью.
+    Затем перестановка байтов + zlib. Соседние тики почти не отличаются, поэтому
+    у XOR совпадают знак, порядок и старшие биты мантиссы - после перестановки
+    эти байты сжимаются практически в ноль. Значения хранятся без потерь:
+    любой диапазон объемов и точность микро-цен сохраняются как есть
+    """
+    deltas = np.diff(ts.astype(np.int64), prepend=np.int64(0))
+    bits = np.ascontiguousarray(values, dtype=np.float64).view(np.int64)
+    xored = bits ^ np.vstack([np.zeros((1, bits.shape[1]), dtype=np.int64), bits[:-1]])
+    columns = np.column_stack([deltas, xored])
+    shuffled = np.ascontiguousarray(columns.T).view(np.uint8).reshape(-1, 8).T
+    return zlib.compress(shuffled.tobytes(), 6)
+
+
+def _decode_block(data: bytes, count: int, width: int) -> np.ndarray:
+    """Возвращает таблицу float64: время получения (мс) и значения полей"""
+    raw = np.frombuffer(zlib.decompress(data), dtype=np.uint8).reshape(8, -1)
+    columns = np.ascontiguousarray(raw.T).view(np.int64).reshape(width, count).T
+    ts = np.cumsum(columns[:, 0]).astype(np.float64)
+    values = np.bitwise_xor.accumulate(columns[:, 1:], axis=0).view(np.float64)
+    return np.column_stack([ts, values])
+
+
+class TickStore:
+    """
+    Сжатое append-only хранилище тикеров и снимков стакана
+    Записи пишутся блоками: время кодируется дельтами, значения - XOR с предыдущей
+    записью, блок сжимается. Отдельный индекс (границы блоков по времени)
+    позволяет читать диапазон, не распаковывая весь файл
+    """
+
+    def __init__(self, root: str = 'collected_data/ticks'):
+        self.root = root
+
+    def _dir(self, exchange_id: str, symbol: str, kind: str) -> str:
+        return os.path.join(self.root, exchange_id, symbol.replace('/', '_').replace(':', '_'), kind)
+
+    def append_block(self, exchange_id: str, symbol: str, kind: str, fields: List[str], rows: List[tuple]):
+        """Записывает блок записей (ts, поле1, поле2, ...) в конец файла"""
+        if not rows:
+            return
+
+        path = self._dir(exchange_id, symbol, kind)
+        os.makedirs(path, exist_ok=True)
+        meta_file = os.path.join(path, 'meta.json')
+        if not os.path.exists(meta_file):
+            with open(meta_file, 'w') as f:
+                json.dump({'fields': fields}, f)
+
+        table = np.array(rows, dtype=np.float64)
+        if table.ndim != 2 or table.shape[1] != len(fields) + 1:
+            raise ValueError(f"Ожидалось {len(fields) + 1} полей в записи, получено {table.shape}")
+        if not np.isfinite(table[:, 0]).all() or np.abs(table[:, 0]).max() >= 2 ** 62:
+            raise ValueError("Некорректное время получения тика")
+        table = table[np.argsort(table[:, 0], kind='stable')]
+        ts = np.round(table[:, 0]).astype(np.int64)
+        block = _encode_block(ts, table[:, 1:])
+
+        data_file = os.path.join(path, 'ticks.bin')
+        with open(data_file, 'ab') as f:
+            offset = f.tell()
+            f.write(block)
+
+        entry = np.array([(ts[0], ts[-1], offset, len(block), len(ts))], dtype=INDEX_DTYPE)
+        with open(os.path.join(path, 'ticks.idx'), 'ab') as f:
+            f.write(entry.tobytes())
+
+    def scan(self, exchange_id: str, symbol: str, kind: str, start: TimeLike = None,
+             end: TimeLike = None) -> Optional[pd.DataFrame]:
+        """
+        Читает записи за период [start, end] (время получения в мс, строка или Timestamp)
+        Распаковываются только блоки, пересекающие период
+        """
+        path = self._dir(exchange_id, symbol, kind)
+        index_file = os.path.join(path, 'ticks.idx')
+        if not os.path.exists(index_file):
+            return None
+
+        with open(os.path.join(path, 'meta.json'), 'r') as f:
+            fields = json.load(f)['fields']
+
+        index = np.fromfile(index_file, dtype=INDEX_DTYPE)
+        start_ms, end_ms = to_ms(start), to_ms(end)
+        selected = np.ones(len(index), dtype=bool)
+        if start_ms is not None:
+            selected &= index['last_ts'] >= start_ms
+        if end_ms is not None:
+            selected &= index['first_ts'] <= end_ms
+
+        blocks = []
+        with open(os.path.join(path, 'ticks.bin'), 'rb') as f:
+            for entry in index[selected]:
+                f.seek(int(entry['offset']))
+                blocks.append(_decode_block(f.read(int(entry['length'])), int(entry['count']), len(fields) + 1))
+
+        if not blocks:
+            return None
+
+        table = np.concatenate(blocks)
+        table = table[np.argsort(table[:, 0], kind='stable')]
+        ts = table[:, 0]
+        mask = np.ones(len(ts), dtype=bool)
+        if start_ms is not None:
+            mask &= ts >= start_ms
+        if end_ms is not None:
+            mask &= ts <= end_ms
+        table = table[mask]
+
+        # Отсутствующие значения хранятся как NaN
+        data = {name: table[:, i] for i, name in enumerate(fields, start=1)}
+        index = pd.DatetimeIndex(table[:, 0].astype(np.int64).astype('datetime64[ms]'), name='timestamp')
+        return pd.DataFrame(data, index=index)
+
+
+class TickRecorder:
+    """
+    Фоновая запись тикеров и стаканов в TickStore
+    Вызов record_* только кладет запись в очередь (не блокирует и не пишет на диск);
+    при переполнении очереди запись отбрасывается и учитывается в dropped
+    """
+
+    def __init__(self, store: TickStore, book_depth: int = 5, block_size: int = 1024,
+                 max_block_age: float = 300.0, queue_size: int = 100000):
+        """
+        max_block_age: сколько секунд неполный блок пары может копиться в памяти;
+        блок пишется, когда набрал block_size записей или его первая запись старше этого
+        """
+        self.store = store
+        self.book_depth = book_depth
+        self.block_size = block_size
+        self.max_block_age = max_block_age
+        self.dropped = 0
+        self.recorded = 0
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._buffers = {}  # (биржа, пара, вид) -> список записей
+        self._opened = {}   # (биржа, пара, вид) -> время первой записи буфера
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self._thread.start()
+
+    def record_ticker(self, exchange_id: str, ticker: Dict):
+        """Записывает тикер в формате ExchangeConnector.get_ticker"""
+        row = (time.time() * 1000, ticker.get('timestamp'), ticker.get('bid'), ticker.get('ask'),
+               ticker.get('last'), ticker.get('volume'))
+        self._put((exchange_id, ticker['symbol'], 'ticker', row))
+
+    def record_order_book(self, exchange_id: str, symbol: str, order_book: Dict):
+        """Записывает верхние уровни стакана в формате ExchangeConnector.get_order_book"""
+        row = [time.time() * 1000, order_book.get('timestamp')]
+        bids, asks = order_book['bids'], order_book['asks']
+        for i in range(self.book_depth):
+            bid = bids[i] if i < len(bids) else (None, None)
+            ask = asks[i] if i < len(asks) else (None, None)
+            row += [bid[0], bid[1], ask[0], ask[1]]
+        self._put((exchange_id, symbol, 'book', tuple(row)))
+
+    def _put(self, record):
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _writer_loop(self):
+        while not self._stop.is_set() or not self._queue.empty():
+            try:
+                exchange_id, symbol, kind, row = self._queue.get(timeout=0.5)
+                key = (exchange_id, symbol, kind)
+                buffer = self._buffers.get(key)
+                if buffer is None:
+                    buffer = self._buffers[key] = []
+                    self._opened[key] = time.time()
+                buffer.append(tuple(np.nan if v is None else v for v in row))
+                if len(buffer) >= self.block_size:
+                    self._flush(key)
+            except queue.Empty:
+                pass
+
+            # Неполные блоки пишутся только по возрасту своей первой записи:
+            # общий таймер при редком опросе давал бы блоки из единиц записей
+            now = time.time()
+            for key in [key for key, opened in self._opened.items() if now - opened >= self.max_block_age]:
+                self._flush(key)
+
+        for key in list(self._buffers):
+            self._flush(key)
+
+    def _flush(self, key):
+        rows = self._buffers.pop(key, None)
+        self._opened.pop(key, None)
+        if not rows:
+            return
+        exchange_id, symbol, kind = key
+        fields = ticker_fields() if kind == 'ticker' else book_fields(self.book_depth)
+        try:
+            self.store.append_block(exchange_id, symbol, kind, fields, rows)
+            self.recorded += len(rows)
+        except Exception as e:
+            print(f"Ошибка записи тиков {exchange_id} {symbol}: {e}")
+
+    def close(self):
+        """Дописывает буферы и останавливает поток записи"""
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+
+_recorder = None
+_recorder_lock = threading.Lock()
+
+
+def get_tick_recorder() -> Optional[TickRecorder]:
+    """Общий рекордер процесса (None, если запись выключена в TICK_RECORDING)"""
+    global _recorder
+    from config import TICK_RECORDING
+    if not TICK_RECORDING['enabled']:
+        return None
+
+    with _recorder_lock:
+        if _recorder is None:
+            _recorder = TickRecorder(TickStore(TICK_RECORDING['path']),
+                                     book_depth=TICK_RECORDING['book_depth'],
+                                     block_size=TICK_RECORDING['block_size'],
+                                     max_block_age=TICK_RECORDING['max_block_age'])
+            # Поток записи - демон: без этого неполные блоки терялись бы при выходе
+            atexit.register(_recorder.close)
+        return _recorder
@@ -0,0 +1,101 @@
+# data/trade_aggregator.py
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+
+# Колонки свечей, построенных из сделок
+TRADE_CANDLE_COLUMNS = ['open', 'high', 'low', 'close', 'volume', 'vwap', 'trades', 'buy_volume', 'sell_volume']
+
+
+class TradeAggregator:
+    """
+    Агрегация сделок в свечи произвольного таймфрейма (в том числе секундного)
+    Пачка сделок обрабатывается за один векторный проход; последняя свеча остается
+    открытой и дополняется следующей пачкой
+    """
+
+    def __init__(self, timeframe_ms: int):
+        self.timeframe_ms = timeframe_ms
+        self._open_bar = None  # Состояние незакрытой свечи
+        self.late_trades = 0   # Сделки, пришедшие после закрытия своей свечи
+
+    def add_trades(self, timestamps: np.ndarray, prices: np.ndarray, amounts: np.ndarray,
+                   side: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """
+        Добавляет сделки и возвращает затронутые свечи (последняя может быть незакрытой)
+        timestamps: время сделок в мс, prices/amounts: цена и объем в базовой валюте
+        side: сторона агрессора (1 - покупка, -1 - продажа, 0 - неизвестна);
+        сделки с неизвестной стороной не входят ни в buy, ни в sell объем
+        """
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        prices = np.asarray(prices, dtype=np.float64)
+        amounts = np.asarray(amounts, dtype=np.float64)
+        if side is None:
+            buy = sell = np.zeros(len(amounts))
+        else:
+            side = np.asarray(side)
+            buy, sell = np.where(side > 0, amounts, 0.0), np.where(side < 0, amounts, 0.0)
+
+        if len(timestamps) and np.any(timestamps[1:] < timestamps[:-1]):
+            order = np.argsort(timestamps, kind='stable')
+            timestamps, prices, amounts, buy, sell = (a[order] for a in (timestamps, prices, amounts, buy, sell))
+
+        # Сделки уже закрытых свечей отбрасываем
+        if self._open_bar is not None:
+            fresh = timestamps >= self._open_bar['start']
+            self.late_trades += int(len(fresh) - fresh.sum())
+            timestamps, prices, amounts, buy, sell = (a[fresh] for a in (timestamps, prices, amounts, buy, sell))
+
+        if len(timestamps) == 0:
+            return self._frame([])
+
+        buckets = timestamps - timestamps % self.timeframe_ms
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        ends = np.r_[starts[1:], len(timestamps)] - 1
+
+        bars = {
+            'start': buckets[starts],
+            'open': prices[starts],
+            'high': np.maximum.reduceat(prices, starts),
+            'low': np.minimum.reduceat(prices, starts),
+            'close': prices[ends],
+            'volume': np.add.reduceat(amounts, starts),
+            'notional': np.add.reduceat(prices * amounts, starts),
+            'trades': np.diff(np.r_[starts, len(timestamps)]).astype(np.float64),
+            'buy_volume': np.add.reduceat(buy, starts),
+            'sell_volume': np.add.reduceat(sell, starts),
+        }
+
+        # Первая свеча пачки может продолжать открытую свечу
+        bar = self._open_bar
+        if bar is not None and bars['start'][0] == bar['start']:
+            bars['open'][0] = bar['open']
+            bars['high'][0] = max(bars['high'][0], bar['high'])
+            bars['low'][0] = min(bars['low'][0], bar['low'])
+            for name in ('volume', 'notional', 'trades', 'buy_volume', 'sell_volume'):
+                bars[name][0] += bar[name]
+
+        self._open_bar = {name: values[-1] for name, values in bars.items()}
+        return self._frame(bars)
+
+    def add_ccxt_trades(self, trades: List[Dict]) -> pd.DataFrame:
+        """Добавляет сделки в формате ccxt (fetch_trades / watch_trades)"""
+        timestamps = np.fromiter((t['timestamp'] for t in trades), dtype=np.int64, count=len(trades))
+        prices = np.fromiter((t['price'] for t in trades), dtype=np.float64, count=len(trades))
+        amounts = np.fromiter((t['amount'] for t in trades), dtype=np.float64, count=len(trades))
+        sides = {'buy': 1, 'sell': -1}
+        side = np.fromiter((sides.get(t.get('side'), 0) for t in trades), dtype=np.int8, count=len(trades))
+        return self.add_trades(timestamps, prices, amounts, side)
+
+    @staticmethod
+    def _frame(bars) -> pd.DataFrame:
+        if not len(bars):
+            return pd.DataFrame(columns=TRADE_CANDLE_COLUMNS,
+                                index=pd.DatetimeIndex([], dtype='datetime64[ms]', name='timestamp'))
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            vwap = bars['notional'] / bars['volume']
+        data = {name: bars[name] for name in TRADE_CANDLE_COLUMNS if name != 'vwap'}
+        data['vwap'] = vwap
+        index = pd.DatetimeIndex(bars['start'].astype('datetime64[ms]'), name='timestamp')
+        return pd.DataFrame(data, index=index)[TRADE_CANDLE_COLUMNS]
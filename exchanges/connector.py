@@ -3,6 +3,8 @@ import ccxt
 from typing import Dict, List, Optional
 import time
 from colorama import Fore, Style, init
+from data.tick_store import get_tick_recorder
+from portfolio.valuation import PortfolioValuation
 
 init(autoreset=True)
 
@@ -13,6 +15,8 @@ class ExchangeConnector:
         self.exchange_id = exchange_id
         self.config = config or {}
         self.exchange = self._create_exchange()
+        self.recorder = get_tick_recorder()  # None, если запись тиков выключена
+        self._valuation = None
         
     def _create_exchange(self):
         """Создает подключение к бирже"""
@@ -31,7 +35,7 @@ class ExchangeConnector:
         """Получает тикер для пары"""
         try:
             ticker = self.exchange.fetch_ticker(symbol)
-            return {
+            result = {
                 'symbol': symbol,
                 'last': ticker['last'],
                 'bid': ticker['bid'],
@@ -42,19 +46,62 @@ class ExchangeConnector:
                 'change': ticker['percentage'],
                 'timestamp': ticker['timestamp'] or int(time.time() * 1000)
             }
+            if self.recorder:
+                self.recorder.record_ticker(self.exchange_id, result)
+            return result
         except Exception as e:
             print(f"{Fore.RED}Ошибка получения тикера {symbol}: {e}")
             return None
     
+    def get_tickers(self, symbols: List[str] = None) -> Dict[str, Dict]:
+        """
+        Получает тикеры одним запросом (все пары биржи, если symbols не задан)
+        Формат тикеров как у get_ticker
+        """
+        if not self.exchange.has.get('fetchTickers') and symbols is not None:
+            # Биржа не отдает тикеры пачкой - запрашиваем по одному
+            tickers = {symbol: self.get_ticker(symbol) for symbol in symbols}
+            return {symbol: ticker for symbol, ticker in tickers.items() if ticker}
+        
+        try:
+            tickers = self.exchange.fetch_tickers(symbols)
+        except Exception as e:
+            print(f"{Fore.RED}Ошибка получения тикеров {self.exchange_id}: {e}")
+            return {}
+        
+        now = int(time.time() * 1000)
+        wanted = set(symbols) if symbols is not None else None
+        results = {}
+        for symbol, ticker in tickers.items():
+            if wanted is not None and symbol not in wanted:
+                continue
+            results[symbol] = {
+                'symbol': symbol,
+                'last': ticker.get('last'),
+                'bid': ticker.get('bid'),
+                'ask': ticker.get('ask'),
+                'volume': ticker.get('baseVolume'),
+                'high': ticker.get('high'),
+                'low': ticker.get('low'),
+                'change': ticker.get('percentage'),
+                'timestamp': ticker.get('timestamp') or now
+            }
+            if self.recorder:
+                self.recorder.record_ticker(self.exchange_id, results[symbol])
+        return results
+    
     def get_order_book(self, symbol: str, limit: int = 10) -> Dict:
         """Получает стакан ордеров"""
         try:
             order_book = self.exchange.fetch_order_book(symbol, limit)
-            return {
+            result = {
                 'bids': order_book['bids'][:limit],
                 'asks': order_book['asks'][:limit],
                 'timestamp': order_book['timestamp']
             }
+            if self.recorder:
+                self.recorder.record_order_book(self.exchange_id, symbol, result)
+            return result
         except Exception as e:
             print(f"{Fore.RED}Ошибка получения стакана {symbol}: {e}")
             return None
@@ -90,6 +137,13 @@ class ExchangeConnector:
             return spread
         return None
     
+    @property
+    def valuation(self):
+        """Оценка баланса в USDT (общая для всех, кто работает с этой биржей)"""
+        if self._valuation is None:
+            self._valuation = PortfolioValuation(self)
+        return self._valuation
+    
     def print_portfolio(self):
         """Заглушка для совместимости с PaperExchange"""
         balance = self.get_balance()
@@ -98,19 +152,17 @@ class ExchangeConnector:
             print(f"📊 ПОРТФЕЛЬ (Реальный)")
             print(f"{'='*50}")
             
-            total = 0
+            # Весь баланс оценивается одним запросом тикеров
+            valuation = self.valuation.value(balance['total'])
             for currency, amount in balance['total'].items():
                 if amount > 0:
-                    try:
-                        ticker = self.get_ticker(f"{currency}/USDT")
-                        if ticker and ticker.get('last'):
-                            usd_value = amount * ticker['last']
-                            total += usd_value
-                            print(f"{currency}: {amount:.8f} ≈ ${usd_value:.2f}")
-                        else:
-                            print(f"{currency}: {amount}")
-                    except:
-                        print(f"{currency}: {amount}")
+                    if currency in valuation['details']:
+                        print(f"{currency}: {amount:.8f} ≈ ${valuation['details'][currency]:.2f}")
+                    else:
+                        print(f"{currency}: {amount} (нет цены)")
             
-            print(f"{Fore.GREEN}💰 ОБЩАЯ СТОИМОСТЬ: ~${total:.2f}")
+            print(f"{Fore.GREEN}💰 ОБЩАЯ СТОИМОСТЬ: ~${valuation['total_value']:.2f}")
+            if valuation['unpriced']:
+                print(f"{Fore.YELLOW}⚠️ Не вошли в стоимость (нет пути к {self.valuation.quote}): "
+                      f"{', '.join(valuation['unpriced'])}")
             print(f"{Fore.CYAN}{'='*50}\n")
\ No newline at end of file
@@ -39,6 +39,10 @@ class PaperExchange:
             return real_ticker
         return None
     
+    def get_tickers(self, symbols: List[str] = None) -> Dict[str, Dict]:
+        """Получает тикеры нескольких пар с реальной биржи одним запросом"""
+        return self.real_exchange.get_tickers(symbols)
+    
     def get_balance(self) -> Dict:
         """Возвращает текущий баланс"""
         return self.balance
@@ -8,8 +8,11 @@ from portfolio.tracker import PortfolioTracker
 from portfolio.paper_trader import PaperTrader
 from monitors.price_alert import PriceAlert
 from monitors.arbitrage import ArbitrageScanner
+from monitors.triangular import TriangularDetector
+from monitors.arbitrage_simulator import ArbitrageSimulator
 from data.collector import DataCollector
-from config import PAPER_TRADING, ALERT_THRESHOLDS, EXCHANGES
+from data.collection_job import CollectionJob
+from config import PAPER_TRADING, ALERT_THRESHOLDS, EXCHANGES, TRADING_PAIRS
 
 init(autoreset=True)
 
@@ -152,9 +155,22 @@ class CryptoBot:
         print("1. Выше цены")
         print("2. Ниже цены")
         print("3. Изменение % за 1ч")
+        print("4. Условие по индикаторам")
         
         type_choice = input("Выберите: ").strip()
         
+        if type_choice == '4':
+            print("Пример: RSI14 < 30 and close > MA99 and volume > 2*Volume_MA")
+            expression = input("Условие: ").strip()
+            extra = input("Еще пары через запятую (Enter - только эта): ").strip().upper()
+            symbols = [symbol] + [s.strip() for s in extra.split(',') if s.strip()]
+            symbols = [s if '/' in s else f"{s}/USDT" for s in symbols]
+            try:
+                self.alert.add_expression_alert(expression, symbols)
+            except ValueError as e:
+                print(f"{Fore.RED}❌ {e}")
+            return
+        
         if type_choice == '1':
             condition = 'above'
         elif type_choice == '2':
@@ -168,11 +184,13 @@ class CryptoBot:
         try:
             threshold = float(input("Пороговое значение: ").strip())
             message = input("Сообщение (Enter для авто): ").strip()
+            interval = input("Интервал проверки в секундах (Enter - общий): ").strip()
+            interval = float(interval) if interval else None
             
             if not message:
                 message = f"{symbol} {condition} {threshold}"
             
-            self.alert.add_alert(symbol, condition, threshold, message)
+            self.alert.add_alert(symbol, condition, threshold, message, interval=interval)
             
         except ValueError:
             print(f"{Fore.RED}❌ Неверное значение")
@@ -191,6 +209,9 @@ class CryptoBot:
         print("1. Быстрое сканирование (BTC, ETH, BNB)")
         print("2. Сканировать конкретную пару")
         print("3. Непрерывный мониторинг")
+        print("4. Все общие пары бирж")
+        print("5. Треугольный арбитраж на основной бирже")
+        print("6. Симуляция по записанным стаканам")
         print("0. Назад")
         
         choice = input("Выберите: ").strip()
@@ -208,10 +229,37 @@ class CryptoBot:
                 scanner.monitor_arbitrage(symbols, interval=30)
             except KeyboardInterrupt:
                 print(f"\n{Fore.YELLOW}Мониторинг остановлен")
+        elif choice == '4':
+            quote = input("Валюта котировки (Enter = USDT): ").strip().upper() or 'USDT'
+            scanner.print_universe(quote)
+        elif choice == '5' and scanner.exchanges:
+            detector = TriangularDetector(scanner.exchanges[0])
+            detector.scan()
+            detector.print_cycles()
+        elif choice == '6':
+            symbol = input("Введите пару (например BTC/USDT): ").strip().upper()
+            if '/' not in symbol:
+                symbol = f"{symbol}/USDT"
+            simulator = ArbitrageSimulator.from_tick_store(symbol, exchanges_to_scan)
+            if simulator is None:
+                print(f"{Fore.YELLOW}Нужны записанные стаканы минимум с двух бирж (TICK_RECORDING)")
+            else:
+                simulator.print_sweep([0.1, 0.2, 0.3, 0.5, 0.75, 1.0])
     
     def collect_data(self):
         """Собирает данные для анализа"""
         print(f"\n{Fore.CYAN}📥 СБОР ДАННЫХ")
+        print("1. Одна пара")
+        print("2. Несколько пар со всех бирж")
+        print("3. Свечи из сделок (в реальном времени)")
+        
+        choice = input("Выберите (Enter для 1): ").strip()
+        if choice == '2':
+            self.collect_all_exchanges()
+            return
+        if choice == '3':
+            self.collect_trade_candles()
+            return
         
         symbol = input("Пара (например BTC/USDT): ").strip().upper()
         if '/' not in symbol:
@@ -241,7 +289,8 @@ class CryptoBot:
         limit = input("Количество свечей (Enter для 100): ").strip()
         limit = int(limit) if limit else 100
         
-        df = self.data_collector.get_historical_data(symbol, limit=limit, force_refresh=True)
+        df = self.data_collector.get_historical_data(symbol, limit=limit, force_refresh=True,
+                                                       timeframe=timeframe)
         
         if df is not None:
             df = self.data_collector.add_technical_indicators(df)
@@ -260,6 +309,45 @@ class CryptoBot:
             if analyze == 'y':
                 self.analyze_data(df, symbol)
     
+    def collect_all_exchanges(self):
+        """Параллельно собирает данные со всех бирж из конфигурации"""
+        symbols = input(f"Пары через запятую (Enter для {', '.join(TRADING_PAIRS)}): ").strip().upper()
+        symbols = [s.strip() if '/' in s else f"{s.strip()}/USDT" for s in symbols.split(',')] if symbols else TRADING_PAIRS
+        
+        timeframes = input("Таймфреймы через запятую (Enter для 1h): ").strip()
+        timeframes = [t.strip() for t in timeframes.split(',')] if timeframes else ['1h']
+        
+        limit = input("Количество свечей (Enter для 100): ").strip()
+        limit = int(limit) if limit else 100
+        
+        job = CollectionJob([EXCHANGES['primary']] + EXCHANGES['secondary'], symbols, timeframes, limit)
+        job.run()
+        job.print_report()
+    
+    def collect_trade_candles(self):
+        """Строит свечи из публичных сделок, опрашивая биржу до Ctrl+C"""
+        symbol = input("Пара (например BTC/USDT): ").strip().upper()
+        if '/' not in symbol:
+            symbol = f"{symbol}/USDT"
+        
+        timeframe = input("Таймфрейм (например 10s, 1m; Enter для 1m): ").strip() or '1m'
+        interval = input("Период опроса в секундах (Enter для 5): ").strip()
+        interval = float(interval) if interval else 5
+        
+        print(f"{Fore.CYAN}📡 Сбор сделок {symbol} в свечи {timeframe}... (Ctrl+C для остановки)")
+        try:
+            while True:
+                candles = self.data_collector.ingest_trades(symbol, timeframe)
+                if candles is not None and len(candles):
+                    last = candles.iloc[-1]
+                    print(f"[{candles.index[-1]}] O {last['open']:.2f} H {last['high']:.2f} "
+                          f"L {last['low']:.2f} C {last['close']:.2f} V {last['volume']:.4f} "
+                          f"(покупки {last['buy_volume']:.4f}, продажи {last['sell_volume']:.4f}, "
+                          f"сделок {last['trades']:.0f})")
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            print(f"\n{Fore.YELLOW}Сбор сделок остановлен")
+    
     def analyze_data(self, df, symbol):
         """Анализирует собранные данные"""
         print(f"\n{Fore.CYAN}📊 СТАТИСТИКА {symbol}")
@@ -450,6 +538,11 @@ class CryptoBot:
             from config import RISK_MANAGEMENT
             print(f"Макс. размер сделки: ${RISK_MANAGEMENT['max_trade_size_usdt']}")
             print(f"Макс. дневной убыток: ${RISK_MANAGEMENT['max_daily_loss_usdt']}")
+        
+        from data.frame_cache import frame_cache
+        stats = frame_cache.get_stats()
+        print(f"Кэш свечей: {stats['entries']} записей, {stats['bytes_held'] / 1024 / 1024:.1f}"
+              f" из {stats['max_bytes'] / 1024 / 1024:.0f} МБ, попаданий {stats['hit_rate']:.0f}%")
     
     def run_interactive(self):
         """Запускает интерактивный режим"""
@@ -458,6 +551,8 @@ class CryptoBot:
             choice = input(f"\n{Fore.YELLOW}👉 Выберите действие: ").strip()
             
             if choice == '0':
+                # Дожидаемся отправки уведомлений из очередей
+                self.alert.notifier.close()
                 print(f"{Fore.GREEN}👋 До свидания!")
                 break
             elif choice == '1':
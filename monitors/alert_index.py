@@ -0,0 +1,69 @@
+# monitors/alert_index.py
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, List, Optional, Tuple
+
+
+class ThresholdIndex:
+    """
+    Индекс ценовых порогов по парам: отсортированные списки (порог, id)
+    для условий 'above' и 'below'. Сработавшие при новой цене оповещения
+    находятся двоичным поиском - проверяется только диапазон, который цена
+    пересекла, а не все оповещения
+    """
+
+    def __init__(self):
+        self._above = {}  # пара -> [(порог, id)] по возрастанию
+        self._below = {}
+
+    def __len__(self):
+        return sum(len(items) for items in self._above.values()) + sum(len(items) for items in self._below.values())
+
+    def _side(self, condition: str) -> Dict[str, List[Tuple[float, int]]]:
+        return self._above if condition == 'above' else self._below
+
+    def add(self, symbol: str, condition: str, threshold: float, alert_id: int):
+        insort(self._side(condition).setdefault(symbol, []), (threshold, alert_id))
+
+    def remove(self, symbol: str, condition: str, threshold: float, alert_id: int):
+        items = self._side(condition).get(symbol)
+        if not items:
+            return
+        i = bisect_left(items, (threshold, alert_id))
+        if i < len(items) and items[i] == (threshold, alert_id):
+            del items[i]
+
+    def symbols(self) -> List[str]:
+        """Пары, по которым есть пороги"""
+        return [symbol for symbol in set(self._above) | set(self._below)
+                if self._above.get(symbol) or self._below.get(symbol)]
+
+    def nearest(self, symbol: str) -> Tuple[Optional[float], Optional[float]]:
+        """
+        Ближайшие к цене пороги (наименьший 'above', наибольший 'below').
+        После crossed() оставшиеся пороги лежат по нужную сторону от цены
+        """
+        above, below = self._above.get(symbol), self._below.get(symbol)
+        return (above[0][0] if above else None), (below[-1][0] if below else None)
+
+    def crossed(self, symbol: str, price: float) -> List[int]:
+        """
+        id оповещений, сработавших при цене price (выше порога для 'above',
+        ниже порога для 'below'). Сработавшие удаляются из индекса
+        """
+        triggered = []
+
+        above = self._above.get(symbol)
+        if above:
+            i = bisect_left(above, (price, float('-inf')))
+            if i:
+                triggered.extend(alert_id for _, alert_id in above[:i])
+                del above[:i]
+
+        below = self._below.get(symbol)
+        if below:
+            j = bisect_right(below, (price, float('inf')))
+            if j < len(below):
+                triggered.extend(alert_id for _, alert_id in below[j:])
+                del below[j:]
+
+        return triggered
@@ -0,0 +1,142 @@
+# monitors/alert_scheduler.py
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable, Dict, Hashable, List, Optional
+from colorama import Fore
+
+
+class AlertScheduler:
+    """
+    Планировщик проверок с собственным интервалом для каждого ключа (пары или группы)
+    Сроки хранятся в min-куче; поток спит до ближайшего срока или до изменения
+    расписания и будит callback только для ключей, которым пора. Все ключи,
+    наступившие одновременно, передаются одним списком, чтобы их можно было
+    проверить одним запросом; ключи со сроком в пределах coalesce секунд
+    присоединяются к той же проверке. Остановка - сразу, через условную переменную
+    """
+
+    def __init__(self, callback: Callable[[List[Hashable]], None], name: str = 'alert-scheduler',
+                 coalesce: float = 0.5):
+        self.callback = callback
+        self.name = name
+        self.coalesce = coalesce
+        self._heap = []            # (срок, порядковый номер, ключ)
+        self._due = {}             # ключ -> актуальный срок (устаревшие записи кучи пропускаются)
+        self._intervals = {}       # ключ -> интервал, секунд
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._intervals
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def interval(self, key: Hashable) -> Optional[float]:
+        return self._intervals.get(key)
+
+    def intervals(self) -> Dict[Hashable, float]:
+        with self._cond:
+            return dict(self._intervals)
+
+    def schedule(self, key: Hashable, interval: float, delay: float = None):
+        """
+        Задает интервал ключа. delay - через сколько секунд первая проверка
+        (по умолчанию сразу для нового ключа; для существующего срок не переносится
+        позже, а при уменьшении интервала сдвигается ближе)
+        """
+        interval = max(float(interval), 0.001)
+        with self._cond:
+            now = time.monotonic()
+            current = self._due.get(key)
+            if delay is None and current is None and key in self._intervals:
+                # Ключ сейчас проверяется - новый интервал применится при перепланировании
+                self._intervals[key] = interval
+                return
+            if delay is not None:
+                due = now + delay
+            elif current is None:
+                due = now
+            else:
+                previous = self._intervals.get(key, interval)
+                due = min(current, current - previous + interval)
+            self._intervals[key] = interval
+            if due != current:
+                self._push(key, due)
+                self._cond.notify()
+
+    def set_interval(self, key: Hashable, interval: float):
+        """Меняет интервал ключа без переноса уже назначенного срока на более поздний"""
+        if key in self._intervals:
+            self.schedule(key, interval)
+
+    def unschedule(self, key: Hashable):
+        with self._cond:
+            self._intervals.pop(key, None)
+            self._due.pop(key, None)
+
+    def _push(self, key: Hashable, due: float):
+        self._due[key] = due
+        heapq.heappush(self._heap, (due, next(self._counter), key))
+
+    def _pop_due(self, now: float) -> List[Hashable]:
+        keys = []
+        while self._heap and self._heap[0][0] <= now:
+            due, _, key = heapq.heappop(self._heap)
+            if self._due.get(key) == due:
+                del self._due[key]
+                keys.append(key)
+        return keys
+
+    def _next_due(self) -> Optional[float]:
+        # Устаревшие записи на вершине кучи отбрасываются
+        while self._heap and self._due.get(self._heap[0][2]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def start(self):
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = None):
+        """Останавливает поток сразу; ждет только завершения текущей проверки"""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                if not self._running:
+                    return
+                due = self._next_due()
+                now = time.monotonic()
+                if due is None or due > now:
+                    self._cond.wait(None if due is None else due - now)
+                    continue
+                keys = self._pop_due(now + self.coalesce)
+
+            try:
+                self.callback(keys)
+            except Exception as e:
+                print(f"{Fore.RED}Ошибка плановой проверки: {e}")
+
+            # Следующий срок считается от завершения проверки
+            with self._cond:
+                now = time.monotonic()
+                for key in keys:
+                    interval = self._intervals.get(key)
+                    if interval is not None and key not in self._due:
+                        self._push(key, now + interval)
@@ -1,16 +1,26 @@
 # monitors/arbitrage.py
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
 from colorama import Fore, Style
 from exchanges.connector import ExchangeConnector
+from monitors.quote_matrix import QuoteMatrix
+from monitors.profitability import ProfitabilityEngine
+from monitors.arbitrage_engine import ArbitrageEngine
+from monitors.opportunity_tracker import OpportunityTracker
+from monitors.cadence import CadenceController, PollSchedule
+from config import ARBITRAGE
+import threading
 import time
+import numpy as np
 
 class ArbitrageScanner:
     """Поиск арбитражных возможностей между биржами"""
     
-    def __init__(self, exchanges: List[str], min_spread: float = 0.5):
+    def __init__(self, exchanges: List[str], min_spread: float = 0.5, max_quote_skew_ms: int = None):
         """
         exchanges: список ID бирж для сканирования
         min_spread: минимальный спред в процентах для сигнала
+        max_quote_skew_ms: максимальный разрыв во времени между сравниваемыми котировками
         """
         self.exchanges = []
         for exchange_id in exchanges:
@@ -21,40 +31,88 @@ class ArbitrageScanner:
                 print(f"{Fore.RED}❌ Ошибка подключения к {exchange_id}: {e}")
         
         self.min_spread = min_spread
+        self.max_quote_skew_ms = max_quote_skew_ms if max_quote_skew_ms is not None else ARBITRAGE['max_quote_skew_ms']
+        self.stale_rejections = 0  # Сравнения, отброшенные из-за разрыва во времени котировок
+        self._markets = {}         # Рынки бирж (загружаются один раз)
+        
+        # По потоку на биржу: котировки одной пары запрашиваются со всех бирж одновременно
+        self._pool = ThreadPoolExecutor(max_workers=max(1, len(self.exchanges)))
+        self.profitability = ProfitabilityEngine({exchange.exchange_id: exchange for exchange in self.exchanges})
+        self.tracker = OpportunityTracker(ARBITRAGE['tracker_capacity'], ARBITRAGE['tracker_path'])
+        # Интервал опроса пары по волатильности ее спреда и расстоянию до min_spread
+        self.cadence = CadenceController(ARBITRAGE['poll_interval'], ARBITRAGE['max_poll_interval'],
+                                         ARBITRAGE['spread_z_score'], relative=False)
+    
+    @staticmethod
+    def _fetch_quote(exchange: ExchangeConnector, symbol: str) -> Optional[Dict]:
+        """Запрашивает котировку и отмечает время ее получения"""
+        try:
+            ticker = exchange.get_ticker(symbol)
+        except Exception as e:
+            print(f"{Fore.RED}Ошибка получения данных с {exchange.exchange_id}: {e}")
+            return None
+        
+        if not ticker or not ticker['bid'] or not ticker['ask']:
+            return None
+        return {
+            'bid': ticker['bid'],
+            'ask': ticker['ask'],
+            'last': ticker['last'],
+            'timestamp': ticker['timestamp'],
+            'received_at': int(time.time() * 1000)
+        }
+    
+    def fetch_quotes(self, symbol: str) -> Dict[str, Dict]:
+        """Котировки пары со всех бирж, запрошенные параллельно"""
+        quotes = self._pool.map(lambda exchange: self._fetch_quote(exchange, symbol), self.exchanges)
+        return {exchange.exchange_id: quote for exchange, quote in zip(self.exchanges, quotes) if quote}
+    
+    @staticmethod
+    def quote_skew(first: Dict, second: Dict) -> int:
+        """
+        Разрыв во времени между котировками (мс) по времени их получения
+        Время бирж не сравнивается: у разных бирж разные часы, а у тикеров
+        пачкой это часто время расчета статистики, а не котировки
+        """
+        return abs(first['received_at'] - second['received_at'])
+    
+    @staticmethod
+    def quote_stale(quote: Dict) -> bool:
+        """Котировка старше max_quote_age_ms по времени своей биржи (проверка включается в конфиге)"""
+        limit = ARBITRAGE['max_quote_age_ms']
+        if limit is None or not quote.get('timestamp'):
+            return False
+        return quote['received_at'] - quote['timestamp'] > limit
         
     def scan_pair(self, symbol: str) -> List[Dict]:
         """
         Сканирует пару на всех биржах и ищет арбитраж
         """
-        prices = {}
-        
-        # Собираем цены со всех бирж
-        for exchange in self.exchanges:
-            try:
-                ticker = exchange.get_ticker(symbol)
-                if ticker:
-                    prices[exchange.exchange_id] = {
-                        'bid': ticker['bid'],
-                        'ask': ticker['ask'],
-                        'last': ticker['last']
-                    }
-            except Exception as e:
-                print(f"{Fore.RED}Ошибка получения данных с {exchange.exchange_id}: {e}")
-            
-            time.sleep(0.5)  # Пауза между запросами
-        
-        if len(prices) < 2:
-            return []
-        
-        # Ищем лучшую цену покупки (самый низкий ask)
-        best_ask_exchange = min(prices.items(), key=lambda x: x[1]['ask'])
-        # Ищем лучшую цену продажи (самый высокий bid)
-        best_bid_exchange = max(prices.items(), key=lambda x: x[1]['bid'])
+        prices = self.fetch_quotes(symbol)
         
         opportunities = []
-        
-        # Проверяем прямой арбитраж
-        if best_bid_exchange[0] != best_ask_exchange[0]:
+        while len(prices) >= 2:
+            # Ищем лучшую цену покупки (самый низкий ask)
+            best_ask_exchange = min(prices.items(), key=lambda x: x[1]['ask'])
+            # Ищем лучшую цену продажи (самый высокий bid)
+            best_bid_exchange = max(prices.items(), key=lambda x: x[1]['bid'])
+            if best_bid_exchange[0] == best_ask_exchange[0]:
+                break
+            
+            # Разнесенные во времени котировки дают ложный спред: устаревшую биржу
+            # исключаем и выбираем лучшую пару из остальных
+            skew = self.quote_skew(best_ask_exchange[1], best_bid_exchange[1])
+            stale = [exchange_id for exchange_id, quote in (best_ask_exchange, best_bid_exchange)
+                     if self.quote_stale(quote)]
+            if not stale and skew > self.max_quote_skew_ms:
+                stale = [min((best_ask_exchange, best_bid_exchange), key=lambda x: x[1]['received_at'])[0]]
+            if stale:
+                self.stale_rejections += 1
+                for exchange_id in stale:
+                    del prices[exchange_id]
+                continue
+            
+            # Проверяем прямой арбитраж
             spread_percent = (best_bid_exchange[1]['bid'] - best_ask_exchange[1]['ask']) / best_ask_exchange[1]['ask'] * 100
             
             if spread_percent > self.min_spread:
@@ -65,8 +123,11 @@ class ArbitrageScanner:
                     'sell_exchange': best_bid_exchange[0],
                     'sell_price': best_bid_exchange[1]['bid'],
                     'spread_percent': spread_percent,
-                    'profit_per_unit': best_bid_exchange[1]['bid'] - best_ask_exchange[1]['ask']
+                    'profit_per_unit': best_bid_exchange[1]['bid'] - best_ask_exchange[1]['ask'],
+                    'quote_skew_ms': skew,
+                    'received_at': max(best_ask_exchange[1]['received_at'], best_bid_exchange[1]['received_at'])
                 })
+            break
         
         return opportunities
     
@@ -80,10 +141,135 @@ class ArbitrageScanner:
             opportunities = self.scan_pair(symbol)
             if opportunities:
                 results[symbol] = opportunities
-            time.sleep(1)  # Пауза между парами
         
         return results
     
+    def _load_markets(self, exchange: ExchangeConnector) -> Dict:
+        if exchange.exchange_id not in self._markets:
+            try:
+                self._markets[exchange.exchange_id] = exchange.exchange.load_markets()
+            except Exception as e:
+                print(f"{Fore.RED}Ошибка загрузки рынков {exchange.exchange_id}: {e}")
+                return {}
+        return self._markets[exchange.exchange_id]
+    
+    def common_symbols(self, quote: str = None) -> List[str]:
+        """
+        Активные спотовые пары, торгующиеся хотя бы на двух биржах
+        quote: оставить только пары с этой валютой котировки (например 'USDT')
+        """
+        counts = {}
+        for markets in self._pool.map(self._load_markets, self.exchanges):
+            for symbol, market in markets.items():
+                if market.get('spot') and market.get('active') is not False:
+                    if quote is None or market.get('quote') == quote:
+                        counts[symbol] = counts.get(symbol, 0) + 1
+        return sorted(symbol for symbol, count in counts.items() if count >= 2)
+    
+    def fetch_quote_matrix(self, symbols: List[str]) -> QuoteMatrix:
+        """Все тикеры каждой биржи одним запросом (биржи параллельно) в матрицу пара × биржа"""
+        def fetch(exchange):
+            tickers = exchange.get_tickers()
+            return tickers, int(time.time() * 1000)
+        
+        tickers, received_at = {}, {}
+        for exchange, (venue_tickers, received) in zip(self.exchanges, self._pool.map(fetch, self.exchanges)):
+            tickers[exchange.exchange_id] = venue_tickers
+            received_at[exchange.exchange_id] = received
+        return QuoteMatrix.from_tickers(symbols, tickers, received_at)
+    
+    def scan_universe(self, symbols: List[str] = None, quote: str = None) -> Dict[str, List]:
+        """
+        Сканирует все общие пары бирж за один запрос к каждой бирже
+        symbols: пары для сканирования (по умолчанию common_symbols(quote))
+        """
+        if symbols is None:
+            symbols = self.common_symbols(quote)
+        if not symbols:
+            return {}
+        
+        matrix = self.fetch_quote_matrix(symbols)
+        best = matrix.best()
+        
+        with np.errstate(invalid='ignore'):
+            candidates = (best['buy'] >= 0) & (best['sell'] >= 0) & (best['buy'] != best['sell'])
+            stale = candidates & (best['skew'] > self.max_quote_skew_ms)
+            if ARBITRAGE['max_quote_age_ms'] is not None:
+                stale |= candidates & (best['age'] > ARBITRAGE['max_quote_age_ms'])
+            found = candidates & ~stale & (best['spread'] > self.min_spread)
+        self.stale_rejections += int(stale.sum())
+        
+        results = {}
+        for i in np.flatnonzero(found):
+            buy, sell = best['buy'][i], best['sell'][i]
+            results[matrix.symbols[i]] = [{
+                'type': 'direct',
+                'buy_exchange': matrix.exchanges[buy],
+                'buy_price': float(best['ask'][i]),
+                'sell_exchange': matrix.exchanges[sell],
+                'sell_price': float(best['bid'][i]),
+                'spread_percent': float(best['spread'][i]),
+                'profit_per_unit': float(best['bid'][i] - best['ask'][i]),
+                'quote_skew_ms': int(best['skew'][i]),
+                'received_at': int(max(matrix.received_at[i, buy], matrix.received_at[i, sell]))
+            }]
+        
+        # Сначала самые большие спреды
+        return dict(sorted(results.items(), key=lambda item: -item[1][0]['spread_percent']))
+    
+    def evaluate_opportunities(self, results: Dict[str, List], depth: int = None) -> Dict[str, List]:
+        """
+        Дополняет возможности исполнимым объемом и чистой прибылью по стаканам
+        (комиссии тейкера и стоимость перевода учитываются). Стаканы всех
+        возможностей запрашиваются параллельно, каждый стакан - один раз
+        """
+        depth = depth or ARBITRAGE['book_depth']
+        exchanges = {exchange.exchange_id: exchange for exchange in self.exchanges}
+        needed = set()
+        for symbol, opportunities in results.items():
+            for opp in opportunities:
+                needed.add((opp['buy_exchange'], symbol))
+                needed.add((opp['sell_exchange'], symbol))
+        
+        needed = list(needed)
+        books = self._pool.map(lambda key: exchanges[key[0]].get_order_book(key[1], depth), needed)
+        books = dict(zip(needed, books))
+        
+        for symbol, opportunities in results.items():
+            for opp in opportunities:
+                buy_book = books.get((opp['buy_exchange'], symbol))
+                sell_book = books.get((opp['sell_exchange'], symbol))
+                evaluation = None
+                if buy_book and sell_book:
+                    evaluation = self.profitability.evaluate(symbol, opp['buy_exchange'], opp['sell_exchange'],
+                                                             buy_book, sell_book)
+                opp['executable_size'] = evaluation['executable_size'] if evaluation else 0.0
+                opp['net_profit'] = evaluation['net_profit'] if evaluation else 0.0
+                opp['profitability'] = evaluation
+        return results
+    
+    def print_universe(self, quote: str = 'USDT', top: int = 20):
+        """Выводит лучшие возможности по всем общим парам бирж"""
+        print(f"\n{Fore.CYAN}{'='*70}")
+        print(f"🌐 СКАНИРОВАНИЕ ВСЕХ ОБЩИХ ПАР ({quote})")
+        print(f"Минимальный спред: {self.min_spread}%")
+        print(f"{'='*70}")
+        
+        started = time.time()
+        symbols = self.common_symbols(quote)
+        self.stale_rejections = 0
+        results = self.scan_universe(symbols)
+        print(f"Пар: {len(symbols)}, бирж: {len(self.exchanges)}, время: {time.time() - started:.2f} с")
+        
+        if self.stale_rejections:
+            print(f"{Fore.YELLOW}⏱ Отброшено сравнений с устаревшими котировками: {self.stale_rejections}")
+        
+        if not results:
+            print(f"{Fore.YELLOW}🤷 Арбитражных возможностей не найдено")
+            return
+        
+        self._print_results(self.evaluate_opportunities(dict(list(results.items())[:top])))
+    
     def print_opportunities(self, symbol: str = None):
         """
         Выводит найденные арбитражные возможности
@@ -98,12 +284,19 @@ class ArbitrageScanner:
         print(f"Минимальный спред: {self.min_spread}%")
         print(f"{'='*70}")
         
+        self.stale_rejections = 0
         results = self.scan_all_pairs(symbols)
         
+        if self.stale_rejections:
+            print(f"{Fore.YELLOW}⏱ Отброшено сравнений с устаревшими котировками: {self.stale_rejections}")
+        
         if not results:
             print(f"{Fore.YELLOW}🤷 Арбитражных возможностей не найдено")
             return
         
+        self._print_results(self.evaluate_opportunities(results))
+    
+    def _print_results(self, results: Dict[str, List]):
         for symbol, opportunities in results.items():
             print(f"\n{Fore.WHITE}{symbol}:")
             for opp in opportunities:
@@ -111,29 +304,111 @@ class ArbitrageScanner:
                 print(f"     Купить на {opp['buy_exchange']}: ${opp['buy_price']:.2f}")
                 print(f"     Продать на {opp['sell_exchange']}: ${opp['sell_price']:.2f}")
                 print(f"     Прибыль: ${opp['profit_per_unit']:.2f} на ед. ({opp['spread_percent']:.2f}%)")
+                print(f"     Разрыв котировок: {opp['quote_skew_ms']} мс")
+                
+                evaluation = opp.get('profitability')
+                if 'profitability' not in opp:
+                    continue
+                if evaluation is None:
+                    print(f"{Fore.RED}     Исполнимый объем: 0 (после комиссий прибыли нет)")
+                    continue
+                color = Fore.GREEN if evaluation['net_profit'] > 0 else Fore.RED
+                if not evaluation['executable_size']:
+                    print(f"{Fore.RED}     Исполнимый объем: 0 (стоимость перевода больше прибыли "
+                          f"с {evaluation['book_size']:.6f} по стаканам)")
+                else:
+                    print(f"     Исполнимый объем: {evaluation['executable_size']:.6f} "
+                          f"(покупка ~${evaluation['buy_avg_price']:.2f}, продажа ~${evaluation['sell_avg_price']:.2f})")
+                transfer = f"${evaluation['transfer_cost']:.2f}" if evaluation['transfer_fee_known'] else "неизвестен"
+                print(f"     Комиссии: ${evaluation['trading_fees']:.2f}, перевод: {transfer}")
+                print(f"{color}     Чистая прибыль: ${evaluation['net_profit']:.2f} ({evaluation['net_percent']:.2f}%)")
+    
+    def _feed_quotes(self, exchange: ExchangeConnector, engine: ArbitrageEngine, schedule: PollSchedule):
+        """
+        Поток биржи: опрашивает котировки пар, которым пора, и передает их движку
+        Не чаще poll_interval; при adaptive_polling пары со спредом далеко от
+        min_spread в спокойном рынке опрашиваются реже. Расписание общее для всех
+        бирж: пара, подошедшая к порогу на одной бирже, сразу опрашивается на остальных
+        """
+        bulk = exchange.exchange.has.get('fetchTickers')
+        venue = exchange.exchange_id
+        started = 0.0
+        while schedule.wait(venue, started + ARBITRAGE['poll_interval']):
+            started = time.time()
+            batch = schedule.due(venue, started)
+            if bulk:
+                tickers = exchange.get_tickers(batch)
+            else:
+                tickers = {}
+                for symbol in batch:
+                    ticker = exchange.get_ticker(symbol)
+                    if ticker:
+                        tickers[symbol] = ticker
+            received_at = int(time.time() * 1000)
+            
+            for symbol, ticker in tickers.items():
+                engine.on_quote(venue, symbol, ticker['bid'], ticker['ask'],
+                                ticker['timestamp'], received_at)
+            for symbol in batch:
+                interval = self._poll_interval(engine, symbol, received_at)
+                # Пара на минимальном интервале близка к порогу: котировки остальных бирж
+                # не должны отставать больше допустимого разрыва, иначе сравнение отбросится
+                schedule.reschedule(symbol, venue, started, interval,
+                                    near=interval <= ARBITRAGE['poll_interval'])
+    
+    def _poll_interval(self, engine: ArbitrageEngine, symbol: str, received_at: int) -> float:
+        """Интервал опроса пары: по времени, за которое спред правдоподобно дойдет до min_spread"""
+        if not ARBITRAGE['adaptive_polling']:
+            return ARBITRAGE['poll_interval']
+        spread = engine.best_spread(symbol)
+        if spread is None:
+            return ARBITRAGE['poll_interval']
+        # Наблюдения от всех бирж общие: спред зависит от котировок каждой из них
+        self.cadence.observe(symbol, spread, received_at)
+        return self.cadence.interval(symbol, abs(self.min_spread - spread), ARBITRAGE['poll_interval'])
     
     def monitor_arbitrage(self, symbols: List[str], interval: int = 30):
         """
         Непрерывный мониторинг арбитража
+        Каждая биржа опрашивается в своем потоке; возможность оценивается сразу при
+        поступлении котировки. interval - период вывода сводки, секунд
         """
         print(f"\n{Fore.CYAN}📡 Запуск мониторинга арбитража...")
         
+        engine = ArbitrageEngine(self.min_spread, self.max_quote_skew_ms)
+        engine.subscribe(self.tracker.on_event)
+        engine.subscribe(self._print_event)
+        schedule = PollSchedule(symbols, [exchange.exchange_id for exchange in self.exchanges],
+                                self.max_quote_skew_ms / 1000)
+        feeders = [threading.Thread(target=self._feed_quotes, args=(exchange, engine, schedule), daemon=True)
+                   for exchange in self.exchanges]
+        for feeder in feeders:
+            feeder.start()
+        
         try:
             while True:
-                print(f"\n{Fore.YELLOW}[{time.strftime('%H:%M:%S')}] Сканирование...")
-                
-                for symbol in symbols:
-                    opportunities = self.scan_pair(symbol)
-                    
-                    if opportunities:
-                        for opp in opportunities:
-                            print(f"{Fore.GREEN}🚨 АРБИТРАЖ {symbol}: {opp['spread_percent']:.2f}%")
-                            print(f"   {opp['buy_exchange']} → {opp['sell_exchange']}")
-                    
-                    time.sleep(2)  # Пауза между символами
-                
-                print(f"{Fore.YELLOW}Ожидание {interval} секунд до следующего сканирования...")
                 time.sleep(interval)
+                print(f"{Fore.YELLOW}[{time.strftime('%H:%M:%S')}] Котировок: {engine.updates}, "
+                      f"открытых возможностей: {len(engine.open)}")
                 
         except KeyboardInterrupt:
-            print(f"\n{Fore.YELLOW}Мониторинг остановлен пользователем")
\ No newline at end of file
+            print(f"\n{Fore.YELLOW}Мониторинг остановлен пользователем")
+        finally:
+            schedule.close()
+            for feeder in feeders:
+                feeder.join()
+            # Возможности, открытые на момент остановки, иначе не попали бы в историю
+            engine.close_all()
+            self.tracker.flush()
+            self.tracker.print_summary()
+    
+    @staticmethod
+    def _print_event(event: Dict):
+        if event['event'] == 'open':
+            print(f"{Fore.GREEN}🚨 АРБИТРАЖ {event['symbol']}: {event['spread_percent']:.2f}%")
+            print(f"   {event['buy_exchange']} → {event['sell_exchange']} "
+                  f"(возраст котировок {event['buy_quote_age_ms']}/{event['sell_quote_age_ms']} мс)")
+        elif event['event'] == 'close':
+            duration = (event['closed_at'] - event['opened_at']) / 1000
+            print(f"{Fore.YELLOW}✖ Закрыт {event['symbol']} {event['buy_exchange']} → {event['sell_exchange']}: "
+                  f"{duration:.1f} с, пик {event['peak_spread']:.2f}%")
@@ -0,0 +1,227 @@
+# monitors/arbitrage_engine.py
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from config import ARBITRAGE
+
+
+class IndexedHeap:
+    """
+    Двоичная min-куча с индексом ключ -> позиция
+    Изменение приоритета и удаление ключа за O(log n)
+    """
+
+    def __init__(self):
+        self._items = []      # [(приоритет, ключ)]
+        self._position = {}   # ключ -> позиция в _items
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return key in self._position
+
+    def update(self, key, priority: float):
+        """Добавляет ключ или меняет его приоритет"""
+        i = self._position.get(key)
+        if i is None:
+            self._items.append((priority, key))
+            self._position[key] = len(self._items) - 1
+            self._sift_up(len(self._items) - 1)
+            return
+        old = self._items[i][0]
+        self._items[i] = (priority, key)
+        if priority < old:
+            self._sift_up(i)
+        else:
+            self._sift_down(i)
+
+    def remove(self, key):
+        i = self._position.pop(key, None)
+        if i is None:
+            return
+        last = self._items.pop()
+        if i < len(self._items):
+            self._items[i] = last
+            self._position[last[1]] = i
+            self._sift_up(i)
+            self._sift_down(self._position[last[1]])
+
+    def top(self) -> Optional[Tuple[float, object]]:
+        return self._items[0] if self._items else None
+
+    def second(self) -> Optional[Tuple[float, object]]:
+        """Второй по приоритету элемент - меньший из потомков корня"""
+        children = self._items[1:3]
+        return min(children, key=lambda item: item[0]) if children else None
+
+    def _swap(self, i: int, j: int):
+        items = self._items
+        items[i], items[j] = items[j], items[i]
+        self._position[items[i][1]] = i
+        self._position[items[j][1]] = j
+
+    def _sift_up(self, i: int):
+        while i > 0:
+            parent = (i - 1) // 2
+            if self._items[i][0] >= self._items[parent][0]:
+                break
+            self._swap(i, parent)
+            i = parent
+
+    def _sift_down(self, i: int):
+        n = len(self._items)
+        while True:
+            smallest = i
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < n and self._items[child][0] < self._items[smallest][0]:
+                    smallest = child
+            if smallest == i:
+                return
+            self._swap(i, smallest)
+            i = smallest
+
+
+class ArbitrageEngine:
+    """
+    Событийная оценка межбиржевого арбитража
+    По каждой паре хранятся кучи лучших цен бирж (минимальный ask, максимальный bid).
+    Новая котировка пересчитывает только свою пару за O(log числа бирж);
+    открытие и закрытие возможности сразу передаются подписчикам
+    """
+
+    def __init__(self, min_spread: float = 0.5, max_quote_skew_ms: int = None):
+        self.min_spread = min_spread
+        self.max_quote_skew_ms = max_quote_skew_ms if max_quote_skew_ms is not None else ARBITRAGE['max_quote_skew_ms']
+        self.max_quote_age_ms = ARBITRAGE['max_quote_age_ms']
+        self._asks = {}    # пара -> IndexedHeap(биржа -> ask)
+        self._bids = {}    # пара -> IndexedHeap(биржа -> -bid)
+        self._quotes = {}  # (пара, биржа) -> котировка
+        self.open = {}     # пара -> открытая возможность
+        self._listeners = []
+        self._lock = threading.Lock()
+        self.updates = 0
+
+    def subscribe(self, listener: Callable[[Dict], None]):
+        """listener(event) вызывается для событий 'open', 'update' (та же возможность) и 'close'"""
+        self._listeners.append(listener)
+
+    def on_quote(self, exchange_id: str, symbol: str, bid: float, ask: float,
+                 timestamp: int = None, received_at: int = None) -> List[Dict]:
+        """Принимает котировку биржи и возвращает порожденные ей события"""
+        received_at = received_at or int(time.time() * 1000)
+        with self._lock:
+            self.updates += 1
+            asks = self._asks.setdefault(symbol, IndexedHeap())
+            bids = self._bids.setdefault(symbol, IndexedHeap())
+            if bid and ask:
+                self._quotes[(symbol, exchange_id)] = {
+                    'bid': bid, 'ask': ask, 'timestamp': timestamp or received_at, 'received_at': received_at
+                }
+                asks.update(exchange_id, ask)
+                bids.update(exchange_id, -bid)
+            else:
+                # Биржа перестала котировать пару
+                self._quotes.pop((symbol, exchange_id), None)
+                asks.remove(exchange_id)
+                bids.remove(exchange_id)
+            events = self._evaluate(symbol, received_at)
+
+        for event in events:
+            for listener in self._listeners:
+                listener(event)
+        return events
+
+    def close_all(self, now: int = None) -> List[Dict]:
+        """Закрывает все открытые возможности (остановка мониторинга) и рассылает события 'close'"""
+        now = now or int(time.time() * 1000)
+        with self._lock:
+            events = [dict(current, event='close', closed_at=now) for current in self.open.values()]
+            self.open = {}
+
+        for event in events:
+            for listener in self._listeners:
+                listener(event)
+        return events
+
+    def _best_pair(self, symbol: str) -> Optional[Tuple[str, str]]:
+        """Лучшие биржи покупки и продажи (разные); при совпадении берется вторая по цене"""
+        asks, bids = self._asks[symbol], self._bids[symbol]
+        best_ask, best_bid = asks.top(), bids.top()
+        if best_ask is None or best_bid is None:
+            return None
+        if best_ask[1] != best_bid[1]:
+            return best_ask[1], best_bid[1]
+
+        second_ask, second_bid = asks.second(), bids.second()
+        candidates = []
+        if second_bid:
+            candidates.append((-second_bid[0] - best_ask[0], best_ask[1], second_bid[1]))
+        if second_ask:
+            candidates.append((-best_bid[0] - second_ask[0], second_ask[1], best_bid[1]))
+        if not candidates:
+            return None
+        _, buy, sell = max(candidates)
+        return buy, sell
+
+    def best_spread(self, symbol: str) -> Optional[float]:
+        """Спред лучшей пары бирж в процентах (без учета разрыва во времени), None - котировок мало"""
+        with self._lock:
+            if symbol not in self._asks:
+                return None
+            pair = self._best_pair(symbol)
+            if pair is None:
+                return None
+            buy_ask = self._quotes[(symbol, pair[0])]['ask']
+            return (self._quotes[(symbol, pair[1])]['bid'] - buy_ask) / buy_ask * 100
+
+    def _evaluate(self, symbol: str, now: int) -> List[Dict]:
+        events = []
+        current = self.open.get(symbol)
+        pair = self._best_pair(symbol)
+
+        opportunity = None
+        if pair:
+            buy, sell = pair
+            buy_quote, sell_quote = self._quotes[(symbol, buy)], self._quotes[(symbol, sell)]
+            # Разрыв - по времени получения; время бирж (разные часы) - только в опциональной проверке возраста
+            skew = abs(buy_quote['received_at'] - sell_quote['received_at'])
+            stale = self.max_quote_age_ms is not None and max(
+                buy_quote['received_at'] - buy_quote['timestamp'],
+                sell_quote['received_at'] - sell_quote['timestamp']) > self.max_quote_age_ms
+            spread = (sell_quote['bid'] - buy_quote['ask']) / buy_quote['ask'] * 100
+            if spread > self.min_spread and skew <= self.max_quote_skew_ms and not stale:
+                opportunity = {
+                    'type': 'direct',
+                    'symbol': symbol,
+                    'buy_exchange': buy,
+                    'buy_price': buy_quote['ask'],
+                    'sell_exchange': sell,
+                    'sell_price': sell_quote['bid'],
+                    'spread_percent': spread,
+                    'profit_per_unit': sell_quote['bid'] - buy_quote['ask'],
+                    'quote_skew_ms': skew,
+                    # Возраст - по нашим часам получения, как и разрыв
+                    'buy_quote_age_ms': now - buy_quote['received_at'],
+                    'sell_quote_age_ms': now - sell_quote['received_at'],
+                    'received_at': now,
+                }
+
+        same = (current is not None and opportunity is not None and
+                (current['buy_exchange'], current['sell_exchange']) == (opportunity['buy_exchange'], opportunity['sell_exchange']))
+
+        if current is not None and not same:
+            del self.open[symbol]
+            events.append(dict(current, event='close', closed_at=now))
+        if opportunity is not None:
+            if same:
+                opportunity['opened_at'] = current['opened_at']
+                opportunity['peak_spread'] = max(current['peak_spread'], opportunity['spread_percent'])
+                self.open[symbol] = opportunity
+                events.append(dict(opportunity, event='update'))
+            else:
+                opportunity['opened_at'] = now
+                opportunity['peak_spread'] = opportunity['spread_percent']
+                self.open[symbol] = opportunity
+                events.append(dict(opportunity, event='open'))
+        return events
@@ -0,0 +1,233 @@
+# monitors/arbitrage_simulator.py
+from typing import Dict, List, Optional, Union
+import numpy as np
+import pandas as pd
+from colorama import Fore
+from config import ALERT_THRESHOLDS, ARBITRAGE, PAPER_TRADING, RISK_MANAGEMENT
+from data.tick_store import TickStore
+from monitors.arbitrage_engine import ArbitrageEngine
+
+
+class BookSeries:
+    """Записанные снимки стакана одной биржи: время и уровни (снимок × уровень)"""
+
+    def __init__(self, frame: pd.DataFrame):
+        depth = sum(1 for column in frame.columns if column.startswith('bid_px_'))
+        self.ts = frame.index.to_numpy().astype('datetime64[ms]').astype(np.int64)
+        self.bid_px = np.column_stack([frame[f'bid_px_{i}'].to_numpy() for i in range(depth)])
+        self.bid_sz = np.column_stack([frame[f'bid_sz_{i}'].to_numpy() for i in range(depth)])
+        self.ask_px = np.column_stack([frame[f'ask_px_{i}'].to_numpy() for i in range(depth)])
+        self.ask_sz = np.column_stack([frame[f'ask_sz_{i}'].to_numpy() for i in range(depth)])
+
+    def __len__(self):
+        return len(self.ts)
+
+    def at(self, timestamp: int) -> int:
+        """Индекс последнего снимка не позже timestamp (-1, если снимков еще нет)"""
+        return int(np.searchsorted(self.ts, timestamp, side='right')) - 1
+
+
+class ArbitrageSimulator:
+    """
+    Бумажное исполнение двухногого арбитража на записанных стаканах
+    Возможности находит тот же ArbitrageEngine, что и мониторинг. Обе ноги
+    отправляются IOC-ордерами по цене обнаружения и исполняются по стакану,
+    действующему в момент прихода ордера (задержка своя у каждой биржи).
+    Объем ограничен стаканом, выбранной нами ликвидностью (она восстанавливается
+    через replenish_ms), балансами на биржах и лимитом сделки. Итог - реализованная
+    прибыль против теоретической (спред при обнаружении × объем); обе - после
+    комиссий, уплаченные комиссии выводятся отдельно
+    """
+
+    def __init__(self, symbol: str, books: Dict[str, BookSeries],
+                 latency_ms: Union[int, Dict[str, int]] = None, fees: Dict[str, float] = None,
+                 inventory: Dict[str, Dict[str, float]] = None, max_trade_usdt: float = None,
+                 replenish_ms: int = None):
+        """
+        books: {биржа: BookSeries}
+        latency_ms: задержка ордера (одна на все биржи или по биржам)
+        fees: комиссии тейкера по биржам
+        inventory: стартовые балансы {биржа: {'base': ..., 'quote': ...}};
+                   по умолчанию на каждой бирже PAPER_TRADING['initial_balance'] в котируемой
+                   валюте и столько же в базовой по первой цене
+        """
+        self.symbol = symbol
+        self.books = books
+        self.venues = list(books)
+
+        latency_ms = ARBITRAGE['sim_latency_ms'] if latency_ms is None else latency_ms
+        self.latency = latency_ms if isinstance(latency_ms, dict) else {venue: latency_ms for venue in self.venues}
+        fees = fees or {}
+        self.fees = {venue: fees.get(venue, ARBITRAGE['default_taker_fee']) for venue in self.venues}
+        self.max_trade_usdt = max_trade_usdt or RISK_MANAGEMENT['max_trade_size_usdt']
+        self.replenish_ms = ARBITRAGE['sim_replenish_ms'] if replenish_ms is None else replenish_ms
+        self.initial_inventory = inventory or self._default_inventory()
+
+        # Все снимки всех бирж в порядке времени: (биржа, индекс снимка)
+        venue_index = np.concatenate([np.full(len(books[v]), i) for i, v in enumerate(self.venues)])
+        row_index = np.concatenate([np.arange(len(books[v])) for v in self.venues])
+        ts = np.concatenate([books[v].ts for v in self.venues])
+        order = np.argsort(ts, kind='stable')
+        self._events = (ts[order], venue_index[order], row_index[order])
+
+    @classmethod
+    def from_tick_store(cls, symbol: str, exchanges: List[str], start=None, end=None,
+                        store: TickStore = None, **kwargs) -> Optional['ArbitrageSimulator']:
+        """Симулятор по стаканам, записанным TickRecorder"""
+        from config import TICK_RECORDING
+        store = store or TickStore(TICK_RECORDING['path'])
+        books = {}
+        for exchange_id in exchanges:
+            frame = store.scan(exchange_id, symbol, 'book', start, end)
+            if frame is not None and len(frame):
+                books[exchange_id] = BookSeries(frame)
+        if len(books) < 2:
+            return None
+        return cls(symbol, books, **kwargs)
+
+    def _default_inventory(self) -> Dict[str, Dict[str, float]]:
+        inventory = {}
+        balance = PAPER_TRADING['initial_balance']
+        for venue, book in self.books.items():
+            mids = (book.bid_px[:, 0] + book.ask_px[:, 0]) / 2
+            mids = mids[np.isfinite(mids)]
+            inventory[venue] = {'base': balance / mids[0] if len(mids) else 0.0, 'quote': balance}
+        return inventory
+
+    def run(self, min_spread: float = None) -> Dict:
+        """
+        Прогон по всем записанным снимкам с порогом min_spread (%)
+        Возвращает сводку; сделки - в self.trades (DataFrame)
+        """
+        min_spread = ALERT_THRESHOLDS['arbitrage_percent'] if min_spread is None else min_spread
+        self.inventory = {venue: dict(balance) for venue, balance in self.initial_inventory.items()}
+        self._consumed = {venue: {} for venue in self.venues}  # биржа -> {(сторона, цена): (объем, до)}
+        trades = []
+
+        engine = ArbitrageEngine(min_spread, ARBITRAGE['max_quote_skew_ms'])
+        ts, venue_index, row_index = self._events
+        for t, v, row in zip(ts.tolist(), venue_index.tolist(), row_index.tolist()):
+            venue = self.venues[v]
+            book = self.books[venue]
+            bid, ask = book.bid_px[row, 0], book.ask_px[row, 0]
+            # Пустая сторона снимка - NaN: такая котировка испортила бы порядок куч движка
+            if not (np.isfinite(bid) and np.isfinite(ask)):
+                continue
+            events = engine.on_quote(venue, self.symbol, bid, ask, t, t)
+            for event in events:
+                if event['event'] == 'open':
+                    trades.append(self._execute(event, t))
+
+        self.trades = pd.DataFrame(trades)
+        return self._summary(min_spread)
+
+    def _execute(self, opportunity: Dict, now: int) -> Dict:
+        buy, sell = opportunity['buy_exchange'], opportunity['sell_exchange']
+        ask, bid = opportunity['buy_price'], opportunity['sell_price']
+        buy_book, sell_book = self.books[buy], self.books[sell]
+        top_ask_size = buy_book.ask_sz[buy_book.at(now), 0]
+        top_bid_size = sell_book.bid_sz[sell_book.at(now), 0]
+
+        # Объем: верх стакана при обнаружении, лимит сделки и балансы обеих бирж
+        buy_fee, sell_fee = self.fees[buy], self.fees[sell]
+        size = min(top_ask_size, top_bid_size, self.max_trade_usdt / ask,
+                   self.inventory[buy]['quote'] / (ask * (1 + buy_fee)), self.inventory[sell]['base'])
+        size = max(size, 0.0)
+        trade = {'time': now, 'buy_exchange': buy, 'sell_exchange': sell, 'spread_percent': opportunity['spread_percent'],
+                 'target': size,
+                 # Теоретическая прибыль - на той же основе, что и реализованная: после комиссий обеих ног
+                 'theoretical_pnl': size * (bid * (1 - sell_fee) - ask * (1 + buy_fee))}
+        if not size > 0:
+            trade.update(bought=0.0, sold=0.0, residual=0.0, fees=0.0, realised_pnl=0.0, status='no_inventory')
+            return trade
+
+        buy_arrival, sell_arrival = now + self.latency[buy], now + self.latency[sell]
+        bought, cost = self._fill(buy, 'ask', buy_arrival, ask, size)
+        sold, proceeds = self._fill(sell, 'bid', sell_arrival, bid, size)
+
+        self.inventory[buy]['base'] += bought
+        self.inventory[buy]['quote'] -= cost * (1 + buy_fee)
+        self.inventory[sell]['base'] -= sold
+        self.inventory[sell]['quote'] += proceeds * (1 - sell_fee)
+
+        # Незахеджированный остаток оценивается по средней цене на момент исполнения
+        mark = self._mid(buy if bought > sold else sell, max(buy_arrival, sell_arrival))
+        residual = bought - sold
+        fees = cost * buy_fee + proceeds * sell_fee
+        realised = proceeds - cost - fees + residual * mark
+
+        if bought == 0 and sold == 0:
+            status = 'missed'
+        elif bought >= size * 0.999 and sold >= size * 0.999:
+            status = 'filled'
+        else:
+            status = 'partial'
+        trade.update(bought=bought, sold=sold, residual=residual, fees=fees, realised_pnl=realised, status=status)
+        return trade
+
+    def _fill(self, venue: str, side: str, arrival: int, limit: float, size: float):
+        """IOC-ордер: исполнение по стакану в момент arrival не хуже limit, с учетом уже выбранной ликвидности"""
+        book = self.books[venue]
+        row = book.at(arrival)
+        prices = (book.ask_px if side == 'ask' else book.bid_px)[row]
+        sizes = np.nan_to_num((book.ask_sz if side == 'ask' else book.bid_sz)[row])
+
+        consumed = self._consumed[venue]
+        available = sizes.copy()
+        for i, price in enumerate(prices):
+            taken = consumed.get((side, price))
+            if taken and taken[1] > arrival:
+                available[i] = max(0.0, available[i] - taken[0])
+
+        acceptable = prices <= limit if side == 'ask' else prices >= limit
+        available = np.where(acceptable & np.isfinite(prices), available, 0.0)
+        take = np.diff(np.minimum(np.cumsum(available), size), prepend=0.0)
+        for price, amount in zip(prices[take > 0], take[take > 0]):
+            previous = consumed.get((side, price))
+            still = previous[0] if previous and previous[1] > arrival else 0.0
+            consumed[(side, price)] = (still + amount, arrival + self.replenish_ms)
+
+        filled = float(take.sum())
+        notional = float(np.nansum(take * np.nan_to_num(prices)))
+        return filled, notional
+
+    def _mid(self, venue: str, timestamp: int) -> float:
+        book = self.books[venue]
+        row = book.at(timestamp)
+        return float((book.bid_px[row, 0] + book.ask_px[row, 0]) / 2)
+
+    def _summary(self, min_spread: float) -> Dict:
+        trades = self.trades
+        if trades.empty:
+            return {'min_spread': min_spread, 'opportunities': 0, 'filled': 0, 'partial': 0, 'missed': 0,
+                    'theoretical_pnl': 0.0, 'realised_pnl': 0.0, 'fees': 0.0, 'capture': np.nan}
+        theoretical = float(trades['theoretical_pnl'].sum())
+        realised = float(trades['realised_pnl'].sum())
+        return {
+            'min_spread': min_spread,
+            'opportunities': len(trades),
+            'filled': int((trades['status'] == 'filled').sum()),
+            'partial': int((trades['status'] == 'partial').sum()),
+            'missed': int((trades['status'] == 'missed').sum()),
+            'theoretical_pnl': theoretical,
+            'realised_pnl': realised,
+            'fees': float(trades['fees'].sum()),
+            'capture': realised / theoretical if theoretical else np.nan,
+        }
+
+    def sweep(self, thresholds: List[float]) -> pd.DataFrame:
+        """Прогоны для набора порогов - для подбора ALERT_THRESHOLDS['arbitrage_percent']"""
+        return pd.DataFrame([self.run(threshold) for threshold in thresholds]).set_index('min_spread')
+
+    def print_sweep(self, thresholds: List[float]):
+        """Выводит результаты перебора порогов"""
+        results = self.sweep(thresholds)
+        print(f"\n{Fore.CYAN}{'='*70}")
+        print(f"🧪 СИМУЛЯЦИЯ АРБИТРАЖА {self.symbol} ({', '.join(self.venues)})")
+        print(f"{'='*70}")
+        for threshold, row in results.iterrows():
+            color = Fore.GREEN if row['realised_pnl'] > 0 else Fore.RED
+            print(f"{color}Порог {threshold:.2f}%: сигналов {row['opportunities']:.0f} "
+                  f"(полностью {row['filled']:.0f}, частично {row['partial']:.0f}, мимо {row['missed']:.0f}), "
+                  f"теория ${row['theoretical_pnl']:.2f}, факт ${row['realised_pnl']:.2f} "
+                  f"(комиссии ${row['fees']:.2f})")
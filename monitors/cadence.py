@@ -0,0 +1,145 @@
+# monitors/cadence.py
+import math
+import threading
+import time
+from typing import List, Optional
+
+
+class CadenceController:
+    """
+    Адаптивный интервал опроса по волатильности и расстоянию до порога
+    Для каждого ключа (пары) хранится экспоненциально сглаженная дисперсия
+    изменения значения в секунду. Если до порога расстояние d, а волатильность
+    sigma, то за t секунд значение правдоподобно сдвигается на z * sigma * sqrt(t),
+    поэтому порог не может быть пересечен раньше t = (d / (z * sigma))^2.
+    Интервал берется таким и ограничивается [min_interval, max_interval]
+    """
+
+    def __init__(self, min_interval: float, max_interval: float, z_score: float = 3.0,
+                 halflife: int = 20, relative: bool = True):
+        """
+        relative: True - значения цены, изменения считаются логарифмами отношения,
+        расстояние задается долей (0.01 = 1%); False - изменения и расстояние в тех же единицах
+        halflife: за сколько наблюдений вес старой дисперсии уменьшается вдвое
+        """
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.z_score = z_score
+        self.relative = relative
+        self.alpha = 1 - 0.5 ** (1 / halflife)
+        self._state = {}   # ключ -> [время последнего значения (мс), значение, дисперсия в секунду]
+        self._lock = threading.Lock()
+
+    def observe(self, key, value: float, timestamp_ms: int):
+        """Учитывает новое значение ключа"""
+        if value is None or (self.relative and value <= 0):
+            return
+        with self._lock:
+            state = self._state.get(key)
+            if state is None:
+                self._state[key] = [timestamp_ms, value, None]
+                return
+            last_ts, last_value, variance = state
+            if timestamp_ms < last_ts:
+                return
+            # Изменения быстрее минимального интервала все равно не наблюдаются чаще него
+            dt = max((timestamp_ms - last_ts) / 1000, self.min_interval)
+            change = math.log(value / last_value) if self.relative else value - last_value
+            rate = change * change / dt
+            state[0], state[1] = timestamp_ms, value
+            state[2] = rate if variance is None else variance + self.alpha * (rate - variance)
+
+    def volatility(self, key) -> Optional[float]:
+        """Стандартное отклонение изменения за секунду (None, пока нет двух наблюдений)"""
+        state = self._state.get(key)
+        if state is None or state[2] is None:
+            return None
+        return math.sqrt(state[2])
+
+    def interval(self, key, distance: Optional[float], default: float) -> float:
+        """
+        Интервал до следующей проверки ключа
+        distance: расстояние до ближайшего порога (None - порогов нет)
+        default: интервал, пока волатильность неизвестна
+        """
+        if distance is None:
+            return self.max_interval
+        if distance <= 0:
+            return self.min_interval
+        sigma = self.volatility(key)
+        if sigma is None:
+            return min(max(default, self.min_interval), self.max_interval)
+        if sigma == 0:
+            return self.max_interval
+        seconds = (distance / (self.z_score * sigma)) ** 2
+        return min(max(seconds, self.min_interval), self.max_interval)
+
+    def forget(self, key):
+        with self._lock:
+            self._state.pop(key, None)
+
+
+class PollSchedule:
+    """
+    Общее расписание опроса ключей (пар) несколькими источниками (биржами)
+    Время следующего опроса каждой пары на каждой бирже хранится в одном месте.
+    Когда опрос одной биржи сокращает интервал пары, срок остальных бирж
+    подтягивается к нему, а их потоки будятся: котировки пары, близкой к порогу,
+    обновляются на всех биржах одновременно, а не по старому расписанию каждой
+    """
+
+    def __init__(self, keys, sources, max_lag: float = None):
+        """max_lag: насколько котировка другого источника может отстать, пока пара близка к порогу, секунд"""
+        self.max_lag = max_lag
+        self._due = {key: {source: 0.0 for source in sources} for key in keys}
+        self._polled = {key: {source: 0.0 for source in sources} for key in keys}
+        self._condition = threading.Condition()
+        self._closed = False
+
+    def due(self, source, now: float) -> List:
+        """Ключи, которые источнику пора опросить"""
+        with self._condition:
+            return [key for key, due in self._due.items() if due[source] <= now]
+
+    def reschedule(self, key, source, polled_at: float, interval: float, near: bool = False):
+        """
+        Отмечает опрос ключа источником и назначает следующий через interval секунд
+        near: пара близка к порогу - остальные источники опрашивают ее не позже,
+        чем их котировка отстанет на max_lag
+        """
+        deadline = polled_at + interval
+        woken = False
+        with self._condition:
+            due, polled = self._due[key], self._polled[key]
+            due[source], polled[source] = deadline, polled_at
+            for other in due:
+                if other == source:
+                    continue
+                target = deadline
+                if near and self.max_lag is not None:
+                    target = min(target, polled[other] + self.max_lag)
+                if target < due[other]:
+                    due[other] = target
+                    woken = True
+            if woken:
+                self._condition.notify_all()
+
+    def wait(self, source, earliest: float) -> bool:
+        """
+        Ждет, пока источнику не придет срок хотя бы одного ключа, но не раньше earliest
+        Просыпается раньше, если срок сократил другой источник. False - расписание закрыто
+        """
+        with self._condition:
+            while not self._closed:
+                now = time.time()
+                wake_at = max(earliest, min((due[source] for due in self._due.values()), default=math.inf))
+                if wake_at <= now:
+                    return True
+                self._condition.wait(wake_at - now)
+            return False
+
+    def close(self):
+        """Будит и останавливает все ожидающие потоки"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
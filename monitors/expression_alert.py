@@ -0,0 +1,214 @@
+# monitors/expression_alert.py
+import ast
+import operator
+from typing import Dict, List, Tuple
+import numpy as np
+import pandas as pd
+from colorama import Fore
+from data.indicators import indicator_node, indicator_pipeline
+
+COMPARE = {ast.Lt: np.less, ast.LtE: np.less_equal, ast.Gt: np.greater, ast.GtE: np.greater_equal,
+           ast.Eq: np.equal, ast.NotEq: np.not_equal}
+ARITHMETIC = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.Div: operator.truediv}
+
+
+def compile_expression(text: str) -> Tuple:
+    """
+    Разбирает условие вида "RSI14 < 30 and close > MA99 and volume > 2*Volume_MA"
+    в дерево узлов-кортежей. Имена - индикаторы из data.indicators (MA50, RSI, BB_lower20_2...)
+    или колонки свечей (open, high, low, close, volume). ValueError при ошибке
+    """
+    try:
+        tree = ast.parse(text.replace('×', '*'), mode='eval').body
+    except SyntaxError as e:
+        raise ValueError(f"Ошибка в условии: {e.msg}")
+    return _compile(tree)
+
+
+def _compile(node) -> Tuple:
+    if isinstance(node, ast.BoolOp):
+        kind = 'and' if isinstance(node.op, ast.And) else 'or'
+        return (kind,) + tuple(_compile(value) for value in node.values)
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+        return ('not', _compile(node.operand))
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+        return ('neg', _compile(node.operand))
+    if isinstance(node, ast.Compare):
+        # Цепочка a < b < c превращается в (a < b) and (b < c)
+        parts, left = [], _compile(node.left)
+        for op, comparator in zip(node.ops, node.comparators):
+            if type(op) not in COMPARE:
+                raise ValueError("Недопустимое сравнение")
+            right = _compile(comparator)
+            parts.append(('cmp', type(op).__name__, left, right))
+            left = right
+        return parts[0] if len(parts) == 1 else ('and',) + tuple(parts)
+    if isinstance(node, ast.BinOp) and type(node.op) in ARITHMETIC:
+        return ('bin', type(node.op).__name__, _compile(node.left), _compile(node.right))
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+        return ('const', float(node.value))
+    if isinstance(node, ast.Name):
+        indicator_node(node.id)  # ValueError для неизвестного индикатора
+        return ('ind', node.id)
+    raise ValueError(f"Недопустимый элемент условия: {type(node).__name__}")
+
+
+def indicator_names(node: Tuple) -> List[str]:
+    """Индикаторы, которые нужны для дерева условия"""
+    if node[0] == 'ind':
+        return [node[1]]
+    if node[0] == 'const':
+        return []
+    names = []
+    for child in node[1:]:
+        if isinstance(child, tuple):
+            names.extend(indicator_names(child))
+    return names
+
+
+class _Evaluator:
+    """Вычисление деревьев условий над векторами по всем парам; общие поддеревья считаются один раз"""
+
+    def __init__(self, values: Dict[str, np.ndarray]):
+        self.values = values
+        self.memo = {}
+
+    def get(self, node: Tuple) -> np.ndarray:
+        result = self.memo.get(node)
+        if result is None:
+            result = self.memo[node] = self._compute(node)
+        return result
+
+    def _compute(self, node: Tuple) -> np.ndarray:
+        kind = node[0]
+        if kind == 'ind':
+            return self.values[node[1]]
+        if kind == 'const':
+            return np.float64(node[1])
+        if kind == 'neg':
+            return -self.get(node[1])
+        if kind == 'not':
+            return np.logical_not(self.get(node[1]))
+        if kind == 'bin':
+            op = ARITHMETIC[getattr(ast, node[1])]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return op(self.get(node[2]), self.get(node[3]))
+        if kind == 'cmp':
+            # Сравнение с NaN (индикатор еще не посчитан) дает False
+            with np.errstate(invalid='ignore'):
+                return COMPARE[getattr(ast, node[1])](self.get(node[2]), self.get(node[3]))
+        if kind == 'and':
+            return np.logical_and.reduce([self.get(child) for child in node[1:]])
+        if kind == 'or':
+            return np.logical_or.reduce([self.get(child) for child in node[1:]])
+        raise ValueError(f"Неизвестный узел: {kind}")
+
+
+class ExpressionAlerts:
+    """
+    Оповещения по условиям над индикаторами для набора пар
+    Условие разбирается один раз при добавлении. На каждой проверке свечи всех
+    пар берутся через DataCollector (кэш свечей), индикаторы считаются общим
+    конвейером, а все условия вычисляются векторно по всем парам сразу.
+    Оповещение срабатывает для пары не чаще одного раза на свечу
+    """
+
+    def __init__(self, exchange_id: str, timeframe: str = '1h', limit: int = 200):
+        self.exchange_id = exchange_id
+        self.timeframe = timeframe
+        self.limit = limit
+        self.alerts = {}   # id -> оповещение
+        self._next_id = 1
+        self._collector = None
+
+    def _get_collector(self):
+        if self._collector is None:
+            from data.collector import DataCollector
+            self._collector = DataCollector(self.exchange_id)
+        return self._collector
+
+    def add(self, expression: str, symbols: List[str], message: str = None, alert_id: int = None) -> int:
+        """
+        Добавляет условие для списка пар (ValueError для некорректного условия)
+        alert_id: внешний id (например, общий с PriceAlert)
+        """
+        tree = compile_expression(expression)
+        alert = {
+            'id': alert_id or self._next_id,
+            'expression': expression,
+            'tree': tree,
+            'indicators': sorted(set(indicator_names(tree))),
+            'symbols': list(symbols),
+            'message': message or expression,
+            'fired': {},   # пара -> время свечи последнего срабатывания
+        }
+        self._next_id = max(self._next_id, alert['id']) + 1
+        self.alerts[alert['id']] = alert
+        return alert['id']
+
+    def remove(self, alert_id: int):
+        self.alerts.pop(alert_id, None)
+
+    def symbols(self) -> List[str]:
+        return sorted({symbol for alert in self.alerts.values() for symbol in alert['symbols']})
+
+    def evaluate(self, frames: Dict[str, pd.DataFrame]) -> List[Tuple[int, str, Dict]]:
+        """
+        Вычисляет все условия по последней свече каждой пары
+        frames: {пара: свечи}. Возвращает [(id, пара, значения индикаторов)] для выполненных условий
+        """
+        symbols = list(frames)
+        names = sorted({name for alert in self.alerts.values() for name in alert['indicators']})
+        if not symbols or not names:
+            return []
+
+        # Вектор значений каждого индикатора по всем парам (последняя свеча)
+        values = {name: np.full(len(symbols), np.nan) for name in names}
+        # Пары без свечей не срабатывают: иначе NaN прошел бы через not (RSI < 30)
+        valid = np.zeros(len(symbols), dtype=bool)
+        for i, symbol in enumerate(symbols):
+            df = frames[symbol]
+            if df is None or df.empty:
+                continue
+            valid[i] = True
+            computed = indicator_pipeline.compute(df, names, key=(self.exchange_id, symbol, self.timeframe))
+            for name in names:
+                values[name][i] = computed[name].iloc[-1]
+
+        evaluator = _Evaluator(values)
+        position = {symbol: i for i, symbol in enumerate(symbols)}
+        matches = []
+        for alert in self.alerts.values():
+            result = np.broadcast_to(evaluator.get(alert['tree']), (len(symbols),))
+            # Индикатор, которому не хватило истории, - NaN: через not или != он дал бы ложное срабатывание
+            ready = valid & np.logical_and.reduce([np.isfinite(values[name]) for name in alert['indicators']])
+            for symbol in alert['symbols']:
+                i = position.get(symbol)
+                if i is not None and ready[i] and result[i]:
+                    matches.append((alert['id'], symbol, {name: values[name][i] for name in alert['indicators']}))
+        return matches
+
+    def check(self) -> List[Tuple[int, str, str]]:
+        """Загружает свечи всех пар и возвращает новые срабатывания [(id, пара, сообщение)]"""
+        symbols = self.symbols()
+        if not symbols:
+            return []
+
+        collector = self._get_collector()
+        frames = {}
+        for symbol in symbols:
+            try:
+                frames[symbol] = collector.get_historical_data(symbol, self.limit, timeframe=self.timeframe)
+            except Exception as e:
+                print(f"{Fore.RED}Ошибка загрузки свечей {symbol}: {e}")
+
+        fired = []
+        for alert_id, symbol, values in self.evaluate(frames):
+            alert = self.alerts[alert_id]
+            candle = frames[symbol].index[-1]
+            if alert['fired'].get(symbol) == candle:
+                continue
+            alert['fired'][symbol] = candle
+            details = ', '.join(f"{name}={value:.2f}" for name, value in values.items())
+            fired.append((alert_id, symbol, f"🚨 {symbol}: {alert['message']} ({details})"))
+        return fired
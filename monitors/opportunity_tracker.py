@@ -0,0 +1,200 @@
+# monitors/opportunity_tracker.py
+import json
+import os
+import threading
+from typing import Dict, Optional, Tuple
+import numpy as np
+import pandas as pd
+from colorama import Fore
+
+# Закрытая возможность в кольцевом буфере и в файле
+RECORD_DTYPE = np.dtype([
+    ('symbol', '<i4'), ('buy_exchange', '<i4'), ('sell_exchange', '<i4'),
+    ('opened_at', '<i8'), ('duration_ms', '<i8'),
+    ('open_spread', '<f4'), ('peak_spread', '<f4'),
+    ('buy_quote_age_ms', '<i4'), ('sell_quote_age_ms', '<i4'), ('quote_skew_ms', '<i4'),
+])
+
+# Границы корзин гистограмм
+DURATION_BINS_MS = np.array([0, 100, 250, 500, 1000, 2000, 5000, 10_000, 30_000, 60_000, 300_000, 1_200_000])
+SPREAD_BINS = np.array([0, 0.25, 0.5, 0.75, 1, 1.5, 2, 3, 5, 10])
+AGE_BINS_MS = np.array([0, 50, 100, 250, 500, 1000, 2000, 5000, 10_000])
+
+
+class OpportunityTracker:
+    """
+    Время жизни арбитражных возможностей (пара, биржа покупки, биржа продажи)
+    Открытые возможности хранятся до закрытия; закрытые попадают в кольцевой
+    буфер фиксированного размера (numpy) и в накопительные гистограммы
+    длительности, пикового спреда и возраста котировок. Память ограничена
+    емкостью буфера; при заданном path записи дописываются в двоичный файл
+    """
+
+    def __init__(self, capacity: int = 100_000, path: Optional[str] = None, flush_every: int = 256):
+        self.capacity = capacity
+        self.path = path
+        self.flush_every = flush_every
+
+        self._records = np.zeros(capacity, dtype=RECORD_DTYPE)
+        self._pos = 0
+        self.closed = 0
+        self._pending = []
+
+        self.histograms = {
+            'duration_ms': np.zeros(len(DURATION_BINS_MS), dtype=np.int64),
+            'peak_spread': np.zeros(len(SPREAD_BINS), dtype=np.int64),
+            'quote_age_ms': np.zeros(len(AGE_BINS_MS), dtype=np.int64),
+        }
+
+        self._names = {}   # имя -> код (пары и биржи хранятся в записях кодами)
+        self.names = []
+        # Коды продолжают уже сохраненный файл
+        if path and os.path.exists(path + '.names.json'):
+            with open(path + '.names.json', 'r') as f:
+                for name in json.load(f):
+                    self._code(name)
+        self.open = {}     # (пара, покупка, продажа) -> открытая возможность
+        self._lock = threading.Lock()
+
+    def _code(self, name: str) -> int:
+        code = self._names.get(name)
+        if code is None:
+            code = self._names[name] = len(self.names)
+            self.names.append(name)
+        return code
+
+    def on_event(self, event: Dict):
+        """Подписчик событий ArbitrageEngine"""
+        key = (event['symbol'], event['buy_exchange'], event['sell_exchange'])
+        with self._lock:
+            if event['event'] == 'open':
+                self.open[key] = {
+                    'opened_at': event['opened_at'],
+                    'open_spread': event['spread_percent'],
+                    'peak_spread': event['spread_percent'],
+                    'buy_quote_age_ms': event['buy_quote_age_ms'],
+                    'sell_quote_age_ms': event['sell_quote_age_ms'],
+                    'quote_skew_ms': event['quote_skew_ms'],
+                }
+            elif event['event'] == 'update' and key in self.open:
+                record = self.open[key]
+                record['peak_spread'] = max(record['peak_spread'], event['spread_percent'])
+            elif event['event'] == 'close':
+                record = self.open.pop(key, None)
+                if record is not None:
+                    self._close(key, record, event['closed_at'])
+
+    def _close(self, key: Tuple[str, str, str], record: Dict, closed_at: int):
+        row = np.array([(self._code(key[0]), self._code(key[1]), self._code(key[2]),
+                         record['opened_at'], closed_at - record['opened_at'],
+                         record['open_spread'], record['peak_spread'],
+                         record['buy_quote_age_ms'], record['sell_quote_age_ms'], record['quote_skew_ms'])],
+                       dtype=RECORD_DTYPE)
+        self._records[self._pos] = row[0]
+        self._pos = (self._pos + 1) % self.capacity
+        self.closed += 1
+
+        histograms = self.histograms
+        histograms['duration_ms'][np.searchsorted(DURATION_BINS_MS, row['duration_ms'][0], side='right') - 1] += 1
+        histograms['peak_spread'][np.searchsorted(SPREAD_BINS, row['peak_spread'][0], side='right') - 1] += 1
+        age = max(record['buy_quote_age_ms'], record['sell_quote_age_ms'])
+        histograms['quote_age_ms'][np.searchsorted(AGE_BINS_MS, max(age, 0), side='right') - 1] += 1
+
+        if self.path:
+            self._pending.append(row)
+            if len(self._pending) >= self.flush_every:
+                self._flush()
+
+    def records(self) -> np.ndarray:
+        """Закрытые возможности из буфера (последние capacity) в порядке закрытия"""
+        with self._lock:
+            if self.closed < self.capacity:
+                return self._records[:self.closed].copy()
+            return np.roll(self._records, -self._pos)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Закрытые возможности из буфера как DataFrame с именами пар и бирж"""
+        return self._frame(self.records(), self.names)
+
+    @staticmethod
+    def _frame(records: np.ndarray, names) -> pd.DataFrame:
+        names = np.array(names, dtype=object)
+        df = pd.DataFrame({name: records[name] for name in RECORD_DTYPE.names})
+        for column in ('symbol', 'buy_exchange', 'sell_exchange'):
+            df[column] = names[records[column]] if len(records) else []
+        df['opened_at'] = pd.to_datetime(df['opened_at'], unit='ms')
+        return df
+
+    def histogram(self, field: str = 'duration_ms', symbol: str = None) -> pd.Series:
+        """
+        Гистограмма по всем закрытым возможностям (field: duration_ms, peak_spread, quote_age_ms)
+        С symbol считается по записям буфера этой пары
+        """
+        bins = {'duration_ms': DURATION_BINS_MS, 'peak_spread': SPREAD_BINS, 'quote_age_ms': AGE_BINS_MS}[field]
+        if symbol is None:
+            counts = self.histograms[field].copy()
+        else:
+            records = self.records()
+            records = records[records['symbol'] == self._names.get(symbol, -1)]
+            if field == 'quote_age_ms':
+                values = np.maximum(records['buy_quote_age_ms'], records['sell_quote_age_ms']).clip(0)
+            else:
+                values = records[field]
+            counts = np.bincount(np.searchsorted(bins, values, side='right') - 1, minlength=len(bins))
+
+        labels = [f"{low}-{high}" for low, high in zip(bins[:-1], bins[1:])] + [f"{bins[-1]}+"]
+        return pd.Series(counts, index=labels, name=field)
+
+    def summary(self) -> Dict:
+        """Сводка по закрытым возможностям из буфера"""
+        records = self.records()
+        if not len(records):
+            return {'closed': self.closed, 'open': len(self.open)}
+        durations = records['duration_ms']
+        return {
+            'closed': self.closed,
+            'open': len(self.open),
+            'median_duration_ms': float(np.median(durations)),
+            'p90_duration_ms': float(np.percentile(durations, 90)),
+            'median_peak_spread': float(np.median(records['peak_spread'])),
+            'median_quote_age_ms': float(np.median(np.maximum(records['buy_quote_age_ms'],
+                                                              records['sell_quote_age_ms']))),
+        }
+
+    def _flush(self):
+        if not self._pending:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(self.path, 'ab') as f:
+            f.write(np.concatenate(self._pending).tobytes())
+        with open(self.path + '.names.json', 'w') as f:
+            json.dump(self.names, f)
+        self._pending = []
+
+    def flush(self):
+        """Дописывает накопленные записи в файл"""
+        with self._lock:
+            if self.path:
+                self._flush()
+
+    @staticmethod
+    def load(path: str) -> pd.DataFrame:
+        """Читает сохраненные записи как DataFrame"""
+        records = np.fromfile(path, dtype=RECORD_DTYPE)
+        with open(path + '.names.json', 'r') as f:
+            names = json.load(f)
+        return OpportunityTracker._frame(records, names)
+
+    def print_summary(self):
+        """Выводит сводку и гистограмму длительности"""
+        summary = self.summary()
+        print(f"\n{Fore.CYAN}📈 Возможностей закрыто: {summary['closed']}, открыто: {summary['open']}")
+        if 'median_duration_ms' not in summary:
+            return
+        print(f"   Длительность: медиана {summary['median_duration_ms']:.0f} мс, "
+              f"90% {summary['p90_duration_ms']:.0f} мс")
+        print(f"   Пиковый спред (медиана): {summary['median_peak_spread']:.2f}%, "
+              f"возраст котировок (медиана): {summary['median_quote_age_ms']:.0f} мс")
+        for label, count in self.histogram('duration_ms').items():
+            if count:
+                print(f"   {label:>16} мс: {count}")
@@ -1,43 +1,118 @@
 # monitors/price_alert.py
+import math
 import time
 import threading
-from typing import Dict, List, Callable
+from typing import Dict, List, Callable, Optional
 from colorama import Fore, Style
 from datetime import datetime
 from utils.notifications import NotificationManager
+from monitors.alert_index import ThresholdIndex
+from monitors.price_window import PriceWindow
+from monitors.expression_alert import ExpressionAlerts
+from monitors.alert_scheduler import AlertScheduler
+from monitors.cadence import CadenceController
+from config import EXCHANGES, PRICE_ALERTS
+
+EXPRESSIONS = '*expressions*'  # Ключ планировщика для условий по индикаторам
 
 class PriceAlert:
     """Мониторинг цен и отправка уведомлений"""
     
     def __init__(self, exchange):
         self.exchange = exchange
-        self.alerts = []
+        self.alerts = {}           # id -> оповещение
+        self._next_id = 1
+        self.index = ThresholdIndex()  # Пороги 'above'/'below' по парам
+        self.other = {}            # пара -> id оповещений других условий
+        self.by_symbol = {}        # пара -> id всех активных оповещений пары
+        self.last_prices = {}      # пара -> последняя цена
+        self.windows = {}          # пара -> PriceWindow (общее окно для всех оповещений пары)
+        # Условия по индикаторам (PaperExchange берет цены с основной биржи)
+        self.expressions = ExpressionAlerts(getattr(exchange, 'exchange_id', EXCHANGES['primary']))
+        self._lock = threading.Lock()
         self.notifier = NotificationManager()
         self.running = False
-        self.thread = None
+        self.interval = 60         # Интервал проверки по умолчанию, секунд
+        self.scheduler = AlertScheduler(self._check_due, name='price-alerts')
+        self.cadence = CadenceController(PRICE_ALERTS['min_interval'], PRICE_ALERTS['max_interval'],
+                                         PRICE_ALERTS['z_score'])
         
-    def add_alert(self, symbol: str, condition: str, threshold: float, message: str = None):
+    def add_alert(self, symbol: str, condition: str, threshold: float, message: str = None,
+                  interval: float = None):
         """
         Добавляет ценовое оповещение
         condition: 'above', 'below', 'change_percent'
+        interval: собственный интервал проверки, секунд (по умолчанию общий)
         """
-        alert = {
-            'id': len(self.alerts) + 1,
-            'symbol': symbol,
-            'condition': condition,
-            'threshold': threshold,
-            'message': message or f"{symbol} {condition} {threshold}",
-            'active': True,
-            'last_value': None,
-            'created_at': datetime.now()
-        }
-        self.alerts.append(alert)
+        with self._lock:
+            alert = {
+                'id': self._next_id,
+                'symbol': symbol,
+                'condition': condition,
+                'threshold': threshold,
+                'message': message or f"{symbol} {condition} {threshold}",
+                'active': True,
+                'last_value': None,
+                'interval': interval,
+                'created_at': datetime.now()
+            }
+            self._next_id += 1
+            self.alerts[alert['id']] = alert
+            self._index_alert(alert)
+        self._reschedule(symbol)
         print(f"{Fore.GREEN}✅ Оповещение #{alert['id']} добавлено: {alert['message']}")
         return alert['id']
     
+    def add_expression_alert(self, expression: str, symbols: List[str], message: str = None,
+                             interval: float = None):
+        """
+        Добавляет оповещение по условию над индикаторами, например
+        "RSI14 < 30 and close > MA99 and volume > 2*Volume_MA"
+        Срабатывает не чаще раза на свечу и остается активным
+        """
+        with self._lock:
+            alert_id = self.expressions.add(expression, symbols, message, alert_id=self._next_id)
+            self.alerts[alert_id] = {
+                'id': alert_id,
+                'symbol': ', '.join(symbols),
+                'condition': 'expression',
+                'threshold': None,
+                'message': message or expression,
+                'active': True,
+                'last_value': None,
+                'interval': interval,
+                'created_at': datetime.now()
+            }
+            self._next_id += 1
+        self._reschedule(EXPRESSIONS)
+        print(f"{Fore.GREEN}✅ Оповещение #{alert_id} добавлено: {message or expression}")
+        return alert_id
+    
+    def _index_alert(self, alert: Dict):
+        self.by_symbol.setdefault(alert['symbol'], set()).add(alert['id'])
+        if alert['condition'] in ('above', 'below'):
+            self.index.add(alert['symbol'], alert['condition'], alert['threshold'], alert['id'])
+        else:
+            self.other.setdefault(alert['symbol'], set()).add(alert['id'])
+    
+    def _unindex_alert(self, alert: Dict):
+        if alert['condition'] == 'expression':
+            self.expressions.remove(alert['id'])
+            return
+        self.by_symbol.get(alert['symbol'], set()).discard(alert['id'])
+        if alert['condition'] in ('above', 'below'):
+            self.index.remove(alert['symbol'], alert['condition'], alert['threshold'], alert['id'])
+        else:
+            self.other.get(alert['symbol'], set()).discard(alert['id'])
+    
     def remove_alert(self, alert_id: int):
         """Удаляет оповещение"""
-        self.alerts = [a for a in self.alerts if a['id'] != alert_id]
+        with self._lock:
+            alert = self.alerts.pop(alert_id, None)
+            if alert and alert['active']:
+                self._unindex_alert(alert)
+        if alert:
+            self._reschedule(EXPRESSIONS if alert['condition'] == 'expression' else alert['symbol'])
         print(f"{Fore.YELLOW}🗑️ Оповещение #{alert_id} удалено")
     
     def list_alerts(self):
@@ -47,77 +122,227 @@ class PriceAlert:
             return
         
         print(f"\n{Fore.CYAN}📋 Активные оповещения:")
-        for alert in self.alerts:
+        for alert in list(self.alerts.values()):
             if alert['active']:
                 status = f"{Fore.GREEN}Активно"
-                last = f", последнее: {alert['last_value']}" if alert['last_value'] else ""
+                last_value = self.last_prices.get(alert['symbol'])
+                last = f", последнее: {last_value}" if last_value else ""
                 print(f"  #{alert['id']}: {alert['message']}{last}")
     
-    def check_alerts(self):
-        """Проверяет все оповещения"""
-        for alert in self.alerts:
-            if not alert['active']:
-                continue
+    def _fetch_prices(self, symbols: List[str]) -> Dict[str, float]:
+        """Последние цены всех пар одним запросом к бирже"""
+        if hasattr(self.exchange, 'get_tickers'):
+            tickers = self.exchange.get_tickers(symbols)
+        else:
+            tickers = {symbol: self.exchange.get_ticker(symbol) for symbol in symbols}
+        return {symbol: ticker['last'] for symbol, ticker in tickers.items() if ticker and ticker.get('last')}
+    
+    def _watched_symbols(self) -> set:
+        with self._lock:
+            return set(self.index.symbols()) | {symbol for symbol, ids in self.other.items() if ids}
+    
+    def _symbol_interval(self, key: str) -> Optional[float]:
+        """Интервал ключа планировщика - самый частый среди его активных оповещений"""
+        if key == EXPRESSIONS:
+            alerts = [alert for alert in self.alerts.values()
+                      if alert['active'] and alert['condition'] == 'expression']
+        else:
+            alerts = [self.alerts[alert_id] for alert_id in list(self.by_symbol.get(key, ()))
+                      if alert_id in self.alerts]
+        if not alerts:
+            return None
+        return min(alert.get('interval') or self.interval for alert in alerts)
+    
+    def _reschedule(self, key: str):
+        """Обновляет расписание ключа после изменения его оповещений"""
+        if not self.running:
+            return
+        interval = self._symbol_interval(key)
+        if interval is None:
+            self.scheduler.unschedule(key)
+        elif key in self.scheduler:
+            self.scheduler.set_interval(key, interval)
+        else:
+            self.scheduler.schedule(key, interval)
+    
+    def _check_due(self, keys: List[str]):
+        """Вызывается планировщиком для ключей, которым пора; пары проверяются одним запросом"""
+        symbols = [key for key in keys if key != EXPRESSIONS]
+        if EXPRESSIONS in keys:
+            self._check_expressions()
+        if symbols:
+            self.check_alerts(symbols)
+    
+    def check_alerts(self, symbols: List[str] = None):
+        """
+        Проверяет оповещения по одному снимку цен
+        symbols: только эти пары (по умолчанию все пары и условия по индикаторам)
+        """
+        if symbols is None:
+            if self.expressions.alerts:
+                self._check_expressions()
+            symbols = self._watched_symbols()
+        else:
+            symbols = set(symbols) & self._watched_symbols()
+        if not symbols:
+            return
+        
+        # Цена каждой пары запрашивается один раз, все пары - одним запросом
+        try:
+            prices = self._fetch_prices(sorted(symbols))
+        except Exception as e:
+            print(f"{Fore.RED}Ошибка получения цен для оповещений: {e}")
+            return
+        
+        now = int(time.time() * 1000)
+        for symbol, current_price in prices.items():
+            self.last_prices[symbol] = current_price
+            window = self.windows.get(symbol)
+            if window is None:
+                window = self.windows[symbol] = PriceWindow(PRICE_ALERTS['change_window_sec'] * 1000,
+                                                            PRICE_ALERTS['window_capacity'])
+            window.update(now, current_price)
+            with self._lock:
+                # Сработавшие пороги находятся двоичным поиском и сразу убираются из индекса
+                crossed = self.index.crossed(symbol, current_price)
             
-            try:
-                ticker = self.exchange.get_ticker(alert['symbol'])
-                if not ticker:
+            for alert_id in crossed:
+                alert = self.alerts.get(alert_id)
+                if alert is None:
                     continue
-                
-                current_price = ticker['last']
                 alert['last_value'] = current_price
-                
-                triggered = False
-                
-                if alert['condition'] == 'above' and current_price > alert['threshold']:
-                    triggered = True
-                    message = f"🚨 {alert['symbol']} ПРЕВЫСИЛ {alert['threshold']}! Сейчас: {current_price:.2f}"
-                elif alert['condition'] == 'below' and current_price < alert['threshold']:
-                    triggered = True
-                    message = f"🚨 {alert['symbol']} ОПУСТИЛСЯ НИЖЕ {alert['threshold']}! Сейчас: {current_price:.2f}"
-                elif alert['condition'] == 'change_percent':
-                    # Для изменения в процентах нужно отслеживать историю
-                    pass
-                
-                if triggered:
-                    self.trigger_alert(alert['id'], message)
-                    
+                try:
+                    self.trigger_alert(alert_id, self._message(alert, current_price))
+                except Exception as e:
+                    print(f"{Fore.RED}Ошибка проверки оповещения #{alert_id}: {e}")
+            
+            if PRICE_ALERTS['adaptive'] and self.running:
+                self._adapt_interval(symbol, current_price, now)
+            
+            # Изменение в процентах - по окну цен пары
+            change_ids = self.other.get(symbol)
+            if not change_ids:
+                continue
+            for alert_id in list(change_ids):
+                alert = self.alerts.get(alert_id)
+                if alert is None:
+                    continue
+                # Знак порога задает направление: рост от минимума или падение от максимума
+                threshold = alert['threshold']
+                change = window.change_percent(threshold)
+                if (change < threshold) if threshold >= 0 else (change > threshold):
+                    continue
+                alert['last_value'] = current_price
+                try:
+                    self.trigger_alert(alert_id, self._message(alert, current_price, change))
+                except Exception as e:
+                    print(f"{Fore.RED}Ошибка проверки оповещения #{alert_id}: {e}")
+    
+    def _threshold_distance(self, symbol: str, price: float) -> Optional[float]:
+        """Расстояние от цены до ближайшего порога пары (доля, логарифм отношения)"""
+        distances = []
+        with self._lock:
+            above, below = self.index.nearest(symbol)
+            change_ids = list(self.other.get(symbol, ()))
+        if above:
+            distances.append(math.log(above / price))
+        if below:
+            distances.append(math.log(price / below))
+        if change_ids:
+            # Сколько осталось до порога изменения в окне
+            window = self.windows[symbol]
+            remaining = []
+            for alert_id in change_ids:
+                if alert_id not in self.alerts:
+                    continue
+                threshold = self.alerts[alert_id]['threshold']
+                change = window.change_percent(threshold) or 0.0
+                remaining.append(max(0.0, threshold - change if threshold >= 0 else change - threshold))
+            if remaining:
+                distances.append(min(remaining) / 100)
+        return min(distances) if distances else None
+    
+    def _adapt_interval(self, symbol: str, price: float, now: int):
+        """
+        Подстраивает интервал проверки пары: чем ближе порог и выше волатильность,
+        тем чаще. Собственный интервал оповещения остается верхней границей
+        """
+        self.cadence.observe(symbol, price, now)
+        interval = self.cadence.interval(symbol, self._threshold_distance(symbol, price),
+                                         self._symbol_interval(symbol) or self.interval)
+        explicit = [self.alerts[alert_id]['interval'] for alert_id in list(self.by_symbol.get(symbol, ()))
+                    if alert_id in self.alerts and self.alerts[alert_id].get('interval')]
+        if explicit:
+            interval = min(interval, min(explicit))
+        self.scheduler.set_interval(symbol, interval)
+    
+    def _check_expressions(self):
+        """Условия по индикаторам: векторно по всем парам, не чаще раза на свечу"""
+        try:
+            fired = self.expressions.check()
+        except Exception as e:
+            print(f"{Fore.RED}Ошибка проверки условий по индикаторам: {e}")
+            return
+        
+        for alert_id, symbol, message in fired:
+            try:
+                self.notifier.send_notification(message)
+                print(f"\n{Fore.RED}🚨 СРАБОТАЛО ОПОВЕЩЕНИЕ #{alert_id}: {message}")
             except Exception as e:
-                print(f"{Fore.RED}Ошибка проверки оповещения #{alert['id']}: {e}")
+                print(f"{Fore.RED}Ошибка проверки оповещения #{alert_id}: {e}")
+    
+    @staticmethod
+    def _message(alert: Dict, current_price: float, change: float = None) -> str:
+        if alert['condition'] == 'change_percent':
+            minutes = PRICE_ALERTS['change_window_sec'] // 60
+            return f"🚨 {alert['symbol']} ИЗМЕНИЛСЯ НА {change:+.2f}% за {minutes} мин! Сейчас: {current_price:.2f}"
+        if alert['condition'] == 'above':
+            return f"🚨 {alert['symbol']} ПРЕВЫСИЛ {alert['threshold']}! Сейчас: {current_price:.2f}"
+        return f"🚨 {alert['symbol']} ОПУСТИЛСЯ НИЖЕ {alert['threshold']}! Сейчас: {current_price:.2f}"
     
     def trigger_alert(self, alert_id: int, message: str):
         """Активирует оповещение"""
-        for alert in self.alerts:
-            if alert['id'] == alert_id:
-                # Отправляем уведомление
-                self.notifier.send_notification(message)
-                
-                # Деактивируем одноразовое оповещение
-                alert['active'] = False
-                
-                print(f"\n{Fore.RED}{'!'*50}")
-                print(f"🚨 СРАБОТАЛО ОПОВЕЩЕНИЕ #{alert_id}")
-                print(f"{message}")
-                print(f"{Fore.RED}{'!'*50}\n")
-                break
+        alert = self.alerts.get(alert_id)
+        if alert is None:
+            return
+        
+        # Деактивируем одноразовое оповещение
+        if alert['active']:
+            alert['active'] = False
+            with self._lock:
+                self._unindex_alert(alert)
+            self._reschedule(alert['symbol'])
+        
+        # Отправляем уведомление
+        self.notifier.send_notification(message)
+        
+        print(f"\n{Fore.RED}{'!'*50}")
+        print(f"🚨 СРАБОТАЛО ОПОВЕЩЕНИЕ #{alert_id}")
+        print(f"{message}")
+        print(f"{Fore.RED}{'!'*50}\n")
     
     def start_monitoring(self, interval_seconds: int = 60):
-        """Запускает мониторинг в фоне"""
+        """
+        Запускает мониторинг в фоне
+        interval_seconds - интервал для оповещений без собственного интервала;
+        каждая пара проверяется со своей частотой, поток просыпается только к сроку
+        """
+        self.interval = interval_seconds
         self.running = True
-        self.thread = threading.Thread(target=self._monitor_loop, args=(interval_seconds,))
-        self.thread.daemon = True
-        self.thread.start()
+        keys = self._watched_symbols()
+        if self.expressions.alerts:
+            keys.add(EXPRESSIONS)
+        for key in keys:
+            interval = self._symbol_interval(key)
+            if interval is not None:
+                self.scheduler.schedule(key, interval)
+        self.scheduler.start()
         print(f"{Fore.GREEN}📡 Мониторинг цен запущен (интервал: {interval_seconds}с)")
     
     def stop_monitoring(self):
-        """Останавливает мониторинг"""
+        """Останавливает мониторинг без ожидания очередного интервала"""
         self.running = False
-        if self.thread:
-            self.thread.join()
-        print(f"{Fore.YELLOW}📡 Мониторинг остановлен")
-    
-    def _monitor_loop(self, interval: int):
-        """Основной цикл мониторинга"""
-        while self.running:
-            self.check_alerts()
-            time.sleep(interval)
\ No newline at end of file
+        self.scheduler.stop()
+        for key in list(self.scheduler.intervals()):
+            self.scheduler.unschedule(key)
+        print(f"{Fore.YELLOW}📡 Мониторинг остановлен")
\ No newline at end of file
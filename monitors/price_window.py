@@ -0,0 +1,83 @@
+# monitors/price_window.py
+from collections import deque
+from typing import Optional
+import numpy as np
+
+
+class PriceWindow:
+    """
+    Цены одной пары за скользящее окно времени
+    Кольцевой буфер фиксированного размера (время, цена) и монотонные очереди
+    номеров записей для минимума и максимума окна: обновление и запрос
+    за амортизированное O(1), память ограничена capacity
+    """
+
+    def __init__(self, window_ms: int = 3_600_000, capacity: int = 4096):
+        self.window_ms = window_ms
+        self.capacity = capacity
+        self._ts = np.zeros(capacity, dtype=np.int64)
+        self._prices = np.zeros(capacity, dtype=np.float64)
+        self._seq = 0            # Номер следующей записи
+        self._min = deque()      # Номера записей с возрастающими ценами
+        self._max = deque()      # Номера записей с убывающими ценами
+
+    def __len__(self):
+        return min(self._seq, self.capacity)
+
+    def update(self, timestamp_ms: int, price: float):
+        seq = self._seq
+        slot = seq % self.capacity
+        self._ts[slot] = timestamp_ms
+        self._prices[slot] = price
+        self._seq += 1
+
+        prices = self._prices
+        while self._min and prices[self._min[-1] % self.capacity] >= price:
+            self._min.pop()
+        self._min.append(seq)
+        while self._max and prices[self._max[-1] % self.capacity] <= price:
+            self._max.pop()
+        self._max.append(seq)
+
+        self._expire(timestamp_ms)
+
+    def _expire(self, now_ms: int):
+        """Убирает из очередей записи старше окна и затертые в кольцевом буфере"""
+        oldest = self._seq - self.capacity
+        start = now_ms - self.window_ms
+        for extremes in (self._min, self._max):
+            while extremes and (extremes[0] < oldest or self._ts[extremes[0] % self.capacity] < start):
+                extremes.popleft()
+
+    @property
+    def last(self) -> Optional[float]:
+        return float(self._prices[(self._seq - 1) % self.capacity]) if self._seq else None
+
+    @property
+    def low(self) -> Optional[float]:
+        return float(self._prices[self._min[0] % self.capacity]) if self._min else None
+
+    @property
+    def high(self) -> Optional[float]:
+        return float(self._prices[self._max[0] % self.capacity]) if self._max else None
+
+    def rise_percent(self) -> Optional[float]:
+        """Рост текущей цены от минимума окна, % (0 и больше)"""
+        if not self._seq:
+            return None
+        low = self.low
+        return (self.last - low) / low * 100 if low else 0.0
+
+    def fall_percent(self) -> Optional[float]:
+        """Падение текущей цены от максимума окна, % (0 и меньше)"""
+        if not self._seq:
+            return None
+        high = self.high
+        return (self.last - high) / high * 100 if high else 0.0
+
+    def change_percent(self, threshold: float) -> Optional[float]:
+        """
+        Движение цены в окне до текущей в направлении порога, в процентах:
+        threshold >= 0 - рост от минимума, threshold < 0 - падение от максимума
+        """
+        return self.rise_percent() if threshold >= 0 else self.fall_percent()
@@ -0,0 +1,166 @@
+# monitors/profitability.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+import numpy as np
+from config import ARBITRAGE
+
+
+def book_side(levels) -> Tuple[np.ndarray, np.ndarray]:
+    """Уровни стакана [[цена, объем], ...] -> (цены, накопленный объем)"""
+    if not levels:
+        return np.empty(0), np.empty(0)
+    table = np.asarray(levels, dtype=np.float64)[:, :2]
+    return table[:, 0], np.cumsum(table[:, 1])
+
+
+def walk_books(ask_prices: np.ndarray, ask_cum: np.ndarray, bid_prices: np.ndarray, bid_cum: np.ndarray,
+               buy_fee: float, sell_fee: float) -> Optional[Dict]:
+    """
+    Проход по двум стаканам: покупка по ask одной биржи, продажа по bid другой
+    Между точками излома (накопленные объемы обоих стаканов) цены обеих сторон
+    постоянны, поэтому маржинальная прибыль считается сразу для всех отрезков.
+    Она убывает с объемом - исполнимый объем заканчивается на последнем
+    отрезке с положительной прибылью
+    """
+    limit = min(ask_cum[-1], bid_cum[-1]) if len(ask_cum) and len(bid_cum) else 0
+    if limit <= 0:
+        return None
+
+    points = np.union1d(ask_cum, bid_cum)
+    points = np.append(points[points < limit], limit)
+    sizes = np.diff(points, prepend=0.0)
+
+    # Уровень стакана для каждого отрезка: первый, чей накопленный объем его покрывает
+    ask = ask_prices[np.searchsorted(ask_cum, points, side='left')]
+    bid = bid_prices[np.searchsorted(bid_cum, points, side='left')]
+    margin = bid * (1 - sell_fee) - ask * (1 + buy_fee)
+
+    profitable = int(np.searchsorted(-margin, 0, side='left'))  # margin убывает
+    if profitable == 0:
+        return None
+
+    sizes, ask, bid = sizes[:profitable], ask[:profitable], bid[:profitable]
+    amount = float(points[profitable - 1])
+    cost = float(ask @ sizes)
+    revenue = float(bid @ sizes)
+    fees = cost * buy_fee + revenue * sell_fee
+    return {
+        'amount': amount,
+        'buy_avg': cost / amount,
+        'sell_avg': revenue / amount,
+        'cost': cost,
+        'fees': fees,
+        'gross_profit': revenue - cost - fees,
+    }
+
+
+class ProfitabilityEngine:
+    """
+    Оценка исполнимости арбитража: объем, который можно купить и продать с прибылью
+    после комиссий тейкера и стоимости перевода актива между биржами.
+    Результаты кэшируются по снимку стаканов - повторный расчет для тех же
+    стаканов ничего не стоит
+    """
+
+    def __init__(self, exchanges: Dict, cache_size: int = 1024):
+        """exchanges: {ID биржи: ExchangeConnector}"""
+        self.exchanges = exchanges
+        self.cache_size = cache_size
+        self._results = OrderedDict()
+        self._withdrawal_fees = {}  # (биржа, валюта) -> (комиссия, время получения)
+        self._lock = threading.Lock()
+
+    def taker_fee(self, exchange_id: str, symbol: str) -> float:
+        """Комиссия тейкера: из рынка, из общих комиссий биржи или из настроек"""
+        exchange = self.exchanges[exchange_id].exchange
+        market = (exchange.markets or {}).get(symbol) or {}
+        fee = market.get('taker')
+        if fee is None:
+            fee = exchange.fees.get('trading', {}).get('taker')
+        return fee if fee is not None else ARBITRAGE['default_taker_fee']
+
+    def withdrawal_fee(self, exchange_id: str, currency: str) -> Optional[float]:
+        """
+        Комиссия за вывод валюты с биржи (самая дешевая сеть), в единицах валюты
+        None - комиссия неизвестна
+        """
+        key = (exchange_id, currency)
+        cached = self._withdrawal_fees.get(key)
+        if cached and time.time() - cached[1] < ARBITRAGE['withdrawal_fee_ttl']:
+            return cached[0]
+
+        fee = ARBITRAGE['withdrawal_fees'].get(currency)
+        if fee is None:
+            fee = self._exchange_withdrawal_fee(exchange_id, currency)
+        self._withdrawal_fees[key] = (fee, time.time())
+        return fee
+
+    def _exchange_withdrawal_fee(self, exchange_id: str, currency: str) -> Optional[float]:
+        exchange = self.exchanges[exchange_id].exchange
+        try:
+            currencies = exchange.currencies or exchange.fetch_currencies() or {}
+        except Exception:
+            return None
+
+        info = currencies.get(currency) or {}
+        fees = [network.get('fee') for network in (info.get('networks') or {}).values()
+                if network.get('withdraw') is not False]
+        fees = [fee for fee in fees if fee is not None]
+        if fees:
+            return min(fees)
+        return info.get('fee')
+
+    def evaluate(self, symbol: str, buy_exchange: str, sell_exchange: str,
+                 buy_book: Dict, sell_book: Dict) -> Optional[Dict]:
+        """
+        Исполнимый объем и чистая прибыль для покупки на buy_exchange и продажи на sell_exchange
+        buy_book/sell_book: стаканы в формате ExchangeConnector.get_order_book
+        Возвращает None, если прибыльного объема нет; если прибыль съедает перевод,
+        executable_size = 0 (объем по стаканам - в book_size)
+        """
+        asks, bids = book_side(buy_book['asks']), book_side(sell_book['bids'])
+        # Ключ - все уровни обоих стаканов: timestamp у многих бирж None,
+        # а глубокие уровни меняются без изменения верхнего
+        snapshot = (symbol, buy_exchange, sell_exchange,
+                    asks[0].tobytes(), asks[1].tobytes(), bids[0].tobytes(), bids[1].tobytes())
+        with self._lock:
+            if snapshot in self._results:
+                self._results.move_to_end(snapshot)
+                return self._results[snapshot]
+
+        result = self._evaluate(symbol, buy_exchange, sell_exchange, asks, bids)
+
+        with self._lock:
+            self._results[snapshot] = result
+            while len(self._results) > self.cache_size:
+                self._results.popitem(last=False)
+        return result
+
+    def _evaluate(self, symbol, buy_exchange, sell_exchange, asks, bids) -> Optional[Dict]:
+        buy_fee = self.taker_fee(buy_exchange, symbol)
+        sell_fee = self.taker_fee(sell_exchange, symbol)
+        walk = walk_books(*asks, *bids, buy_fee, sell_fee)
+        if walk is None:
+            return None
+
+        # Купленный актив переводится на биржу продажи
+        base = symbol.split('/')[0]
+        transfer_fee = self.withdrawal_fee(buy_exchange, base)
+        transfer_cost = (transfer_fee or 0) * walk['sell_avg']
+        net_profit = walk['gross_profit'] - transfer_cost
+
+        return {
+            # После перевода сделка убыточна - исполнять нечего
+            'executable_size': walk['amount'] if net_profit > 0 else 0.0,
+            'book_size': walk['amount'],
+            'buy_avg_price': walk['buy_avg'],
+            'sell_avg_price': walk['sell_avg'],
+            'trading_fees': walk['fees'],
+            'transfer_cost': transfer_cost,
+            'transfer_fee_known': transfer_fee is not None,
+            'gross_profit': walk['gross_profit'],
+            'net_profit': net_profit,
+            'net_percent': net_profit / walk['cost'] * 100,
+        }
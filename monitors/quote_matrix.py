@@ -0,0 +1,69 @@
+# monitors/quote_matrix.py
+import numpy as np
+from typing import Dict, List
+
+
+class QuoteMatrix:
+    """
+    Котировки множества пар на нескольких биржах: матрицы пара × биржа
+    (NaN - нет котировки). Лучшие биржи для покупки и продажи по всем парам
+    находятся одной векторной редукцией
+    """
+
+    def __init__(self, symbols: List[str], exchanges: List[str]):
+        self.symbols = list(symbols)
+        self.exchanges = list(exchanges)
+        self.row = {symbol: i for i, symbol in enumerate(self.symbols)}
+        shape = (len(self.symbols), len(self.exchanges))
+        self.bid = np.full(shape, np.nan)
+        self.ask = np.full(shape, np.nan)
+        self.timestamp = np.full(shape, np.nan)    # Время котировки по бирже, мс
+        self.received_at = np.full(shape, np.nan)  # Время получения, мс
+
+    @classmethod
+    def from_tickers(cls, symbols: List[str], tickers: Dict[str, Dict[str, Dict]],
+                     received_at: Dict[str, int]) -> 'QuoteMatrix':
+        """
+        tickers: {биржа: {пара: тикер в формате ExchangeConnector.get_ticker}}
+        received_at: {биржа: время получения ответа}
+        """
+        matrix = cls(symbols, list(tickers))
+        for j, exchange_id in enumerate(matrix.exchanges):
+            matrix.set_column(j, tickers[exchange_id], received_at[exchange_id])
+        return matrix
+
+    def set_column(self, j: int, tickers: Dict[str, Dict], received_at: int):
+        """Заполняет котировки одной биржи"""
+        for symbol, ticker in tickers.items():
+            i = self.row.get(symbol)
+            if i is None:
+                continue
+            # Пустые и нулевые цены считаем отсутствующими
+            self.bid[i, j] = ticker['bid'] or np.nan
+            self.ask[i, j] = ticker['ask'] or np.nan
+            self.timestamp[i, j] = ticker['timestamp'] or np.nan
+            self.received_at[i, j] = received_at
+
+    def best(self) -> Dict[str, np.ndarray]:
+        """
+        Лучшая биржа для покупки (минимальный ask) и продажи (максимальный bid) по каждой паре
+        Возвращает массивы длины len(symbols); -1 в buy/sell - котировок нет
+        skew - разрыв времени получения двух котировок, age - возраст старшей по времени биржи
+        """
+        rows = np.arange(len(self.symbols))
+        buy = np.where(np.isnan(self.ask), np.inf, self.ask).argmin(axis=1)
+        sell = np.where(np.isnan(self.bid), -np.inf, self.bid).argmax(axis=1)
+        ask = self.ask[rows, buy]
+        bid = self.bid[rows, sell]
+        buy[np.isnan(ask)] = -1
+        sell[np.isnan(bid)] = -1
+
+        with np.errstate(invalid='ignore'):
+            spread = (bid - ask) / ask * 100
+            # Разрыв - по времени получения: часы разных бирж между собой не сравниваются
+            skew = np.abs(self.received_at[rows, buy] - self.received_at[rows, sell])
+            # Возраст старшей из двух котировок по часам ее биржи (NaN - биржа время не сообщила)
+            age = np.fmax(self.received_at[rows, buy] - self.timestamp[rows, buy],
+                          self.received_at[rows, sell] - self.timestamp[rows, sell])
+
+        return {'buy': buy, 'sell': sell, 'ask': ask, 'bid': bid, 'spread': spread, 'skew': skew, 'age': age}
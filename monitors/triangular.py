@@ -0,0 +1,234 @@
+# monitors/triangular.py
+import math
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+from colorama import Fore
+from config import ARBITRAGE
+from exchanges.connector import ExchangeConnector
+
+EPS = 1e-12  # Погрешность сравнения весов (логарифмов курсов)
+
+
+class TriangularDetector:
+    """
+    Поиск циклического арбитража на одной бирже (USDT→BTC→ETH→USDT)
+    Граф: вершины - валюты, ребра - обмены по рынкам с весом -log(курс после комиссии).
+    Прибыльный цикл - цикл отрицательного веса.
+    Детектор хранит допустимые потенциалы вершин (d[v] <= d[u] + w(u, v) для всех ребер):
+    подорожание обмена их не нарушает, а после удешевления релаксация идет только
+    от измененных ребер. Цикл обнаруживается обходом дерева предков при релаксации;
+    замыкающее ребро найденного цикла исключается, пока цикл не перестанет быть прибыльным
+    """
+
+    def __init__(self, exchange: ExchangeConnector, min_profit: float = None):
+        """min_profit: минимальная прибыль цикла в процентах для сигнала"""
+        self.exchange = exchange
+        self.min_profit = min_profit if min_profit is not None else ARBITRAGE['triangular_min_profit']
+
+        self.markets = {}     # пара -> (база, котировка, комиссия)
+        self.quotes = {}      # пара -> (bid, ask)
+        self.edges = {}       # валюта -> {валюта: (вес, пара)}
+        self.potential = {}   # валюта -> потенциал
+        self.parent = {}      # валюта -> предок в дереве кратчайших путей
+        self.suppressed = {}  # (u, v) -> ключ цикла, который замыкает ребро
+        self.cycles = {}      # ключ цикла -> описание цикла
+        self._edge_cycles = {}  # (u, v) -> ключи циклов, проходящих через ребро
+        self.relaxations = 0
+
+    def load_markets(self):
+        """Загружает активные спотовые рынки биржи"""
+        exchange = self.exchange.exchange
+        default_fee = exchange.fees.get('trading', {}).get('taker')
+        if default_fee is None:
+            default_fee = ARBITRAGE['default_taker_fee']
+
+        for symbol, market in exchange.load_markets().items():
+            if market.get('spot') and market.get('active') is not False:
+                fee = market.get('taker')
+                self.markets[symbol] = (market['base'], market['quote'], default_fee if fee is None else fee)
+
+    def scan(self) -> List[Dict]:
+        """Обновляет граф всеми тикерами биржи (один запрос) и возвращает новые циклы"""
+        if not self.markets:
+            self.load_markets()
+        return self.update(self.exchange.get_tickers())
+
+    def update(self, tickers: Dict[str, Dict]) -> List[Dict]:
+        """
+        Применяет тикеры {пара: тикер}; обрабатываются только изменившиеся котировки
+        Возвращает новые прибыльные циклы
+        """
+        changed, decreased = [], []
+        for symbol, ticker in tickers.items():
+            market = self.markets.get(symbol)
+            if market is None:
+                continue
+            quote = (ticker.get('bid') or 0, ticker.get('ask') or 0)
+            if self.quotes.get(symbol) == quote:
+                continue
+            self.quotes[symbol] = quote
+
+            base, quote_currency, fee = market
+            bid, ask = quote
+            # Продажа базы по bid и покупка базы по ask
+            for u, v, rate in ((base, quote_currency, bid * (1 - fee)),
+                               (quote_currency, base, (1 - fee) / ask if ask > 0 else 0)):
+                weight = -math.log(rate) if rate > 0 else math.inf
+                old = self._set_edge(u, v, weight, symbol)
+                changed.append((u, v))
+                if old is None or weight < old - EPS:
+                    decreased.append((u, v))
+
+        # Циклы с изменившимися ребрами пересчитываются; неприбыльные снимаются
+        for edge in changed:
+            for key in list(self._edge_cycles.get(edge, ())):
+                if key in self.cycles:
+                    self._refresh_cycle(key, decreased)
+
+        found = []
+        self._relax_from(decreased, found)
+        return [cycle for cycle in found if cycle['profit_percent'] >= self.min_profit]
+
+    def _set_edge(self, u: str, v: str, weight: float, symbol: str) -> Optional[float]:
+        for node in (u, v):
+            if node not in self.edges:
+                self.edges[node] = {}
+                self.potential[node] = 0.0
+                self.parent[node] = None
+        old = self.edges[u].get(v)
+        self.edges[u][v] = (weight, symbol)
+        return old[0] if old else None
+
+    def _weight(self, u: str, v: str) -> float:
+        if (u, v) in self.suppressed:
+            return math.inf
+        return self.edges[u][v][0]
+
+    def _relax_from(self, edges: List[Tuple[str, str]], found: List[Dict]):
+        """Релаксация (SPFA) только от ребер, чей вес уменьшился"""
+        queue, queued = deque(), set()
+        counts = {}
+
+        def relax(u, v):
+            if self._closes_cycle(u, v, found):
+                return
+            self.potential[v] = self.potential[u] + self.edges[u][v][0]
+            self.parent[v] = u
+            self.relaxations += 1
+            counts[v] = counts.get(v, 0) + 1
+            if v not in queued:
+                queue.append(v)
+                queued.add(v)
+
+        for u, v in edges:
+            if self.potential[u] + self._weight(u, v) < self.potential[v] - EPS:
+                relax(u, v)
+
+        limit = len(self.edges)
+        while queue:
+            u = queue.popleft()
+            queued.discard(u)
+            if counts.get(u, 0) > limit:
+                # Вершина релаксирована больше раз, чем вершин в графе: она лежит
+                # на отрицательном цикле или за ним, который обход не поймал
+                self._break_cycle_behind(u, found)
+                counts[u] = 0
+            for v in self.edges[u]:
+                if self.potential[u] + self._weight(u, v) < self.potential[v] - EPS:
+                    relax(u, v)
+
+    def _closes_cycle(self, u: str, v: str, found: List[Dict]) -> bool:
+        """
+        Проверяет, замкнет ли ребро u→v цикл в дереве предков (обход от u до v)
+        Отрицательный цикл записывается, а ребро исключается из релаксации
+        """
+        path, node = [u], self.parent[u]
+        while node is not None and node != v and len(path) <= len(self.edges):
+            path.append(node)
+            node = self.parent[node]
+        if node != v:
+            return False
+
+        # Цикл v → ... → u → v в порядке обменов
+        nodes = [v] + path[::-1] + [v]
+        return self._record_cycle(nodes, (u, v), found)
+
+    def _break_cycle_behind(self, u: str, found: List[Dict]):
+        """Находит цикл в дереве предков позади u и исключает его замыкающее ребро"""
+        node = u
+        for _ in range(len(self.edges)):
+            node = self.parent[node]
+            if node is None:
+                return
+        # node гарантированно на цикле предков - собираем его
+        ring, current = [node], self.parent[node]
+        while current != node:
+            ring.append(current)
+            current = self.parent[current]
+        nodes = [node] + ring[::-1]
+        self._record_cycle(nodes, (nodes[-2], nodes[-1]), found)
+
+    def _record_cycle(self, nodes: List[str], closing: Tuple[str, str], found: List[Dict]) -> bool:
+        """Записывает отрицательный цикл и исключает замыкающее ребро"""
+        weight = sum(self.edges[a][b][0] for a, b in zip(nodes, nodes[1:]))
+        if weight >= -EPS:
+            return False
+
+        key = self._cycle_key(nodes)
+        self.suppressed[closing] = key
+        if key not in self.cycles:
+            cycle = self._describe(nodes, weight)
+            self.cycles[key] = cycle
+            for edge in zip(nodes, nodes[1:]):
+                self._edge_cycles.setdefault(edge, set()).add(key)
+            found.append(cycle)
+        return True
+
+    @staticmethod
+    def _cycle_key(nodes: List[str]) -> Tuple:
+        """Один и тот же цикл с разных стартовых вершин дает один ключ"""
+        ring = nodes[:-1]
+        start = ring.index(min(ring))
+        return tuple(ring[start:] + ring[:start])
+
+    def _describe(self, nodes: List[str], weight: float) -> Dict:
+        return {
+            'path': nodes,
+            'markets': [self.edges[a][b][1] for a, b in zip(nodes, nodes[1:])],
+            'profit_percent': (math.exp(-weight) - 1) * 100,
+            'detected_at': int(time.time() * 1000),
+        }
+
+    def _refresh_cycle(self, key: Tuple, decreased: List[Tuple[str, str]]):
+        nodes = list(key) + [key[0]]
+        weight = sum(self.edges[a][b][0] for a, b in zip(nodes, nodes[1:]))
+        if weight < -EPS:
+            self.cycles[key]['profit_percent'] = (math.exp(-weight) - 1) * 100
+            return
+
+        # Цикл закрылся: замыкающее ребро возвращается в граф и проверяется заново
+        del self.cycles[key]
+        for edge in zip(nodes, nodes[1:]):
+            self._edge_cycles.get(edge, set()).discard(key)
+        for edge, cycle_key in list(self.suppressed.items()):
+            if cycle_key == key:
+                del self.suppressed[edge]
+                decreased.append(edge)
+
+    def print_cycles(self, top: int = 20):
+        """Выводит текущие прибыльные циклы"""
+        cycles = sorted((c for c in self.cycles.values() if c['profit_percent'] >= self.min_profit),
+                        key=lambda c: -c['profit_percent'])
+        print(f"\n{Fore.CYAN}{'='*70}")
+        print(f"🔺 ТРЕУГОЛЬНЫЙ АРБИТРАЖ ({self.exchange.exchange_id})")
+        print(f"Рынков: {len(self.markets)}, валют: {len(self.edges)}, минимальная прибыль: {self.min_profit}%")
+        print(f"{'='*70}")
+
+        if not cycles:
+            print(f"{Fore.YELLOW}🤷 Прибыльных циклов не найдено")
+            return
+
+        for cycle in cycles[:top]:
+            print(f"{Fore.GREEN}  🟢 {' → '.join(cycle['path'])}: {cycle['profit_percent']:.3f}%")
+            print(f"     Рынки: {', '.join(cycle['markets'])}")
@@ -0,0 +1,171 @@
+# portfolio/metrics.py
+import math
+from datetime import datetime
+from typing import Dict, List, Optional
+import numpy as np
+
+SNAPSHOT_DTYPE = np.dtype([
+    ('timestamp', 'f8'),           # Время снимка, секунды epoch
+    ('total_value', 'f8'),
+    ('profit_loss', 'f8'),
+    ('profit_loss_percent', 'f8'),
+    ('trades_count', 'i8'),
+])
+
+SECONDS_PER_YEAR = 365 * 24 * 3600
+
+
+class RunningMetrics:
+    """
+    Метрики портфеля, обновляемые за O(1) на снимок
+    Пик и максимальная просадка - по ходу; среднее и дисперсия доходностей
+    между снимками - алгоритмом Уэлфорда; нисходящее отклонение - по сумме
+    квадратов отрицательных доходностей (для коэффициента Сортино)
+    """
+
+    def __init__(self):
+        self.count = 0              # Снимков
+        self.first_value = None
+        self.first_timestamp = None
+        self.last_value = None
+        self.last_timestamp = None
+        self.peak = None
+        self.max_drawdown = 0.0     # Наибольшая просадка от пика, %
+        self.returns = 0            # Доходностей между снимками
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._downside = 0.0        # Сумма квадратов отрицательных доходностей
+
+    def update(self, value: float, timestamp: float):
+        if self.count == 0:
+            self.first_value, self.first_timestamp = value, timestamp
+            self.peak = value
+        else:
+            previous = self.last_value
+            if previous > 0:
+                ret = (value - previous) / previous
+                self.returns += 1
+                delta = ret - self._mean
+                self._mean += delta / self.returns
+                self._m2 += delta * (ret - self._mean)
+                if ret < 0:
+                    self._downside += ret * ret
+        self.count += 1
+        self.last_value, self.last_timestamp = value, timestamp
+
+        if value > self.peak:
+            self.peak = value
+        drawdown = self.current_drawdown
+        if drawdown > self.max_drawdown:
+            self.max_drawdown = drawdown
+
+    @property
+    def current_drawdown(self) -> float:
+        """Текущая просадка от пика, %"""
+        if not self.peak or self.peak <= 0:
+            return 0.0
+        return (self.peak - self.last_value) / self.peak * 100
+
+    @property
+    def mean_return(self) -> float:
+        return self._mean
+
+    @property
+    def volatility(self) -> float:
+        """Стандартное отклонение доходности между снимками (выборочное), доля"""
+        return math.sqrt(self._m2 / (self.returns - 1)) if self.returns > 1 else 0.0
+
+    @property
+    def downside_deviation(self) -> float:
+        return math.sqrt(self._downside / self.returns) if self.returns else 0.0
+
+    def _periods_per_year(self) -> Optional[float]:
+        """Снимков в год по среднему интервалу между ними"""
+        if self.returns == 0:
+            return None
+        interval = (self.last_timestamp - self.first_timestamp) / self.returns
+        return SECONDS_PER_YEAR / interval if interval > 0 else None
+
+    def sharpe(self) -> Optional[float]:
+        """Годовой коэффициент Шарпа (безрисковая ставка 0)"""
+        periods = self._periods_per_year()
+        if periods is None or self.volatility == 0:
+            return None
+        return self._mean / self.volatility * math.sqrt(periods)
+
+    def sortino(self) -> Optional[float]:
+        """Годовой коэффициент Сортино (целевая доходность 0)"""
+        periods = self._periods_per_year()
+        if periods is None or self.downside_deviation == 0:
+            return None
+        return self._mean / self.downside_deviation * math.sqrt(periods)
+
+
+class _Ring:
+    """Кольцевой буфер снимков фиксированного размера"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.data = np.zeros(capacity, dtype=SNAPSHOT_DTYPE)
+        self.size = 0
+        self._next = 0
+
+    def append(self, record: tuple):
+        self.data[self._next] = record
+        self._next = (self._next + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def last(self) -> Optional[np.void]:
+        return self.data[(self._next - 1) % self.capacity] if self.size else None
+
+    def ordered(self) -> np.ndarray:
+        if self.size < self.capacity:
+            return self.data[:self.size]
+        return np.concatenate([self.data[self._next:], self.data[:self._next]])
+
+
+class SnapshotHistory:
+    """
+    История снимков портфеля с многоуровневым прореживанием
+    Каждый уровень - кольцевой буфер capacity записей с шагом resolutions[i]
+    секунд (0 - каждый снимок). Свежая история хранится подробно, старая -
+    все реже; память постоянна при любой длительности работы
+    """
+
+    def __init__(self, capacity: int = 1440, resolutions: List[int] = None):
+        self.resolutions = list(resolutions or [0, 60, 3600, 86400])
+        self.levels = [_Ring(capacity) for _ in self.resolutions]
+        self.total = 0   # Всего добавлено снимков
+
+    def __len__(self):
+        return self.total
+
+    def append(self, snapshot: Dict):
+        timestamp = snapshot['timestamp']
+        if isinstance(timestamp, datetime):
+            timestamp = timestamp.timestamp()
+        record = (timestamp, snapshot['total_value'], snapshot['profit_loss'],
+                  snapshot['profit_loss_percent'], snapshot['trades_count'])
+        self.total += 1
+        for step, level in zip(self.resolutions, self.levels):
+            last = level.last()
+            if step == 0 or last is None or timestamp - last['timestamp'] >= step:
+                level.append(record)
+
+    def records(self) -> np.ndarray:
+        """
+        Все хранимые снимки по времени: для каждого периода берется
+        самый подробный уровень, который его еще покрывает
+        """
+        parts = []
+        covered_from = math.inf
+        for level in self.levels:
+            data = level.ordered()
+            older = data[data['timestamp'] < covered_from]
+            if len(older):
+                parts.append(older)
+            if len(data):
+                covered_from = min(covered_from, data['timestamp'][0])
+        if not parts:
+            return np.zeros(0, dtype=SNAPSHOT_DTYPE)
+        return np.concatenate(parts[::-1])
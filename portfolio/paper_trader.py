@@ -4,8 +4,7 @@ import random
 from typing import Dict, List, Optional
 from colorama import Fore, Style
 from datetime import datetime
-import pandas as pd
-import numpy as np
+from data.indicators import indicator_pipeline
 
 class PaperTrader:
     """Бумажная торговля с различными стратегиями"""
@@ -14,6 +13,14 @@ class PaperTrader:
         self.exchange = paper_exchange
         self.positions = {}
         self.strategy_name = "Не выбрана"
+        self._collector = None
+    
+    def _get_collector(self):
+        """Сборщик данных создается один раз на трейдер (свечи кэшируются в памяти процесса)"""
+        if self._collector is None:
+            from data.collector import DataCollector
+            self._collector = DataCollector()
+        return self._collector
         
     def moving_average_crossover(self, symbol: str, short_window: int = 10, long_window: int = 30):
         """
@@ -24,21 +31,20 @@ class PaperTrader:
         self.strategy_name = f"MA Crossover ({short_window}/{long_window})"
         
         # Получаем исторические данные
-        from data.collector import DataCollector
-        collector = DataCollector()
+        collector = self._get_collector()
         df = collector.get_historical_data(symbol, limit=long_window + 10)
         
         if df is None or len(df) < long_window:
             return None
         
         # Рассчитываем скользящие средние
-        df['MA_short'] = df['close'].rolling(window=short_window).mean()
-        df['MA_long'] = df['close'].rolling(window=long_window).mean()
+        ma = indicator_pipeline.compute(df, [f'MA{short_window}', f'MA{long_window}'])
+        ma_short, ma_long = ma[f'MA{short_window}'], ma[f'MA{long_window}']
         
         # Проверяем пересечение
         if len(df) >= 2:
-            prev_cross = df['MA_short'].iloc[-2] - df['MA_long'].iloc[-2]
-            curr_cross = df['MA_short'].iloc[-1] - df['MA_long'].iloc[-1]
+            prev_cross = ma_short.iloc[-2] - ma_long.iloc[-2]
+            curr_cross = ma_short.iloc[-1] - ma_long.iloc[-1]
             
             # Пересечение снизу вверх (сигнал к покупке)
             if prev_cross < 0 and curr_cross > 0:
@@ -59,19 +65,14 @@ class PaperTrader:
         self.strategy_name = f"RSI ({period}, {oversold}/{overbought})"
         
         # Получаем исторические данные
-        from data.collector import DataCollector
-        collector = DataCollector()
+        collector = self._get_collector()
         df = collector.get_historical_data(symbol, limit=period + 10)
         
         if df is None or len(df) < period + 1:
             return None
         
         # Рассчитываем RSI
-        delta = df['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
+        rsi = indicator_pipeline.compute(df, [f'RSI{period}'])[f'RSI{period}']
         
         current_rsi = rsi.iloc[-1]
         
@@ -91,22 +92,19 @@ class PaperTrader:
         self.strategy_name = f"Bollinger Bands ({period}, {std_dev})"
         
         # Получаем исторические данные
-        from data.collector import DataCollector
-        collector = DataCollector()
+        collector = self._get_collector()
         df = collector.get_historical_data(symbol, limit=period + 10)
         
         if df is None or len(df) < period:
             return None
         
         # Рассчитываем полосы Боллинджера
-        df['MA'] = df['close'].rolling(window=period).mean()
-        df['std'] = df['close'].rolling(window=period).std()
-        df['Upper'] = df['MA'] + (df['std'] * std_dev)
-        df['Lower'] = df['MA'] - (df['std'] * std_dev)
+        upper, lower = f'BB_upper{period}_{std_dev}', f'BB_lower{period}_{std_dev}'
+        bands = indicator_pipeline.compute(df, [upper, lower])
         
         current_price = df['close'].iloc[-1]
-        current_lower = df['Lower'].iloc[-1]
-        current_upper = df['Upper'].iloc[-1]
+        current_lower = bands[lower].iloc[-1]
+        current_upper = bands[upper].iloc[-1]
         
         if current_price <= current_lower:
             return {'action': 'buy', 'reason': f'Price touched lower band ({current_price:.2f} <= {current_lower:.2f})'}
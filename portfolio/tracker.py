@@ -2,16 +2,20 @@
 from typing import Dict, List, Optional
 from colorama import Fore, Style
 from tabulate import tabulate
-import pandas as pd
 from datetime import datetime
 import time
+from portfolio.metrics import RunningMetrics, SnapshotHistory
+from config import PORTFOLIO_HISTORY
 
 class PortfolioTracker:
     """Трекер для отслеживания портфеля и его эффективности"""
     
     def __init__(self, exchange):
         self.exchange = exchange
-        self.history = []
+        # История фиксированного размера с прореживанием и метрики, обновляемые за O(1)
+        self.history = SnapshotHistory(PORTFOLIO_HISTORY['capacity'], PORTFOLIO_HISTORY['resolutions'])
+        self.metrics = RunningMetrics()
+        self.last_snapshot = None
         self.start_time = datetime.now()
         self.is_paper = hasattr(exchange, 'paper_mode')  # Определяем тип биржи
         
@@ -30,36 +34,13 @@ class PortfolioTracker:
         try:
             balance = self.exchange.get_balance()
             if not balance:
-                return {
-                    'total_value': 0,
-                    'initial_balance': 0,
-                    'profit_loss': 0,
-                    'profit_loss_percent': 0,
-                    'details': {},
-                    'trades_count': 0
-                }
+                # Баланс не получен - это сбой запроса, а не нулевой портфель
+                return self._failed_portfolio()
             
-            total_value = 0
-            details = {}
-            
-            # Считаем USDT отдельно
-            usdt_amount = balance['total'].get('USDT', 0)
-            if usdt_amount > 0:
-                total_value += usdt_amount
-                details['USDT'] = usdt_amount
-            
-            # Считаем другие монеты
-            for currency, amount in balance['total'].items():
-                if currency != 'USDT' and amount > 0:
-                    try:
-                        ticker = self.exchange.get_ticker(f"{currency}/USDT")
-                        if ticker and ticker.get('last'):
-                            value = amount * ticker['last']
-                            total_value += value
-                            details[currency] = value
-                    except:
-                        # Если не можем получить цену, пропускаем
-                        pass
+            # Все монеты оцениваются одним запросом тикеров; без пары к USDT - через BTC, USDC...
+            valuation = self.exchange.valuation.value(balance['total'])
+            total_value = valuation['total_value']
+            details = valuation['details']
             
             # Для реальной торговли нет понятия "начальный баланс"
             # Возвращаем текущую стоимость как базовую
@@ -75,22 +56,31 @@ class PortfolioTracker:
             
         except Exception as e:
             print(f"{Fore.RED}❌ Ошибка получения стоимости портфеля: {e}")
-            return {
-                'total_value': 0,
-                'initial_balance': 0,
-                'profit_loss': 0,
-                'profit_loss_percent': 0,
-                'details': {},
-                'trades_count': 0
-            }
+            return self._failed_portfolio()
+    
+    @staticmethod
+    def _failed_portfolio() -> Dict:
+        """Пустой результат при ошибке оценки; failed - снимок по нему не делается"""
+        return {
+            'total_value': 0,
+            'initial_balance': 0,
+            'profit_loss': 0,
+            'profit_loss_percent': 0,
+            'details': {},
+            'trades_count': 0,
+            'failed': True
+        }
     
     def snapshot(self):
-        """Создает снимок текущего состояния портфеля"""
+        """Создает снимок текущего состояния портфеля (None - оценить портфель не удалось)"""
         portfolio = self.get_portfolio_value()
+        if portfolio.get('failed'):
+            # Нулевая стоимость из-за сбоя записала бы в метрики просадку 100%
+            return None
         
         # Для реальной торговли считаем P&L относительно первого снимка
-        if not self.is_paper and len(self.history) > 0:
-            first_value = self.history[0]['total_value']
+        if not self.is_paper and self.metrics.count > 0:
+            first_value = self.metrics.first_value
             current_value = portfolio['total_value']
             portfolio['profit_loss'] = current_value - first_value
             portfolio['profit_loss_percent'] = (current_value - first_value) / first_value * 100 if first_value > 0 else 0
@@ -105,6 +95,8 @@ class PortfolioTracker:
             'details': portfolio['details'].copy()
         }
         self.history.append(snapshot)
+        self.metrics.update(snapshot['total_value'], snapshot['timestamp'].timestamp())
+        self.last_snapshot = snapshot
         return snapshot
     
     def print_portfolio_summary(self, portfolio: Dict):
@@ -134,14 +126,14 @@ class PortfolioTracker:
     
     def get_performance_metrics(self) -> Dict:
         """Рассчитывает метрики производительности"""
-        if len(self.history) < 2:
+        metrics = self.metrics
+        if metrics.count < 2:
             return {}
         
-        first = self.history[0]
-        last = self.history[-1]
+        last = self.last_snapshot
         
         # Временной период
-        time_diff = (last['timestamp'] - first['timestamp']).total_seconds() / 3600  # в часах
+        time_diff = (metrics.last_timestamp - metrics.first_timestamp) / 3600  # в часах
         
         # Общая доходность
         total_return = last['profit_loss_percent']
@@ -149,29 +141,18 @@ class PortfolioTracker:
         # Среднечасовая доходность
         hourly_return = total_return / time_diff if time_diff > 0 else 0
         
-        # Максимальная просадка
-        peak = max(h['total_value'] for h in self.history)
-        current_drawdown = (peak - last['total_value']) / peak * 100 if peak > 0 else 0
-        
-        # Волатильность (стандартное отклонение доходности)
-        returns = []
-        for i in range(1, len(self.history)):
-            prev_value = self.history[i-1]['total_value']
-            if prev_value > 0:
-                ret = (self.history[i]['total_value'] - prev_value) / prev_value
-                returns.append(ret)
-        
-        volatility = pd.Series(returns).std() * 100 if len(returns) > 1 else 0
-        
         return {
             'total_return': total_return,
             'hourly_return': hourly_return,
-            'current_drawdown': current_drawdown,
-            'volatility': volatility,
+            'current_drawdown': metrics.current_drawdown,
+            'max_drawdown': metrics.max_drawdown,
+            'volatility': metrics.volatility * 100,
+            'sharpe': metrics.sharpe(),
+            'sortino': metrics.sortino(),
             'trades_count': last['trades_count'],
             'trading_hours': time_diff,
-            'peak_value': peak,
-            'current_value': last['total_value']
+            'peak_value': metrics.peak,
+            'current_value': metrics.last_value
         }
     
     def print_performance(self):
@@ -195,9 +176,15 @@ class PortfolioTracker:
         
         color_drawdown = Fore.RED if metrics['current_drawdown'] > 10 else Fore.YELLOW if metrics['current_drawdown'] > 5 else Fore.GREEN
         print(f"Текущая просадка: {color_drawdown}{metrics['current_drawdown']:.2f}%")
+        if metrics['max_drawdown'] > 0:
+            print(f"Макс. просадка: {metrics['max_drawdown']:.2f}%")
         
         if metrics['volatility'] > 0:
             print(f"Волатильность: {metrics['volatility']:.2f}%")
+        if metrics['sharpe'] is not None:
+            print(f"Шарп (годовой): {metrics['sharpe']:.2f}")
+        if metrics['sortino'] is not None:
+            print(f"Сортино (годовой): {metrics['sortino']:.2f}")
         
         print(f"Время торговли: {metrics['trading_hours']:.1f} часов")
         
@@ -215,4 +202,23 @@ class PortfolioTracker:
             bar = '█' * filled + '░' * (bar_length - filled)
             print(f"[{bar}] {metrics['total_return']:+.2f}%")
         
-        print(f"{Fore.CYAN}{'='*60}\n")
\ No newline at end of file
+        self._print_value_history()
+        
+        print(f"{Fore.CYAN}{'='*60}\n")
+    
+    def _print_value_history(self, width: int = 40):
+        """График стоимости по истории снимков (старые периоды - прореженные)"""
+        records = self.history.records()
+        if len(records) < 2:
+            return
+        values = records['total_value']
+        # Не больше width точек: каждый step-й снимок, считая от последнего
+        step = -(-len(values) // width)
+        values = values[::-1][::step][::-1]
+        low, high = values.min(), values.max()
+        bars = '▁▂▃▄▅▆▇█'
+        scale = (len(bars) - 1) / (high - low) if high > low else 0
+        line = ''.join(bars[int(round((value - low) * scale))] for value in values)
+        start = datetime.fromtimestamp(records['timestamp'][0]).strftime('%d.%m %H:%M')
+        print(f"\n{Fore.YELLOW}Стоимость с {start}:")
+        print(f"{line} {low:.2f}..{high:.2f} USDT")
\ No newline at end of file
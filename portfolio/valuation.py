@@ -0,0 +1,119 @@
+# portfolio/valuation.py
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+from colorama import Fore
+from config import VALUATION
+
+
+class PortfolioValuation:
+    """
+    Оценка всего баланса в одной валюте (USDT) за один запрос тикеров
+    По рынкам биржи строится граф конвертаций валют; для каждой монеты ищется
+    кратчайший путь до USDT (сначала через мостовые валюты BTC, USDC, ETH...).
+    Пути кэшируются вместе с рынками, цены всех нужных пар берутся одним
+    get_tickers, а монеты без прямой пары к USDT оцениваются по цепочке
+    """
+
+    def __init__(self, exchange, quote: str = None):
+        """exchange: ExchangeConnector (нужны .exchange.load_markets и get_tickers)"""
+        self.exchange = exchange
+        self.quote = quote or VALUATION['quote']
+        self._graph = None         # валюта -> [(соседняя валюта, пара, сосед - базовая валюта пары)]
+        self._routes = {}          # валюта -> [(пара, True если валюта - базовая)] или None
+        self._loaded_at = 0
+
+    def _load_graph(self):
+        if self._graph is not None and time.time() - self._loaded_at < VALUATION['markets_ttl']:
+            return
+        # По истечении markets_ttl рынки перезапрашиваются: иначе ccxt вернул бы свой кэш
+        markets = self.exchange.exchange.load_markets(reload=self._graph is not None)
+        graph = {}
+        for symbol, market in markets.items():
+            if market.get('active') is False or not market.get('spot', True):
+                continue
+            base, quote = market['base'], market['quote']
+            graph.setdefault(base, []).append((quote, symbol, False))
+            graph.setdefault(quote, []).append((base, symbol, True))
+
+        # Соседей-мостов обходим первыми: при равной длине путь пойдет через ликвидные пары
+        bridges = {currency: i for i, currency in enumerate(VALUATION['bridges'])}
+        for neighbours in graph.values():
+            neighbours.sort(key=lambda item: bridges.get(item[0], len(bridges)))
+
+        self._graph = graph
+        self._routes = self._search_routes(graph)
+        self._loaded_at = time.time()
+
+    def _search_routes(self, graph: Dict[str, List[Tuple[str, str, bool]]]) -> Dict[str, List[Tuple[str, bool]]]:
+        """Обход в ширину от валюты оценки: путь от каждой валюты до нее не длиннее max_hops пар"""
+        routes = {self.quote: []}
+        queue = deque([self.quote])
+        while queue:
+            currency = queue.popleft()
+            if len(routes[currency]) >= VALUATION['max_hops']:
+                continue
+            for neighbour, symbol, is_base in graph.get(currency, ()):
+                if neighbour in routes:
+                    continue
+                # neighbour -> currency: если neighbour базовая валюта пары, цена умножается
+                routes[neighbour] = [(symbol, is_base)] + routes[currency]
+                queue.append(neighbour)
+        return routes
+
+    def route(self, currency: str) -> Optional[List[Tuple[str, bool]]]:
+        """Цепочка пар для пересчета валюты в валюту оценки (None - пути нет)"""
+        self._load_graph()
+        return self._routes.get(currency)
+
+    @staticmethod
+    def _ticker_price(ticker: Optional[Dict]) -> Optional[float]:
+        if not ticker:
+            return None
+        if ticker.get('last'):
+            return ticker['last']
+        if ticker.get('bid') and ticker.get('ask'):
+            return (ticker['bid'] + ticker['ask']) / 2
+        return None
+
+    def prices(self, currencies: List[str]) -> Dict[str, float]:
+        """Цены валют в валюте оценки по одному запросу тикеров"""
+        self._load_graph()
+        routes = {currency: self._routes.get(currency) for currency in currencies}
+        symbols = sorted({symbol for route in routes.values() if route for symbol, _ in route})
+        tickers = self.exchange.get_tickers(symbols) if symbols else {}
+
+        prices = {}
+        for currency, route in routes.items():
+            if route is None:
+                continue
+            price = 1.0
+            for symbol, is_base in route:
+                rate = self._ticker_price(tickers.get(symbol))
+                if not rate:
+                    price = None
+                    break
+                price = price * rate if is_base else price / rate
+            if price is not None:
+                prices[currency] = price
+        return prices
+
+    def value(self, amounts: Dict[str, float]) -> Dict:
+        """
+        Стоимость баланса {валюта: количество}
+        Возвращает total_value, details {валюта: стоимость}, prices и unpriced (валюты без цены)
+        """
+        held = {currency: amount for currency, amount in amounts.items() if amount and amount > 0}
+        try:
+            prices = self.prices(list(held))
+        except Exception as e:
+            print(f"{Fore.RED}Ошибка оценки портфеля: {e}")
+            prices = {self.quote: 1.0} if self.quote in held else {}
+
+        details = {currency: amount * prices[currency] for currency, amount in held.items() if currency in prices}
+        return {
+            'total_value': sum(details.values()),
+            'details': details,
+            'prices': prices,
+            'unpriced': sorted(currency for currency in held if currency not in prices),
+        }
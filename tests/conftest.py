@@ -0,0 +1,62 @@
+# tests/conftest.py
+import os
+import sys
+import ccxt
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+HOUR_MS = 3_600_000
+NOW_MS = 1_700_000_000_000 - 1_700_000_000_000 % HOUR_MS + 30 * 60_000  # Середина часовой свечи
+
+
+class FakeExchange:
+    """ccxt-подобная биржа без сети: свечи с ценой, растущей со временем"""
+
+    timeframes = {'1m': '1m', '5m': '5m', '15m': '15m', '1h': '1h', '4h': '4h', '1d': '1d'}
+
+    def __init__(self, now_ms: int = NOW_MS):
+        self.now = now_ms
+        self.calls = []   # (таймфрейм, since, limit) каждого fetch_ohlcv
+
+    def milliseconds(self) -> int:
+        return self.now
+
+    @staticmethod
+    def parse_timeframe(timeframe: str) -> int:
+        return ccxt.Exchange.parse_timeframe(timeframe)
+
+    @staticmethod
+    def price(ts: int) -> float:
+        return 100 + ts / HOUR_MS % 1000
+
+    def fetch_ohlcv(self, symbol, timeframe='1h', since=None, limit=None):
+        self.calls.append((timeframe, since, limit))
+        tf_ms = self.parse_timeframe(timeframe) * 1000
+        current = self.now - self.now % tf_ms
+        limit = limit or 500
+        start = current - (limit - 1) * tf_ms if since is None else since + (-since) % tf_ms
+        rows = []
+        ts = start
+        while ts <= current and len(rows) < limit:
+            price = self.price(ts)
+            rows.append([ts, price, price + 1, price - 1, price + 0.5, 10.0])
+            ts += tf_ms
+        return rows
+
+
+@pytest.fixture
+def fake_exchange():
+    return FakeExchange()
+
+
+@pytest.fixture
+def collector(tmp_path, monkeypatch, fake_exchange):
+    """DataCollector с файлами во временном каталоге и фальшивой биржей"""
+    from data.collector import DataCollector
+    from data.frame_cache import frame_cache
+    monkeypatch.chdir(tmp_path)
+    frame_cache.invalidate()
+    collector = DataCollector('binance')
+    collector.exchange.exchange = fake_exchange
+    return collector
@@ -0,0 +1,62 @@
+# tests/test_alert_index.py
+import random
+from monitors.alert_index import ThresholdIndex
+
+
+def test_crossed_matches_linear_scan():
+    rng = random.Random(8)
+    index, active = ThresholdIndex(), {}
+    for alert_id in range(500):
+        condition = rng.choice(['above', 'below'])
+        threshold = float(rng.randint(90, 110))
+        index.add('BTC/USDT', condition, threshold, alert_id)
+        active[alert_id] = (condition, threshold)
+
+    for _ in range(50):
+        price = rng.uniform(85, 115)
+        expected = {alert_id for alert_id, (condition, threshold) in active.items()
+                    if (condition == 'above' and price > threshold) or (condition == 'below' and price < threshold)}
+
+        assert set(index.crossed('BTC/USDT', price)) == expected
+        for alert_id in expected:
+            del active[alert_id]
+        assert len(index) == len(active)
+
+
+def test_threshold_equal_to_price_does_not_fire():
+    index = ThresholdIndex()
+    index.add('BTC/USDT', 'above', 100.0, 1)
+    index.add('BTC/USDT', 'below', 100.0, 2)
+
+    assert index.crossed('BTC/USDT', 100.0) == []
+    assert len(index) == 2
+
+
+def test_remove():
+    index = ThresholdIndex()
+    index.add('BTC/USDT', 'above', 110.0, 1)
+    index.add('BTC/USDT', 'above', 120.0, 2)
+    index.add('BTC/USDT', 'below', 90.0, 3)
+    index.add('ETH/USDT', 'below', 10.0, 4)
+
+    index.remove('BTC/USDT', 'above', 110.0, 1)
+    index.remove('BTC/USDT', 'above', 110.0, 99)     # Нет такого - ничего не меняется
+    index.remove('SOL/USDT', 'below', 1.0, 5)
+
+    assert sorted(index.symbols()) == ['BTC/USDT', 'ETH/USDT']
+    assert index.crossed('BTC/USDT', 115.0) == []
+    assert index.crossed('ETH/USDT', 5.0) == [4]
+    assert index.symbols() == ['BTC/USDT']
+
+
+def test_nearest_thresholds():
+    index = ThresholdIndex()
+    index.add('BTC/USDT', 'above', 110.0, 1)
+    index.add('BTC/USDT', 'above', 120.0, 2)
+    index.add('BTC/USDT', 'below', 90.0, 3)
+    index.add('BTC/USDT', 'below', 80.0, 4)
+
+    assert index.nearest('BTC/USDT') == (110.0, 90.0)
+    index.remove('BTC/USDT', 'above', 110.0, 1)
+    assert index.nearest('BTC/USDT') == (120.0, 90.0)
+    assert index.nearest('SOL/USDT') == (None, None)
@@ -0,0 +1,98 @@
+# tests/test_alert_scheduler.py
+import threading
+import time
+import pytest
+from monitors.alert_scheduler import AlertScheduler
+
+
+class Recorder:
+    def __init__(self):
+        self.calls = []
+        self.event = threading.Event()
+
+    def __call__(self, keys):
+        self.calls.append((time.monotonic(), sorted(keys)))
+        self.event.set()
+
+    def count(self, key):
+        return sum(key in keys for _, keys in self.calls)
+
+
+@pytest.fixture
+def scheduler():
+    recorder = Recorder()
+    scheduler = AlertScheduler(recorder, coalesce=0.02)
+    scheduler.recorder = recorder
+    yield scheduler
+    scheduler.stop()
+
+
+def test_each_key_runs_at_its_own_interval(scheduler):
+    scheduler.schedule('fast', 0.1)
+    scheduler.schedule('slow', 0.4)
+    scheduler.start()
+    time.sleep(0.95)
+    scheduler.stop()
+
+    recorder = scheduler.recorder
+    assert 7 <= recorder.count('fast') <= 11
+    assert 2 <= recorder.count('slow') <= 4
+    # Первая проверка - сразу, обе пары одним вызовом
+    assert recorder.calls[0][1] == ['fast', 'slow']
+
+
+def test_close_deadlines_are_coalesced():
+    recorder = Recorder()
+    scheduler = AlertScheduler(recorder, coalesce=0.5)
+    scheduler.schedule('a', 10, delay=0.05)
+    scheduler.schedule('b', 10, delay=0.3)
+    scheduler.schedule('c', 10, delay=5)
+    scheduler.start()
+    assert recorder.event.wait(2)
+    scheduler.stop()
+
+    assert recorder.calls == [(recorder.calls[0][0], ['a', 'b'])]
+
+
+def test_shorter_interval_moves_deadline_closer(scheduler):
+    scheduler.schedule('key', 100, delay=100)
+    scheduler.start()
+    started = time.monotonic()
+
+    scheduler.set_interval('key', 0.05)
+
+    assert scheduler.recorder.event.wait(2)
+    assert time.monotonic() - started < 1
+    assert scheduler.interval('key') == 0.05
+
+
+def test_unschedule_and_prompt_stop(scheduler):
+    scheduler.schedule('gone', 0.05, delay=0.2)
+    scheduler.schedule('idle', 3600, delay=3600)
+    scheduler.unschedule('gone')
+    scheduler.start()
+    time.sleep(0.3)
+
+    started = time.monotonic()
+    scheduler.stop()
+
+    assert time.monotonic() - started < 0.5
+    assert scheduler.recorder.calls == []
+    assert 'gone' not in scheduler and 'idle' in scheduler
+    assert not scheduler.running
+
+
+def test_callback_errors_do_not_stop_the_loop():
+    calls = []
+
+    def failing(keys):
+        calls.append(keys)
+        raise RuntimeError('сбой')
+
+    scheduler = AlertScheduler(failing)
+    scheduler.schedule('key', 0.05)
+    scheduler.start()
+    time.sleep(0.3)
+    scheduler.stop()
+
+    assert len(calls) >= 3
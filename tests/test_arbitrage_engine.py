@@ -0,0 +1,96 @@
+# tests/test_arbitrage_engine.py
+import random
+import pytest
+from monitors.arbitrage_engine import ArbitrageEngine, IndexedHeap
+
+
+def test_indexed_heap_matches_sorted_reference():
+    heap, reference = IndexedHeap(), {}
+    rng = random.Random(7)
+
+    for _ in range(2000):
+        key = rng.randrange(30)
+        if rng.random() < 0.3:
+            heap.remove(key)
+            reference.pop(key, None)
+        else:
+            priority = rng.uniform(0, 100)
+            heap.update(key, priority)
+            reference[key] = priority
+
+        assert len(heap) == len(reference)
+        ordered = sorted(reference.values())
+        assert (heap.top()[0] if heap.top() else None) == (ordered[0] if ordered else None)
+        assert (heap.second()[0] if heap.second() else None) == (ordered[1] if len(ordered) > 1 else None)
+        assert all(k in heap for k in reference)
+
+
+@pytest.fixture
+def engine():
+    return ArbitrageEngine(min_spread=0.5, max_quote_skew_ms=1000)
+
+
+def test_opportunity_opens_updates_and_closes(engine):
+    events = []
+    engine.subscribe(events.append)
+
+    engine.on_quote('a', 'BTC/USDT', 100.0, 100.1, received_at=1_000)
+    engine.on_quote('b', 'BTC/USDT', 101.0, 101.1, received_at=1_200)
+    engine.on_quote('b', 'BTC/USDT', 101.5, 101.6, received_at=1_400)
+    engine.on_quote('b', 'BTC/USDT', 100.2, 100.3, received_at=1_600)
+
+    assert [e['event'] for e in events] == ['open', 'update', 'close']
+    opened, updated, closed = events
+    assert (opened['buy_exchange'], opened['sell_exchange']) == ('a', 'b')
+    assert opened['spread_percent'] == pytest.approx((101.0 - 100.1) / 100.1 * 100)
+    assert updated['opened_at'] == 1_200 and updated['peak_spread'] > opened['spread_percent']
+    assert closed['closed_at'] == 1_600 and engine.open == {}
+
+
+def test_same_venue_best_on_both_sides_uses_second_best(engine):
+    engine.on_quote('a', 'BTC/USDT', 100.0, 100.1, received_at=1_000)
+    engine.on_quote('b', 'BTC/USDT', 99.0, 99.1, received_at=1_000)
+    # c лучшая и для покупки, и для продажи: купить на b и продать на c выгоднее,
+    # чем купить на c и продать на a
+    engine.on_quote('c', 'BTC/USDT', 102.0, 98.0, received_at=1_000)
+
+    opportunity = engine.open['BTC/USDT']
+    assert (opportunity['buy_exchange'], opportunity['sell_exchange']) == ('b', 'c')
+    assert opportunity['spread_percent'] == pytest.approx((102.0 - 99.1) / 99.1 * 100)
+
+
+def test_skewed_quotes_are_not_compared(engine):
+    engine.on_quote('a', 'BTC/USDT', 100.0, 100.1, received_at=1_000)
+    events = engine.on_quote('b', 'BTC/USDT', 102.0, 102.1, received_at=2_500)
+
+    assert events == [] and engine.open == {}
+
+
+def test_quote_ages_use_receive_time(engine):
+    engine.on_quote('a', 'BTC/USDT', 100.0, 100.1, timestamp=10, received_at=1_000)
+    [event] = engine.on_quote('b', 'BTC/USDT', 102.0, 102.1, timestamp=20, received_at=1_300)
+
+    assert (event['buy_quote_age_ms'], event['sell_quote_age_ms']) == (300, 0)
+    assert event['quote_skew_ms'] == 300
+
+
+def test_venue_that_stops_quoting_closes_opportunity(engine):
+    engine.on_quote('a', 'BTC/USDT', 100.0, 100.1, received_at=1_000)
+    engine.on_quote('b', 'BTC/USDT', 102.0, 102.1, received_at=1_000)
+
+    [event] = engine.on_quote('b', 'BTC/USDT', None, None, received_at=1_100)
+
+    assert event['event'] == 'close' and engine.open == {}
+    # Одна биржа не дает пары - повторная котировка a ничего не открывает
+    assert engine.on_quote('a', 'BTC/USDT', 100.0, 100.1, received_at=1_200) == []
+
+
+def test_best_spread_ignores_threshold(engine):
+    engine.on_quote('a', 'BTC/USDT', 100.0, 100.1, received_at=1_000)
+    assert engine.best_spread('BTC/USDT') is None       # Одна биржа
+    engine.on_quote('b', 'BTC/USDT', 100.2, 100.3, received_at=1_000)
+
+    # Спред ниже min_spread: возможности нет, но расстояние до порога известно
+    assert engine.open == {}
+    assert engine.best_spread('BTC/USDT') == pytest.approx((100.2 - 100.1) / 100.1 * 100)
+    assert engine.best_spread('ETH/USDT') is None
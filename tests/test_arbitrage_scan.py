@@ -0,0 +1,77 @@
+# tests/test_arbitrage_scan.py
+import time
+import pytest
+from monitors.arbitrage import ArbitrageScanner
+
+
+def make_ticker(symbol: str, bid: float, ask: float) -> dict:
+    return {'symbol': symbol, 'bid': bid, 'ask': ask, 'last': (bid + ask) / 2,
+            'timestamp': int(time.time() * 1000)}
+
+
+def quote(bid: float, ask: float, received_at: int, timestamp: int = None) -> dict:
+    return {'bid': bid, 'ask': ask, 'last': bid, 'timestamp': timestamp or received_at, 'received_at': received_at}
+
+
+@pytest.fixture
+def scanner(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return ArbitrageScanner(['binance', 'kraken', 'okx'], min_spread=0.5, max_quote_skew_ms=1000)
+
+
+def test_quotes_are_fetched_concurrently(scanner):
+    books = {'binance': (100.0, 100.1), 'kraken': (101.0, 101.1), 'okx': None}
+
+    def slow_ticker(exchange_id):
+        def get_ticker(symbol):
+            time.sleep(0.2)
+            prices = books[exchange_id]
+            return make_ticker(symbol, *prices) if prices else None
+        return get_ticker
+
+    for exchange in scanner.exchanges:
+        exchange.get_ticker = slow_ticker(exchange.exchange_id)
+
+    started = time.time()
+    quotes = scanner.fetch_quotes('BTC/USDT')
+
+    assert time.time() - started < 0.35
+    assert set(quotes) == {'binance', 'kraken'}     # okx без котировки
+    assert all('received_at' in q for q in quotes.values())
+
+
+def test_scan_pair_reports_best_pair(scanner):
+    scanner.fetch_quotes = lambda symbol: {
+        'binance': quote(100.0, 100.1, 1_000),
+        'kraken': quote(102.0, 102.1, 1_100),
+        'okx': quote(101.0, 101.1, 1_200),
+    }
+
+    [opportunity] = scanner.scan_pair('BTC/USDT')
+
+    assert (opportunity['buy_exchange'], opportunity['sell_exchange']) == ('binance', 'kraken')
+    assert opportunity['spread_percent'] == pytest.approx((102.0 - 100.1) / 100.1 * 100)
+    assert opportunity['quote_skew_ms'] == 100
+
+
+def test_stale_venue_is_dropped_and_best_pair_repicked(scanner):
+    scanner.fetch_quotes = lambda symbol: {
+        'binance': quote(100.0, 100.1, 10_000),
+        'kraken': quote(105.0, 105.1, 5_000),     # Устарела на 5 с
+        'okx': quote(101.5, 101.6, 10_200),
+    }
+
+    [opportunity] = scanner.scan_pair('BTC/USDT')
+
+    assert (opportunity['buy_exchange'], opportunity['sell_exchange']) == ('binance', 'okx')
+    assert scanner.stale_rejections == 1
+
+
+def test_no_opportunity_below_min_spread(scanner):
+    scanner.fetch_quotes = lambda symbol: {
+        'binance': quote(100.0, 100.1, 1_000),
+        'kraken': quote(100.2, 100.3, 1_000),
+    }
+
+    assert scanner.scan_pair('BTC/USDT') == []
+    assert scanner.scan_all_pairs(['BTC/USDT', 'ETH/USDT']) == {}
@@ -0,0 +1,90 @@
+# tests/test_arbitrage_simulator.py
+import numpy as np
+import pandas as pd
+import pytest
+from data.tick_store import TickStore, book_fields
+from monitors.arbitrage_simulator import ArbitrageSimulator, BookSeries
+
+
+def snapshots(rows):
+    """rows: [(время мс, bid, bid_sz, ask, ask_sz)] -> BookSeries глубины 1"""
+    ts = [T0 + row[0] for row in rows]
+    frame = pd.DataFrame({'bid_px_0': [r[1] for r in rows], 'bid_sz_0': [r[2] for r in rows],
+                          'ask_px_0': [r[3] for r in rows], 'ask_sz_0': [r[4] for r in rows]},
+                         index=pd.DatetimeIndex(np.array(ts, dtype='datetime64[ms]'), name='timestamp'))
+    return BookSeries(frame)
+
+
+T0 = 1_700_000_000_000
+INVENTORY = {'a': {'base': 10.0, 'quote': 10_000.0}, 'b': {'base': 10.0, 'quote': 10_000.0}}
+
+
+def simulator(books, **kwargs):
+    kwargs.setdefault('inventory', INVENTORY)
+    return ArbitrageSimulator('BTC/USDT', books, latency_ms=100, fees={'a': 0.0, 'b': 0.0},
+                              max_trade_usdt=1_000_000, replenish_ms=1_000, **kwargs)
+
+
+def test_persistent_spread_is_captured():
+    books = {'a': snapshots([(t, 99.0, 5.0, 100.0, 1.0) for t in range(0, 500, 50)]),
+             'b': snapshots([(t + 10, 102.0, 2.0, 103.0, 5.0) for t in range(0, 500, 50)])}
+
+    summary = simulator(books).run(min_spread=0.5)
+
+    assert summary['opportunities'] == 1 and summary['filled'] == 1
+    assert summary['theoretical_pnl'] == pytest.approx(2.0)
+    assert summary['realised_pnl'] == pytest.approx(2.0)
+    assert summary['capture'] == pytest.approx(1.0)
+
+
+def test_spread_gone_before_arrival_leaves_residual():
+    books = {'a': snapshots([(0, 99.0, 5.0, 100.0, 1.0), (200, 99.0, 5.0, 100.0, 1.0)]),
+             'b': snapshots([(10, 102.0, 1.0, 103.0, 5.0), (60, 100.5, 1.0, 101.0, 5.0)])}
+
+    sim = simulator(books)
+    summary = sim.run(min_spread=0.5)
+
+    [trade] = sim.trades.to_dict('records')
+    assert trade['status'] == 'partial'
+    assert (trade['bought'], trade['sold'], trade['residual']) == (1.0, 0.0, 1.0)
+    # Купленное без продажи оценивается по середине стакана биржи покупки
+    assert trade['realised_pnl'] == pytest.approx(-100.0 + 99.5)
+    assert summary['realised_pnl'] < summary['theoretical_pnl']
+
+
+def test_theoretical_pnl_includes_fees():
+    books = {'a': snapshots([(0, 99.0, 5.0, 100.0, 1.0)]), 'b': snapshots([(10, 102.0, 1.0, 103.0, 5.0)])}
+    sim = ArbitrageSimulator('BTC/USDT', books, latency_ms=0, fees={'a': 0.001, 'b': 0.001},
+                             inventory=INVENTORY, max_trade_usdt=1_000_000)
+
+    sim.run(min_spread=0.5)
+
+    expected = 102.0 * 0.999 - 100.0 * 1.001
+    assert sim.trades['theoretical_pnl'].iloc[0] == pytest.approx(expected)
+    assert sim.trades['realised_pnl'].iloc[0] == pytest.approx(expected)
+
+
+def test_empty_book_tops_and_missing_inventory():
+    books = {'a': snapshots([(0, np.nan, np.nan, np.nan, np.nan), (5, 99.0, 5.0, 100.0, 1.0)]),
+             'b': snapshots([(10, 102.0, 1.0, np.nan, np.nan), (20, 102.0, 1.0, 103.0, 5.0)])}
+    inventory = {'a': {'base': 0.0, 'quote': 0.0}, 'b': {'base': 0.0, 'quote': 0.0}}
+
+    sim = simulator(books, inventory=inventory)
+    summary = sim.run(min_spread=0.5)
+
+    assert summary['opportunities'] == 1
+    assert sim.trades['status'].iloc[0] == 'no_inventory'
+
+
+def test_from_tick_store(tmp_path):
+    store = TickStore(str(tmp_path))
+    fields = book_fields(1)
+    store.append_block('a', 'BTC/USDT', 'book', fields, [(T0, T0, 99.0, 5.0, 100.0, 1.0)])
+    store.append_block('b', 'BTC/USDT', 'book', fields, [(T0 + 10, T0 + 10, 102.0, 1.0, 103.0, 5.0)])
+
+    sim = ArbitrageSimulator.from_tick_store('BTC/USDT', ['a', 'b', 'c'], store=store, inventory=INVENTORY,
+                                             latency_ms=0, fees={'a': 0.0, 'b': 0.0})
+
+    assert sim.venues == ['a', 'b']
+    assert sim.run(min_spread=0.5)['filled'] == 1
+    assert len(sim.sweep([0.5, 5.0])) == 2
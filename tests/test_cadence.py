@@ -0,0 +1,91 @@
+# tests/test_cadence.py
+import math
+import threading
+import time
+import numpy as np
+import pytest
+from monitors.cadence import CadenceController, PollSchedule
+
+
+def test_volatility_estimate_and_interval():
+    rng = np.random.default_rng(10)
+    cadence = CadenceController(min_interval=1, max_interval=3600, z_score=3.0, halflife=200)
+    price, sigma = 100.0, 0.001    # 0.1% за секунду
+    for step in range(3000):
+        price *= math.exp(rng.normal(0, sigma * math.sqrt(10)))
+        cadence.observe('BTC', price, step * 10_000)
+
+    assert cadence.volatility('BTC') == pytest.approx(sigma, rel=0.2)
+    # До порога 3%: (0.03 / (3 * 0.001))^2 = 100 с
+    assert cadence.interval('BTC', 0.03, 60) == pytest.approx(100, rel=0.4)
+    assert cadence.interval('BTC', 0.01, 60) < cadence.interval('BTC', 0.03, 60)
+
+
+def test_interval_bounds_and_fallbacks():
+    cadence = CadenceController(min_interval=5, max_interval=600)
+
+    assert cadence.interval('X', None, 60) == 600      # Порогов нет
+    assert cadence.interval('X', 0.0, 60) == 5          # Порог уже достигнут
+    assert cadence.interval('X', 0.05, 60) == 60        # Волатильность неизвестна
+    assert cadence.interval('X', 0.05, 1) == 5
+
+    cadence.observe('X', 100.0, 0)
+    cadence.observe('X', 100.0, 10_000)
+    assert cadence.interval('X', 0.05, 60) == 600       # Цена не двигается
+    cadence.observe('X', 150.0, 20_000)
+    assert cadence.interval('X', 1e-6, 60) == 5
+
+    cadence.forget('X')
+    assert cadence.volatility('X') is None
+
+
+def test_absolute_mode_and_ignored_values():
+    cadence = CadenceController(min_interval=1, max_interval=100, z_score=1.0, relative=False)
+    cadence.observe('spread', -0.5, 0)
+    cadence.observe('spread', 0.5, 4_000)      # Изменение 1.0 за 4 с
+    cadence.observe('spread', 0.9, 3_000)      # Из прошлого - пропускается
+
+    assert cadence.volatility('spread') == pytest.approx(0.5)
+    assert cadence.interval('spread', 2.0, 10) == pytest.approx(16)
+
+    relative = CadenceController(min_interval=1, max_interval=100)
+    relative.observe('p', 0.0, 0)
+    relative.observe('p', None, 1_000)
+    assert relative.volatility('p') is None
+
+
+def test_poll_schedule_pulls_other_sources_near_threshold():
+    schedule = PollSchedule(['BTC', 'ETH'], ['a', 'b'], max_lag=1.0)
+
+    assert schedule.due('a', 0.0) == ['BTC', 'ETH']
+    schedule.reschedule('BTC', 'b', polled_at=100.0, interval=30)
+    schedule.reschedule('BTC', 'a', polled_at=101.0, interval=30)
+    assert schedule.due('b', 120.0) == ['ETH']
+
+    # На a пара подошла к порогу: b должна опросить ее не позже 100 + max_lag
+    schedule.reschedule('BTC', 'a', polled_at=102.0, interval=1, near=True)
+    assert schedule.due('b', 101.0) == ['BTC', 'ETH']
+    assert 'BTC' not in schedule.due('a', 102.5)
+
+
+def test_waiting_source_is_woken_by_shorter_deadline():
+    schedule = PollSchedule(['BTC'], ['a', 'b'])
+    now = time.time()
+    schedule.reschedule('BTC', 'a', now, 3600)
+    schedule.reschedule('BTC', 'b', now, 3600)
+    woke = []
+
+    waiter = threading.Thread(target=lambda: woke.append((schedule.wait('b', 0), time.time())))
+    waiter.start()
+    time.sleep(0.1)
+    schedule.reschedule('BTC', 'a', time.time(), 0.1)
+    waiter.join(2)
+
+    assert woke and woke[0][0] is True
+    assert woke[0][1] - now < 1
+
+    closer = threading.Thread(target=lambda: woke.append(schedule.wait('a', time.time() + 3600)))
+    closer.start()
+    schedule.close()
+    closer.join(2)
+    assert woke[-1] is False
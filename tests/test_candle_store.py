@@ -0,0 +1,83 @@
+# tests/test_candle_store.py
+import numpy as np
+import pandas as pd
+from data.candle_store import CandleStore, CandleView, to_ms
+
+MINUTE_MS = 60_000
+
+
+def make_candles(start_ms: int, count: int, price: float = 100.0) -> pd.DataFrame:
+    index = pd.to_datetime(start_ms + np.arange(count) * MINUTE_MS, unit='ms')
+    index.name = 'timestamp'
+    close = price + np.arange(count, dtype=float)
+    return pd.DataFrame({'open': close, 'high': close + 1, 'low': close - 1,
+                         'close': close, 'volume': np.ones(count)}, index=index)
+
+
+def test_round_trip(tmp_path):
+    store = CandleStore(str(tmp_path))
+    df = make_candles(0, 10)
+    store.write('binance', 'BTC/USDT', '1m', df)
+
+    frame = store.read_frame('binance', 'BTC/USDT', '1m')
+
+    pd.testing.assert_frame_equal(frame, df, check_freq=False, check_index_type=False)
+    assert store.length('binance', 'BTC/USDT', '1m') == 10
+    assert store.last_timestamp('binance', 'BTC/USDT', '1m') == 9 * MINUTE_MS
+
+
+def test_read_is_zero_copy_view(tmp_path):
+    store = CandleStore(str(tmp_path))
+    store.write('binance', 'BTC/USDT', '1m', make_candles(0, 10))
+
+    view = store.read('binance', 'BTC/USDT', '1m')
+    part = view.slice(start=2 * MINUTE_MS, end=5 * MINUTE_MS)
+
+    assert isinstance(part, CandleView)
+    assert isinstance(view['close'].base, np.memmap) or isinstance(view['close'], np.memmap)
+    assert np.shares_memory(part['close'], view['close'])
+    assert list(part.timestamp) == [2 * MINUTE_MS, 3 * MINUTE_MS, 4 * MINUTE_MS, 5 * MINUTE_MS]
+    assert np.shares_memory(part.series('close').to_numpy(), view['close'])
+
+
+def test_overlapping_write_replaces_tail_and_appends(tmp_path):
+    store = CandleStore(str(tmp_path))
+    store.write('binance', 'BTC/USDT', '1m', make_candles(0, 10))
+    # Последняя свеча была незакрытой: новая загрузка ее переписывает
+    store.write('binance', 'BTC/USDT', '1m', make_candles(9 * MINUTE_MS, 3, price=500.0))
+
+    view = store.read('binance', 'BTC/USDT', '1m')
+
+    assert len(view) == 12
+    assert list(view['close'][8:]) == [108.0, 500.0, 501.0, 502.0]
+    assert np.all(np.diff(view.timestamp) == MINUTE_MS)
+
+
+def test_rewrite_inside_history_keeps_later_candles(tmp_path):
+    store = CandleStore(str(tmp_path))
+    store.write('binance', 'BTC/USDT', '1m', make_candles(0, 10))
+    store.write('binance', 'BTC/USDT', '1m', make_candles(3 * MINUTE_MS, 2, price=0.0))
+
+    view = store.read('binance', 'BTC/USDT', '1m')
+
+    assert len(view) == 10
+    assert list(view['close'][2:6]) == [102.0, 0.0, 1.0, 105.0]
+
+
+def test_missing_series_and_time_conversion(tmp_path):
+    store = CandleStore(str(tmp_path))
+
+    assert store.read('binance', 'ETH/USDT', '1m') is None
+    assert store.read_frame('binance', 'ETH/USDT', '1m') is None
+    assert store.length('binance', 'ETH/USDT', '1m') == 0
+    assert to_ms('1970-01-01 00:01') == MINUTE_MS
+    assert to_ms(pd.Timestamp(2 * MINUTE_MS, unit='ms')) == 2 * MINUTE_MS
+
+
+def test_collector_stores_candles(collector):
+    collector.get_historical_data('BTC/USDT', limit=20, timeframe='1h')
+
+    view = collector.get_candle_view('BTC/USDT', '1h')
+
+    assert len(view) == 20
+    assert view.index.is_monotonic_increasing
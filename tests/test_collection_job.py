@@ -0,0 +1,71 @@
+# tests/test_collection_job.py
+import threading
+import time
+import pytest
+from data import collection_job
+from data.collection_job import CollectionJob
+from data.collector import DataCollector
+from conftest import FakeExchange
+
+
+class SlowExchange(FakeExchange):
+    """Биржа с задержкой ответа и ограниченным списком пар"""
+
+    def __init__(self, markets, delay: float = 0.0):
+        super().__init__()
+        self.markets = markets
+        self.delay = delay
+        self.threads = set()
+
+    def load_markets(self):
+        if self.markets is None:
+            raise ConnectionError('нет связи')
+        return {symbol: {} for symbol in self.markets}
+
+    def fetch_ohlcv(self, symbol, timeframe='1h', since=None, limit=None):
+        self.threads.add(threading.get_ident())
+        time.sleep(self.delay)
+        return super().fetch_ohlcv(symbol, timeframe, since, limit)
+
+
+@pytest.fixture
+def venues(tmp_path, monkeypatch):
+    from data.frame_cache import frame_cache
+    monkeypatch.chdir(tmp_path)
+    frame_cache.invalidate()
+    venues = {
+        'binance': SlowExchange(['BTC/USDT', 'ETH/USDT'], delay=0.2),
+        'kraken': SlowExchange(['BTC/USDT'], delay=0.2),
+        'down': SlowExchange(None),
+    }
+
+    def make_collector(exchange_id):
+        collector = DataCollector('binance')
+        collector.exchange.exchange_id = exchange_id
+        collector.exchange.exchange = venues[exchange_id]
+        return collector
+
+    monkeypatch.setattr(collection_job, 'DataCollector', make_collector)
+    return venues
+
+
+def test_matrix_is_collected_per_exchange(venues):
+    job = CollectionJob(['binance', 'kraken', 'down'], ['BTC/USDT', 'ETH/USDT'], ['1h', '4h'], limit=10)
+
+    stats = job.run()
+
+    assert (stats['binance']['ok'], stats['binance']['skipped'], stats['binance']['candles']) == (4, 0, 40)
+    assert (stats['kraken']['ok'], stats['kraken']['skipped']) == (2, 2)
+    assert stats['binance']['requests'] == 4 and stats['kraken']['requests'] == 2
+    assert stats['down']['failed'] == 4 and 'нет связи' in stats['down']['errors'][0]
+    job.print_report()
+
+
+def test_exchanges_run_concurrently(venues):
+    job = CollectionJob(['binance', 'kraken'], ['BTC/USDT'], ['1h'], limit=10)
+
+    job.run()
+
+    # Каждая биржа делает один запрос по 0.2 с - вместе они идут параллельно
+    assert job.elapsed < 0.35
+    assert venues['binance'].threads.isdisjoint(venues['kraken'].threads)
@@ -0,0 +1,33 @@
+# tests/test_collector_refresh.py
+from conftest import HOUR_MS
+
+
+def test_first_load_fetches_whole_window(collector, fake_exchange):
+    df = collector.get_historical_data('BTC/USDT', limit=50, timeframe='1h')
+
+    assert len(df) == 50
+    assert fake_exchange.calls == [('1h', None, 50)]
+
+
+def test_refresh_fetches_only_candles_after_last_stored(collector, fake_exchange):
+    first = collector.get_historical_data('BTC/USDT', limit=50, timeframe='1h')
+    last = int(first.index.as_unit('ms').asi8[-1])
+
+    fake_exchange.now += 3 * HOUR_MS
+    fake_exchange.calls.clear()
+    df = collector.get_historical_data('BTC/USDT', limit=50, force_refresh=True, timeframe='1h')
+
+    # Докачка начинается с последней сохраненной (возможно незакрытой) свечи
+    assert [since for _, since, _ in fake_exchange.calls] == [last]
+    assert len(df) == 50
+    assert int(df.index.as_unit('ms').asi8[-1]) == last + 3 * HOUR_MS
+    assert df.index.is_monotonic_increasing and not df.index.has_duplicates
+
+
+def test_refresh_overwrites_forming_candle(collector, fake_exchange):
+    collector.get_historical_data('BTC/USDT', limit=10, timeframe='1h')
+    fake_exchange.price = lambda ts: 500.0
+
+    df = collector.get_historical_data('BTC/USDT', limit=10, force_refresh=True, timeframe='1h')
+
+    assert df['close'].iloc[-1] == 500.5
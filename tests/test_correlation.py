@@ -0,0 +1,92 @@
+# tests/test_correlation.py
+import numpy as np
+import pandas as pd
+from data.correlation import RollingCorrelation
+
+MINUTE_MS = 60_000
+
+
+def random_prices(rows: int, symbols: int, level: float = 1.0, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    mixing = rng.normal(size=(symbols, symbols))
+    steps = rng.normal(size=(rows, symbols)) @ mixing * 0.01
+    return level * np.exp(np.cumsum(steps, axis=0))
+
+
+def feed(engine: RollingCorrelation, prices: np.ndarray):
+    for t, row in enumerate(prices):
+        engine.update(t * MINUTE_MS, dict(zip(engine.symbols, row)))
+
+
+def test_sliding_window_matches_full_recomputation():
+    prices = random_prices(250, 4, level=50_000.0)
+    symbols = ['a', 'b', 'c', 'd']
+    engine = RollingCorrelation(symbols, window=60, use_returns=False, history_size=0)
+
+    feed(engine, prices)
+
+    expected = pd.DataFrame(prices[-60:], columns=symbols)
+    assert engine.count == 60
+    np.testing.assert_allclose(engine.correlation(), expected.corr().to_numpy(), atol=1e-8)
+    np.testing.assert_allclose(engine.covariance(), expected.cov().to_numpy(), rtol=1e-8)
+
+
+def test_returns_mode_uses_log_returns():
+    prices = random_prices(80, 3, seed=1)
+    engine = RollingCorrelation(['a', 'b', 'c'], window=30, history_size=0)
+
+    feed(engine, prices)
+
+    returns = np.diff(np.log(prices), axis=0)[-30:]
+    np.testing.assert_allclose(engine.correlation(), np.corrcoef(returns.T), atol=1e-10)
+
+
+def test_on_price_aligns_ticks_to_bars():
+    engine = RollingCorrelation(['a', 'b'], window=10, use_returns=False, history_size=5)
+
+    engine.on_price('a', 0, 1.0)
+    engine.on_price('b', 30_000, 2.0)
+    engine.on_price('a', MINUTE_MS + 1, 3.0)     # Закрывает первый бар
+    assert engine.count == 1 and engine.last_timestamp == 0
+    engine.on_price('c', MINUTE_MS + 2, 7.0)      # Неизвестная пара игнорируется
+    engine.flush(2 * MINUTE_MS)                   # Второй бар закрывается по часам
+
+    assert engine.count == 2
+    # У b нового значения не было - берется последнее известное
+    np.testing.assert_array_equal(engine._buffer[:2], [[1.0, 2.0], [3.0, 2.0]])
+    assert len(engine.history) == 1 and engine.history[0][0] == MINUTE_MS
+
+
+def test_incomplete_observation_is_skipped():
+    engine = RollingCorrelation(['a', 'b'], window=5, use_returns=False, history_size=0)
+
+    engine.update(0, {'a': 1.0})
+    engine.update(MINUTE_MS, {'b': 1.0})
+
+    assert engine.count == 1
+    assert engine.correlation() is None
+
+
+def test_export_history(tmp_path):
+    engine = RollingCorrelation(['a', 'b'], window=5, use_returns=False, history_size=3)
+    feed(engine, random_prices(10, 2))
+
+    engine.export_history(str(tmp_path / 'history.npz'))
+
+    saved = np.load(tmp_path / 'history.npz')
+    assert list(saved['timestamps']) == [7 * MINUTE_MS, 8 * MINUTE_MS, 9 * MINUTE_MS]
+    assert saved['matrices'].shape == (3, 2, 2)
+    assert list(saved['symbols']) == ['a', 'b']
+
+
+def test_calculate_correlation_matches_pandas(collector):
+    index = pd.date_range('2024-01-01', periods=50, freq='h')
+    prices = random_prices(50, 3, level=30_000.0, seed=2)
+    frames = {symbol: pd.DataFrame({'close': prices[:, i]}, index=index)
+              for i, symbol in enumerate(['BTC/USDT', 'ETH/USDT', 'SOL/USDT'])}
+
+    result = collector.calculate_correlation(frames)
+
+    expected = pd.DataFrame({symbol: df['close'] for symbol, df in frames.items()}).corr()
+    np.testing.assert_allclose(result.to_numpy(), expected.to_numpy(), atol=1e-8)
+    assert list(result.columns) == list(expected.columns)
@@ -0,0 +1,81 @@
+# tests/test_expression_alert.py
+import numpy as np
+import pandas as pd
+import pytest
+from data.indicators import IndicatorPipeline
+from monitors.expression_alert import ExpressionAlerts, compile_expression, indicator_names
+
+
+def make_candles(count: int, seed: int, drift: float = 0.0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(drift, 0.02, size=count)))
+    index = pd.date_range('2024-01-01', periods=count, freq='h')
+    return pd.DataFrame({'open': close, 'high': close * 1.01, 'low': close * 0.99, 'close': close,
+                         'volume': rng.uniform(1, 100, size=count)}, index=index)
+
+
+def test_compile_builds_tree_and_lists_indicators():
+    tree = compile_expression('30 < RSI14 < 70 and close > 1.5 * MA50 or not volume >= Volume_MA')
+
+    assert tree[0] == 'or'
+    assert sorted(set(indicator_names(tree))) == ['MA50', 'RSI14', 'Volume_MA', 'close', 'volume']
+
+
+@pytest.mark.parametrize('text', ['close >', 'close in MA50', 'abs(close) > 1', 'close.x > 1',
+                                  'WMA10 > close', "close > 'a'", 'close > True'])
+def test_invalid_expressions_raise(text):
+    with pytest.raises(ValueError):
+        compile_expression(text)
+
+
+def test_vectorised_evaluation_matches_per_symbol():
+    frames = {f'S{i}/USDT': make_candles(150, seed=i, drift=0.004 if i % 2 else -0.004) for i in range(12)}
+    alerts = ExpressionAlerts('binance')
+    expressions = ['RSI14 < 45 or close > MA25 * 1.02', 'not (MACD > Signal) and -close < -50']
+    ids = [alerts.add(text, list(frames)) for text in expressions]
+
+    matches = {(alert_id, symbol) for alert_id, symbol, _ in alerts.evaluate(frames)}
+
+    pipeline = IndicatorPipeline()
+    expected = set()
+    for symbol, df in frames.items():
+        last = pipeline.compute(df, ['RSI14', 'MA25', 'MACD', 'Signal']).iloc[-1]
+        close = df['close'].iloc[-1]
+        if last['RSI14'] < 45 or close > last['MA25'] * 1.02:
+            expected.add((ids[0], symbol))
+        if not last['MACD'] > last['Signal'] and -close < -50:
+            expected.add((ids[1], symbol))
+    assert matches == expected
+    assert 0 < len(matches) < 2 * len(frames)
+
+
+def test_short_history_symbol_does_not_fire():
+    frames = {'OLD/USDT': make_candles(150, seed=1, drift=-0.01), 'NEW/USDT': make_candles(20, seed=2),
+              'EMPTY/USDT': make_candles(0, seed=3)}
+    alerts = ExpressionAlerts('binance')
+    # Для короткой истории MA99 = NaN: not (close > MA99) было бы истинным
+    alert_id = alerts.add('not (close > MA99)', list(frames))
+
+    assert [(i, symbol) for i, symbol, _ in alerts.evaluate(frames)] == [(alert_id, 'OLD/USDT')]
+
+
+class Collector:
+    def __init__(self, frames):
+        self.frames = frames
+
+    def get_historical_data(self, symbol, limit, timeframe='1h'):
+        return self.frames[symbol].tail(limit)
+
+
+def test_check_fires_once_per_candle():
+    frames = {'BTC/USDT': make_candles(120, seed=4)}
+    alerts = ExpressionAlerts('binance')
+    alerts._collector = Collector(frames)
+    alerts.add('close > 0', ['BTC/USDT'], message='есть цена')
+
+    [(_, symbol, message)] = alerts.check()
+    assert symbol == 'BTC/USDT' and 'есть цена' in message and 'close=' in message
+    assert alerts.check() == []
+
+    frames['BTC/USDT'] = make_candles(121, seed=4)
+    assert len(alerts.check()) == 1
@@ -0,0 +1,77 @@
+# tests/test_frame_cache.py
+import numpy as np
+import pandas as pd
+import pytest
+from data.frame_cache import FrameCache
+
+HOUR_MS = 3_600_000
+KEY = ('binance', 'BTC/USDT', '1h')
+
+
+def make_frame(count: int) -> pd.DataFrame:
+    index = pd.to_datetime(np.arange(count) * HOUR_MS, unit='ms')
+    return pd.DataFrame({'close': np.arange(count, dtype=float), 'volume': np.ones(count)}, index=index)
+
+
+def test_get_returns_tail_and_counts_hits():
+    cache = FrameCache(1 << 20)
+    cache.put(KEY, make_frame(10), HOUR_MS)
+
+    df = cache.get(KEY, limit=3)
+
+    assert list(df['close']) == [7.0, 8.0, 9.0]
+    assert cache.get(KEY, limit=11) is None   # Окно больше сохраненного
+    assert cache.get(('binance', 'ETH/USDT', '1h')) is None
+    stats = cache.get_stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 2, 1)
+
+
+def test_entry_expires_when_candle_closes(monkeypatch):
+    clock = [10 * HOUR_MS / 1000 + 60]
+    monkeypatch.setattr('data.frame_cache.time.time', lambda: clock[0])
+    cache = FrameCache(1 << 20)
+    cache.put(KEY, make_frame(10), HOUR_MS)
+
+    clock[0] = 11 * HOUR_MS / 1000 - 1
+    assert cache.get(KEY) is not None
+    clock[0] = 11 * HOUR_MS / 1000
+    assert cache.get(KEY) is None
+    assert cache.get_stats()['bytes_held'] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    one = make_frame(100)
+    size = one.to_numpy().nbytes + one.index.nbytes
+    cache = FrameCache(2 * size)
+    a, b, c = [('binance', symbol, '1h') for symbol in ('A/USDT', 'B/USDT', 'C/USDT')]
+    cache.put(a, one, HOUR_MS)
+    cache.put(b, one, HOUR_MS)
+    cache.get(a)              # a - недавно использованная
+    cache.put(c, one, HOUR_MS)
+
+    assert cache.get(b) is None
+    assert cache.get(a) is not None and cache.get(c) is not None
+    assert cache.get_stats()['evictions'] == 1
+    assert cache.bytes_held <= cache.max_bytes
+
+
+def test_shared_values_are_read_only():
+    cache = FrameCache(1 << 20)
+    df = cache.put(KEY, make_frame(5), HOUR_MS)
+
+    df['sma'] = df['close'] * 2    # Новые колонки добавлять можно
+    with pytest.raises(ValueError):
+        cache.get(KEY).to_numpy()[0, 0] = -1.0
+
+    assert cache.get(KEY)['close'].iloc[0] == 0.0
+    assert 'sma' not in cache.get(KEY).columns
+
+
+def test_collector_serves_repeated_requests_from_memory(collector, fake_exchange):
+    first = collector.get_historical_data('BTC/USDT', limit=20, timeframe='1h')
+    calls = len(fake_exchange.calls)
+
+    again = collector.get_historical_data('BTC/USDT', limit=10, timeframe='1h')
+
+    assert len(fake_exchange.calls) == calls
+    assert again.index.equals(first.index[-10:])
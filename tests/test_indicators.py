@@ -0,0 +1,114 @@
+# tests/test_indicators.py
+import numpy as np
+import pandas as pd
+import pytest
+from data.candle_store import CandleView
+from data.indicators import DEFAULT_INDICATORS, IndicatorPipeline, _Graph, indicator_node
+
+
+def make_candles(count: int = 300, level: float = 60_000.0) -> pd.DataFrame:
+    rng = np.random.default_rng(3)
+    close = level * np.exp(np.cumsum(rng.normal(scale=0.01, size=count)))
+    index = pd.date_range('2024-01-01', periods=count, freq='h')
+    return pd.DataFrame({'open': close, 'high': close * 1.01, 'low': close * 0.99, 'close': close,
+                         'volume': rng.uniform(1, 100, size=count)}, index=index)
+
+
+def reference(df: pd.DataFrame) -> pd.DataFrame:
+    """Прежняя реализация add_technical_indicators на pandas"""
+    out = pd.DataFrame(index=df.index)
+    out['MA7'] = df['close'].rolling(7).mean()
+    out['MA25'] = df['close'].rolling(25).mean()
+    out['MA99'] = df['close'].rolling(99).mean()
+    delta = df['close'].diff()
+    gain = delta.where(delta > 0, 0).rolling(14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
+    out['RSI'] = 100 - 100 / (1 + gain / loss)
+    out['MACD'] = df['close'].ewm(span=12, adjust=False).mean() - df['close'].ewm(span=26, adjust=False).mean()
+    out['Signal'] = out['MACD'].ewm(span=9, adjust=False).mean()
+    out['MACD_histogram'] = out['MACD'] - out['Signal']
+    out['BB_middle'] = df['close'].rolling(20).mean()
+    std = df['close'].rolling(20).std()
+    out['BB_upper'] = out['BB_middle'] + std * 2
+    out['BB_lower'] = out['BB_middle'] - std * 2
+    out['Volume_MA'] = df['volume'].rolling(20).mean()
+    return out
+
+
+def test_default_set_matches_pandas_reference():
+    df = make_candles()
+
+    result = IndicatorPipeline().compute(df)
+
+    assert list(result.columns) == DEFAULT_INDICATORS
+    pd.testing.assert_frame_equal(result, reference(df), check_exact=False, rtol=1e-9, atol=1e-6)
+
+
+def test_parameters_in_names():
+    df = make_candles()
+
+    result = IndicatorPipeline().compute(df, ['MA50', 'EMA10', 'RSI7', 'BB_upper30_2.5', 'STD10'])
+
+    np.testing.assert_allclose(result['MA50'], df['close'].rolling(50).mean(), rtol=1e-10)
+    np.testing.assert_allclose(result['EMA10'], df['close'].ewm(span=10, adjust=False).mean(), rtol=1e-12)
+    upper = df['close'].rolling(30).mean() + 2.5 * df['close'].rolling(30).std()
+    np.testing.assert_allclose(result['BB_upper30_2.5'], upper, rtol=1e-10)
+    np.testing.assert_allclose(result['STD10'], df['close'].rolling(10).std(), rtol=1e-6)
+    delta = df['close'].diff()
+    rs = delta.where(delta > 0, 0).rolling(7).mean() / (-delta.where(delta < 0, 0)).rolling(7).mean()
+    np.testing.assert_allclose(result['RSI7'], 100 - 100 / (1 + rs), rtol=1e-8)
+
+
+def test_unknown_indicator_raises():
+    with pytest.raises(ValueError):
+        indicator_node('WMA10')
+
+
+def test_shared_nodes_are_computed_once(monkeypatch):
+    computed = []
+    original = _Graph._compute
+    monkeypatch.setattr(_Graph, '_compute', lambda self, key: computed.append(key) or original(self, key))
+    df = make_candles(100)
+    columns = list(df.columns)
+    pipeline = IndicatorPipeline()
+
+    pipeline.compute(df, ['MACD', 'Signal', 'MACD_histogram'])
+    assert len(computed) == len(set(computed))
+    assert computed.count(('ewm', ('col', 'close'), 12)) == 1
+
+    computed.clear()
+    pipeline.compute(df, ['MACD'])            # Те же данные - результат из памяти
+    assert computed == []
+    assert list(df.columns) == columns
+
+
+def test_rewritten_interior_candle_invalidates_memo():
+    df = make_candles(100)
+    pipeline = IndicatorPipeline()
+    before = pipeline.compute(df, ['MA7'])['MA7'].iloc[50]
+
+    changed = df.copy()
+    changed.iloc[48, changed.columns.get_loc('close')] += 1000
+    after = pipeline.compute(changed, ['MA7'])['MA7'].iloc[50]
+
+    assert after == pytest.approx(before + 1000 / 7)
+
+
+def test_candle_view_input():
+    df = make_candles(60)
+    columns = {'timestamp': df.index.as_unit('ms').asi8}
+    columns.update({name: df[name].to_numpy() for name in df.columns})
+
+    result = IndicatorPipeline().compute(CandleView(columns), ['MA7', 'RSI'])
+
+    np.testing.assert_allclose(result['MA7'], df['close'].rolling(7).mean(), rtol=1e-10)
+    assert len(result) == 60
+
+
+def test_collector_adds_requested_columns(collector):
+    df = make_candles(50)
+
+    result = collector.add_technical_indicators(df, ['MA7', 'Volume_MA'])
+
+    assert 'MA7' in result and 'Volume_MA' in result
+    assert 'MA7' not in df
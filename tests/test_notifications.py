@@ -0,0 +1,136 @@
+# tests/test_notifications.py
+import threading
+import time
+import pytest
+import config
+from utils.notifications import NotificationManager, _ChannelWorker
+
+
+@pytest.fixture
+def fast_retries(monkeypatch):
+    # Короткие окна и паузы, чтобы потоки каналов не тормозили тесты
+    monkeypatch.setitem(config.NOTIFICATIONS, 'digest_window', 0.2)
+    monkeypatch.setitem(config.NOTIFICATIONS, 'backoff', 0.01)
+    monkeypatch.setitem(config.NOTIFICATIONS, 'max_backoff', 0.02)
+    monkeypatch.setitem(config.NOTIFICATIONS, 'retries', 3)
+
+
+def wait_for(condition, timeout=5):
+    # close() прерывает повторы, поэтому сначала дожидаемся результата доставки
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+class Response:
+    def __init__(self, status_code, payload=None):
+        self.status_code = status_code
+        self._payload = payload or {}
+        self.text = str(payload)
+
+    def json(self):
+        return self._payload
+
+
+class Session:
+    """requests.Session, отвечающий заданными кодами по очереди"""
+
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+        self.posted = []
+
+    def post(self, url, data=None, timeout=None):
+        self.posted.append(data['text'])
+        status = self.statuses.pop(0) if self.statuses else 200
+        return Response(status, {'parameters': {'retry_after': 0.01}} if status == 429 else None)
+
+    def close(self):
+        pass
+
+
+def test_split_message_respects_limit_and_lines():
+    message = "aaaa\nbbbb\n\ncc\n" + "x" * 25
+    chunks = NotificationManager._split_message(message, 10)
+
+    assert all(len(chunk) <= 10 for chunk in chunks)
+    assert chunks[:2] == ["aaaa\nbbbb\n", "cc"]     # Пустая строка не теряется
+    assert "".join(chunks[2:]) == "x" * 25          # Длинная строка режется по символам
+    assert NotificationManager._split_message("short", 4096) == ["short"]
+
+
+def test_burst_is_sent_as_one_digest(fast_retries):
+    sent = []
+    worker = _ChannelWorker('test', lambda text, progress: sent.append(text), 10)
+    for i in range(3):
+        worker.put(f"alert {i}")
+    wait_for(lambda: worker.sent)
+    worker.close(5)
+
+    assert sent == ["🔔 3 уведомлений:\n• alert 0\n• alert 1\n• alert 2"]
+    assert worker.sent == 3 and worker.failed == 0
+
+
+def test_failures_are_retried_then_counted(fast_retries):
+    attempts = []
+
+    def flaky(text, progress):
+        attempts.append(text)
+        if len(attempts) < 3:
+            raise ConnectionError("down")
+
+    worker = _ChannelWorker('flaky', flaky, 10)
+    worker.put("one")
+    wait_for(lambda: worker.sent)
+    worker.close(5)
+    assert attempts == ["one"] * 3 and worker.sent == 1
+
+    def broken(text, progress):
+        raise ConnectionError("down")
+
+    worker = _ChannelWorker('broken', broken, 10)
+    worker.put("two")
+    wait_for(lambda: worker.failed)
+    worker.close(5)
+    assert worker.failed == 1 and worker.sent == 0
+
+
+def test_full_queue_drops_without_blocking(fast_retries):
+    release = threading.Event()
+    worker = _ChannelWorker('slow', lambda text, progress: release.wait(5), 1)
+    results = [worker.put(str(i)) for i in range(20)]
+    release.set()
+    worker.close(5)
+
+    assert not all(results)
+    assert worker.dropped == results.count(False)
+
+
+def test_telegram_retry_resumes_after_delivered_chunks(fast_retries, monkeypatch):
+    monkeypatch.setenv('TELEGRAM_BOT_TOKEN', 'token')
+    monkeypatch.setenv('TELEGRAM_CHAT_ID', 'chat')
+    manager = NotificationManager()
+    # Первая часть уходит, вторая получает 429, затем 502
+    session = manager._session = Session([200, 429, 502])
+    message = "\n".join(["a" * 3000, "b" * 3000, "c" * 3000])
+
+    manager.send_notification(message, method='telegram')
+    worker = manager._workers['telegram']
+    wait_for(lambda: worker.sent or worker.failed)
+    manager.close(5)
+
+    assert session.posted == ["a" * 3000] + ["b" * 3000] * 3 + ["c" * 3000]
+    assert worker.sent == 1 and worker.failed == 0
+
+
+def test_telegram_client_error_is_not_retried(fast_retries, monkeypatch):
+    monkeypatch.setenv('TELEGRAM_BOT_TOKEN', 'token')
+    monkeypatch.setenv('TELEGRAM_CHAT_ID', 'chat')
+    manager = NotificationManager()
+    manager._session = Session([400])
+
+    manager.send_notification("hello", method='telegram')
+    session, worker = manager._session, manager._workers['telegram']
+    wait_for(lambda: worker.sent)
+    manager.close(5)
+
+    assert session.posted == ["hello"]
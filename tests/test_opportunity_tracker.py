@@ -0,0 +1,73 @@
+# tests/test_opportunity_tracker.py
+from monitors.arbitrage_engine import ArbitrageEngine
+from monitors.opportunity_tracker import OpportunityTracker
+
+
+def event(kind: str, symbol: str = 'BTC/USDT', at: int = 0, spread: float = 1.0, opened_at: int = 0) -> dict:
+    return {'event': kind, 'symbol': symbol, 'buy_exchange': 'a', 'sell_exchange': 'b',
+            'spread_percent': spread, 'opened_at': opened_at, 'closed_at': at,
+            'buy_quote_age_ms': 30, 'sell_quote_age_ms': 120, 'quote_skew_ms': 90}
+
+
+def test_lifetime_and_peak_are_recorded():
+    tracker = OpportunityTracker(capacity=10)
+
+    tracker.on_event(event('open', opened_at=1_000, spread=0.6))
+    tracker.on_event(event('update', spread=1.7))
+    tracker.on_event(event('update', spread=0.9))
+    tracker.on_event(event('close', at=1_800))
+
+    df = tracker.to_frame()
+    assert len(df) == 1 and tracker.open == {}
+    row = df.iloc[0]
+    assert (row['symbol'], row['buy_exchange'], row['sell_exchange']) == ('BTC/USDT', 'a', 'b')
+    assert row['duration_ms'] == 800
+    assert abs(row['peak_spread'] - 1.7) < 1e-6 and abs(row['open_spread'] - 0.6) < 1e-6
+    assert tracker.histogram('duration_ms')['500-1000'] == 1
+    assert tracker.histogram('quote_age_ms')['100-250'] == 1
+    assert tracker.histogram('peak_spread', symbol='BTC/USDT')['1.5-2.0'] == 1
+
+
+def test_ring_buffer_keeps_latest_records():
+    tracker = OpportunityTracker(capacity=3)
+
+    for i in range(5):
+        tracker.on_event(event('open', opened_at=i * 100))
+        tracker.on_event(event('close', at=i * 100 + i))
+
+    records = tracker.records()
+    assert tracker.closed == 5
+    assert list(records['duration_ms']) == [2, 3, 4]
+    assert tracker.histogram('duration_ms').sum() == 5    # Гистограммы - по всем закрытым
+    assert tracker.summary()['median_duration_ms'] == 3
+
+
+def test_records_are_persisted(tmp_path):
+    path = str(tmp_path / 'opportunities.bin')
+    tracker = OpportunityTracker(capacity=10, path=path, flush_every=100)
+    tracker.on_event(event('open', symbol='ETH/USDT', opened_at=0))
+    tracker.on_event(event('close', symbol='ETH/USDT', at=500))
+    tracker.flush()
+
+    # Новый трекер продолжает коды имен сохраненного файла
+    again = OpportunityTracker(capacity=10, path=path, flush_every=1)
+    again.on_event(event('open', symbol='BTC/USDT', opened_at=0))
+    again.on_event(event('close', symbol='BTC/USDT', at=700))
+
+    df = OpportunityTracker.load(path)
+    assert list(df['symbol']) == ['ETH/USDT', 'BTC/USDT']
+    assert list(df['duration_ms']) == [500, 700]
+
+
+def test_engine_close_all_records_open_opportunities():
+    engine = ArbitrageEngine(min_spread=0.5, max_quote_skew_ms=1000)
+    tracker = OpportunityTracker(capacity=10)
+    engine.subscribe(tracker.on_event)
+    engine.on_quote('a', 'BTC/USDT', 100.0, 100.1, received_at=1_000)
+    engine.on_quote('b', 'BTC/USDT', 102.0, 102.1, received_at=1_100)
+
+    [closed] = engine.close_all(now=5_000)
+
+    assert closed['event'] == 'close' and engine.open == {}
+    assert tracker.open == {}
+    assert list(tracker.records()['duration_ms']) == [3_900]
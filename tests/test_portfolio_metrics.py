@@ -0,0 +1,90 @@
+# tests/test_portfolio_metrics.py
+import math
+import numpy as np
+import pytest
+from portfolio.metrics import RunningMetrics, SnapshotHistory, SECONDS_PER_YEAR
+from portfolio.tracker import PortfolioTracker
+
+
+def reference(values, timestamps):
+    """Метрики полным пересчетом по всей истории"""
+    values = np.asarray(values)
+    returns = np.diff(values) / values[:-1]
+    peaks = np.maximum.accumulate(values)
+    periods = SECONDS_PER_YEAR / ((timestamps[-1] - timestamps[0]) / len(returns))
+    downside = math.sqrt(np.sum(np.minimum(returns, 0) ** 2) / len(returns))
+    return {
+        'max_drawdown': ((peaks - values) / peaks * 100).max(),
+        'current_drawdown': (peaks[-1] - values[-1]) / peaks[-1] * 100,
+        'volatility': returns.std(ddof=1),
+        'sharpe': returns.mean() / returns.std(ddof=1) * math.sqrt(periods),
+        'sortino': returns.mean() / downside * math.sqrt(periods),
+    }
+
+
+def test_running_metrics_match_full_recomputation():
+    rng = np.random.default_rng(3)
+    values = 1000 * np.cumprod(1 + rng.normal(0.0005, 0.01, 500))
+    timestamps = 1_700_000_000 + np.arange(500) * 60.0
+    metrics = RunningMetrics()
+    for value, ts in zip(values, timestamps):
+        metrics.update(value, ts)
+
+    expected = reference(values, timestamps)
+    assert metrics.count == 500 and metrics.peak == values.max()
+    assert metrics.max_drawdown == pytest.approx(expected['max_drawdown'])
+    assert metrics.current_drawdown == pytest.approx(expected['current_drawdown'])
+    assert metrics.volatility == pytest.approx(expected['volatility'])
+    assert metrics.sharpe() == pytest.approx(expected['sharpe'])
+    assert metrics.sortino() == pytest.approx(expected['sortino'])
+
+
+def test_flat_or_single_snapshot_has_no_ratios():
+    metrics = RunningMetrics()
+    metrics.update(100.0, 0.0)
+    assert metrics.sharpe() is None and metrics.volatility == 0.0
+    metrics.update(100.0, 60.0)
+    metrics.update(100.0, 120.0)
+    assert metrics.sharpe() is None and metrics.sortino() is None
+    assert metrics.max_drawdown == 0.0
+
+
+def test_history_keeps_recent_detail_and_thins_old_snapshots():
+    history = SnapshotHistory(capacity=10, resolutions=[0, 60, 3600])
+    for i in range(200):
+        history.append({'timestamp': i * 30.0, 'total_value': float(i), 'profit_loss': 0.0,
+                        'profit_loss_percent': 0.0, 'trades_count': i})
+
+    records = history.records()
+    assert len(history) == 200
+    assert np.all(np.diff(records['timestamp']) > 0)
+    # Последние 10 снимков - подряд, раньше - по одному в минуту, еще раньше - раз в час
+    assert list(records['timestamp']) == [0, 3600, 5400, 5460, 5520, 5580, 5640] + [i * 30.0 for i in range(190, 200)]
+
+
+class Exchange:
+    """Реальная биржа: баланс и оценка, сбой - пустой баланс"""
+
+    def __init__(self, totals):
+        self.totals = list(totals)
+        self.valuation = self
+
+    def get_balance(self):
+        total = self.totals.pop(0)
+        return {'total': {'USDT': total}} if total is not None else None
+
+    def value(self, amounts):
+        return {'total_value': amounts['USDT'], 'details': dict(amounts), 'prices': {}, 'unpriced': []}
+
+
+def test_failed_valuation_is_not_recorded():
+    tracker = PortfolioTracker(Exchange([100.0, None, 90.0]))
+
+    assert tracker.snapshot()['total_value'] == 100.0
+    assert tracker.snapshot() is None
+    last = tracker.snapshot()
+
+    assert len(tracker.history) == 2 and tracker.metrics.count == 2
+    assert tracker.metrics.max_drawdown == pytest.approx(10.0)
+    assert last['profit_loss'] == pytest.approx(-10.0)
+    assert last['profit_loss_percent'] == pytest.approx(-10.0)
@@ -0,0 +1,114 @@
+# tests/test_price_alert.py
+import time
+import pytest
+from monitors.price_alert import PriceAlert
+
+
+class Venue:
+    """Биржа с тикерами пачкой; считает запросы"""
+
+    exchange_id = 'binance'
+
+    def __init__(self, prices):
+        self.prices = prices
+        self.requests = []
+
+    def get_tickers(self, symbols=None):
+        self.requests.append(sorted(symbols))
+        return {symbol: {'last': self.prices[symbol]} for symbol in symbols if symbol in self.prices}
+
+
+@pytest.fixture
+def venue():
+    return Venue({'BTC/USDT': 50_000.0, 'ETH/USDT': 2_500.0})
+
+
+@pytest.fixture
+def alerts(venue):
+    alerts = PriceAlert(venue)
+    alerts.sent = []
+    alerts.notifier.send_notification = alerts.sent.append
+    return alerts
+
+
+def test_one_request_per_check_for_all_symbols(alerts, venue):
+    for threshold in (60_000, 70_000, 80_000):
+        alerts.add_alert('BTC/USDT', 'above', threshold)
+    alerts.add_alert('ETH/USDT', 'below', 2_000)
+
+    alerts.check_alerts()
+
+    assert venue.requests == [['BTC/USDT', 'ETH/USDT']]
+    assert alerts.sent == []
+
+
+def test_crossed_thresholds_fire_once(alerts, venue):
+    alerts.add_alert('BTC/USDT', 'above', 55_000)
+    alerts.add_alert('BTC/USDT', 'above', 65_000)
+    alerts.add_alert('ETH/USDT', 'below', 2_400)
+
+    venue.prices.update({'BTC/USDT': 60_000.0, 'ETH/USDT': 2_300.0})
+    alerts.check_alerts()
+    alerts.check_alerts()
+
+    assert len(alerts.sent) == 2
+    assert any('BTC/USDT ПРЕВЫСИЛ 55000' in message for message in alerts.sent)
+    assert any('ETH/USDT ОПУСТИЛСЯ НИЖЕ 2400' in message for message in alerts.sent)
+
+
+def test_symbol_without_price_is_skipped(alerts, venue):
+    alerts.add_alert('SOL/USDT', 'above', 1)
+    alerts.add_alert('BTC/USDT', 'below', 60_000)
+
+    alerts.check_alerts()
+
+    assert len(alerts.sent) == 1
+
+
+def test_removed_alert_does_not_fire(alerts, venue):
+    first = alerts.add_alert('BTC/USDT', 'above', 55_000)
+    alerts.add_alert('BTC/USDT', 'above', 56_000)
+    alerts.remove_alert(first)
+
+    venue.prices['BTC/USDT'] = 60_000.0
+    alerts.check_alerts()
+
+    assert len(alerts.sent) == 1 and '56000' in alerts.sent[0]
+
+
+def test_change_percent_alerts_respect_direction(alerts, venue, monkeypatch):
+    clock = [1_000.0]
+    monkeypatch.setattr('monitors.price_alert.time.time', lambda: clock[0])
+    alerts.add_alert('BTC/USDT', 'change_percent', 5)
+    alerts.add_alert('BTC/USDT', 'change_percent', -5)
+
+    for price in (50_000.0, 46_000.0):
+        venue.prices['BTC/USDT'] = price
+        clock[0] += 60
+        alerts.check_alerts()
+    # Падение на 8% от максимума - срабатывает только отрицательный порог
+    assert len(alerts.sent) == 1 and '-8.00%' in alerts.sent[0]
+
+    venue.prices['BTC/USDT'] = 49_000.0
+    clock[0] += 60
+    alerts.check_alerts()
+    # Рост на 6.5% от минимума
+    assert len(alerts.sent) == 2 and '+6.52%' in alerts.sent[1]
+
+
+def test_monitoring_uses_per_alert_interval(alerts, venue):
+    alerts.add_alert('BTC/USDT', 'above', 55_000, interval=0.05)
+    alerts.add_alert('ETH/USDT', 'above', 3_000)
+    alerts.start_monitoring(interval_seconds=3600)
+    try:
+        time.sleep(0.1)
+        venue.prices['BTC/USDT'] = 60_000.0
+        deadline = time.time() + 2
+        while not alerts.sent and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        alerts.stop_monitoring()
+
+    assert len(alerts.sent) == 1 and 'BTC/USDT' in alerts.sent[0]
+    # ETH проверена при запуске, дальше - только через час
+    assert sum('ETH/USDT' in symbols for symbols in venue.requests) == 1
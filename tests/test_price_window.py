@@ -0,0 +1,42 @@
+# tests/test_price_window.py
+import random
+import pytest
+from monitors.price_window import PriceWindow
+
+
+def test_extremes_match_brute_force():
+    rng = random.Random(9)
+    window = PriceWindow(window_ms=10_000, capacity=50)
+    history = []
+    now = 0
+
+    for _ in range(2000):
+        now += rng.randint(0, 800)
+        price = rng.uniform(90, 110)
+        window.update(now, price)
+        history.append((now, price))
+
+        # Окно: не старше window_ms и не больше capacity последних записей
+        recent = [p for ts, p in history[-50:] if ts >= now - 10_000]
+        assert window.low == min(recent) and window.high == max(recent)
+        assert window.last == price
+
+
+def test_change_follows_threshold_sign():
+    window = PriceWindow(window_ms=60_000)
+    for ts, price in [(0, 100.0), (1_000, 90.0), (2_000, 120.0), (3_000, 108.0)]:
+        window.update(ts, price)
+
+    assert window.rise_percent() == pytest.approx(20.0)       # От минимума 90
+    assert window.fall_percent() == pytest.approx(-10.0)      # От максимума 120
+    assert window.change_percent(5) == pytest.approx(20.0)
+    assert window.change_percent(-5) == pytest.approx(-10.0)
+
+
+def test_old_prices_leave_window():
+    window = PriceWindow(window_ms=1_000)
+    window.update(0, 50.0)
+    window.update(2_000, 100.0)
+
+    assert window.low == 100.0 and window.rise_percent() == 0.0
+    assert PriceWindow().change_percent(1) is None
@@ -0,0 +1,86 @@
+# tests/test_profitability.py
+import numpy as np
+import pytest
+from types import SimpleNamespace
+from monitors.profitability import ProfitabilityEngine, book_side, walk_books
+
+
+def brute_force(asks, bids, buy_fee, sell_fee):
+    """Поштучное исполнение по единице объема (объемы уровней целые)"""
+    ask_units = [price for price, size in asks for _ in range(int(size))]
+    bid_units = [price for price, size in bids for _ in range(int(size))]
+    amount = cost = revenue = 0.0
+    for ask, bid in zip(ask_units, bid_units):
+        if bid * (1 - sell_fee) - ask * (1 + buy_fee) <= 0:
+            break
+        amount, cost, revenue = amount + 1, cost + ask, revenue + bid
+    return amount, cost, revenue
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_walk_books_matches_unit_simulation(seed):
+    rng = np.random.default_rng(seed)
+    asks = [[100 + i * 0.3 + rng.random() * 0.1, int(rng.integers(1, 5))] for i in range(8)]
+    bids = [[101.5 - i * 0.3 - rng.random() * 0.1, int(rng.integers(1, 5))] for i in range(8)]
+
+    walk = walk_books(*book_side(asks), *book_side(bids), 0.001, 0.002)
+    amount, cost, revenue = brute_force(asks, bids, 0.001, 0.002)
+
+    if amount == 0:
+        assert walk is None
+        return
+    assert walk['amount'] == amount
+    assert walk['cost'] == pytest.approx(cost)
+    assert walk['sell_avg'] == pytest.approx(revenue / amount)
+    assert walk['gross_profit'] == pytest.approx(revenue - cost - cost * 0.001 - revenue * 0.002)
+
+
+def test_walk_books_limited_by_thinner_book():
+    walk = walk_books(*book_side([[100, 10]]), *book_side([[110, 2], [109, 1]]), 0, 0)
+
+    assert walk['amount'] == 3
+    assert walk['gross_profit'] == pytest.approx(10 + 10 + 9)
+
+
+def test_no_profit_or_empty_book():
+    assert walk_books(*book_side([[100, 1]]), *book_side([[100.1, 1]]), 0.001, 0.001) is None
+    assert walk_books(*book_side([]), *book_side([[100, 1]]), 0, 0) is None
+
+
+def venue(taker=None, default_taker=None, withdraw_fee=None):
+    currencies = {'BTC': {'networks': {'btc': {'fee': withdraw_fee, 'withdraw': True},
+                                       'off': {'fee': 0.0, 'withdraw': False}}}}
+    exchange = SimpleNamespace(markets={'BTC/USDT': {'taker': taker}}, fees={'trading': {'taker': default_taker}},
+                               currencies=currencies)
+    return SimpleNamespace(exchange=exchange)
+
+
+def test_engine_subtracts_fees_and_transfer_cost():
+    engine = ProfitabilityEngine({'a': venue(taker=0.001, withdraw_fee=0.0005), 'b': venue(default_taker=0.002)})
+    buy_book = {'asks': [[100.0, 2.0]], 'bids': []}
+    sell_book = {'asks': [], 'bids': [[102.0, 1.0], [101.0, 5.0]]}
+
+    result = engine.evaluate('BTC/USDT', 'a', 'b', buy_book, sell_book)
+
+    assert engine.taker_fee('b', 'BTC/USDT') == 0.002
+    assert result['book_size'] == 2.0
+    gross = 203 - 200 - 200 * 0.001 - 203 * 0.002
+    assert result['gross_profit'] == pytest.approx(gross)
+    # Перевод - самая дешевая доступная сеть, по средней цене продажи
+    assert result['transfer_cost'] == pytest.approx(0.0005 * 101.5)
+    assert result['net_profit'] == pytest.approx(gross - 0.0005 * 101.5)
+    assert result['executable_size'] == 2.0
+
+
+def test_transfer_cost_can_cancel_trade_and_results_are_cached():
+    engine = ProfitabilityEngine({'a': venue(taker=0.0, withdraw_fee=0.1), 'b': venue(taker=0.0)})
+    calls = []
+    original = engine._evaluate
+    engine._evaluate = lambda *args: calls.append(args) or original(*args)
+    books = ({'asks': [[100.0, 1.0]], 'bids': []}, {'asks': [], 'bids': [[101.0, 1.0]]})
+
+    first = engine.evaluate('BTC/USDT', 'a', 'b', *books)
+    second = engine.evaluate('BTC/USDT', 'a', 'b', *books)
+
+    assert first['executable_size'] == 0.0 and first['book_size'] == 1.0
+    assert second is first and len(calls) == 1
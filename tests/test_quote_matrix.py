@@ -0,0 +1,82 @@
+# tests/test_quote_matrix.py
+import numpy as np
+import pytest
+from monitors.arbitrage import ArbitrageScanner
+from monitors.quote_matrix import QuoteMatrix
+
+
+def ticker(bid, ask, timestamp=1_000):
+    return {'bid': bid, 'ask': ask, 'last': bid, 'timestamp': timestamp}
+
+
+def test_best_matches_brute_force():
+    rng = np.random.default_rng(5)
+    symbols = [f'S{i}/USDT' for i in range(40)]
+    exchanges = ['a', 'b', 'c', 'd']
+    tickers = {exchange_id: {} for exchange_id in exchanges}
+    for symbol in symbols:
+        for exchange_id in exchanges:
+            if rng.random() < 0.8:
+                mid = rng.uniform(99, 101)
+                tickers[exchange_id][symbol] = ticker(mid - 0.05, mid + 0.05)
+
+    matrix = QuoteMatrix.from_tickers(symbols, tickers, {e: 1_000 for e in exchanges})
+    best = matrix.best()
+
+    for i, symbol in enumerate(symbols):
+        quoted = [e for e in exchanges if symbol in tickers[e]]
+        if not quoted:
+            assert best['buy'][i] == -1 and best['sell'][i] == -1
+            continue
+        buy = min(quoted, key=lambda e: tickers[e][symbol]['ask'])
+        sell = max(quoted, key=lambda e: tickers[e][symbol]['bid'])
+        assert exchanges[best['buy'][i]] == buy and exchanges[best['sell'][i]] == sell
+        ask, bid = tickers[buy][symbol]['ask'], tickers[sell][symbol]['bid']
+        assert best['spread'][i] == pytest.approx((bid - ask) / ask * 100)
+
+
+def test_skew_and_age():
+    tickers = {'a': {'X/USDT': ticker(100, 100.1, timestamp=4_000)},
+               'b': {'X/USDT': ticker(102, 102.1, timestamp=9_000), 'Y/USDT': ticker(0, None)}}
+
+    best = QuoteMatrix.from_tickers(['X/USDT', 'Y/USDT'], tickers, {'a': 5_000, 'b': 9_500}).best()
+
+    assert best['skew'][0] == 4_500
+    assert best['age'][0] == 1_000       # Старшая котировка по часам своей биржи
+    assert best['buy'][1] == -1 and best['sell'][1] == -1   # Нулевые цены - нет котировки
+
+
+@pytest.fixture
+def scanner(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return ArbitrageScanner(['binance', 'kraken'], min_spread=0.5, max_quote_skew_ms=1000)
+
+
+def test_scan_universe_uses_one_request_per_exchange(scanner):
+    markets = {'BTC/USDT': {'spot': True, 'quote': 'USDT'}, 'ETH/USDT': {'spot': True, 'quote': 'USDT'},
+               'SOL/USDT': {'spot': True, 'quote': 'USDT'}, 'ETH/BTC': {'spot': True, 'quote': 'BTC'}}
+    books = {
+        'binance': {'BTC/USDT': ticker(100, 100.1), 'ETH/USDT': ticker(10, 10.01), 'SOL/USDT': ticker(5, 5.01)},
+        'kraken': {'BTC/USDT': ticker(101, 101.1), 'ETH/USDT': ticker(10.3, 10.31)},
+    }
+    requests = []
+    for exchange in scanner.exchanges:
+        exchange.exchange.load_markets = lambda markets=markets: markets
+        exchange.get_tickers = lambda symbols=None, venue=exchange.exchange_id: requests.append(venue) or books[venue]
+
+    results = scanner.scan_universe(quote='USDT')
+
+    assert sorted(requests) == ['binance', 'kraken']
+    # SOL есть только на одной бирже; сначала самые большие спреды
+    assert list(results) == ['ETH/USDT', 'BTC/USDT']
+    assert results['BTC/USDT'][0]['buy_exchange'] == 'binance'
+    assert results['BTC/USDT'][0]['sell_exchange'] == 'kraken'
+
+
+def test_scan_universe_rejects_skewed_quotes(scanner):
+    tickers = {'binance': {'BTC/USDT': ticker(100, 100.1)}, 'kraken': {'BTC/USDT': ticker(101, 101.1)}}
+    scanner.fetch_quote_matrix = lambda symbols: QuoteMatrix.from_tickers(
+        symbols, tickers, {'binance': 1_000, 'kraken': 3_000})
+
+    assert scanner.scan_universe(['BTC/USDT']) == {}
+    assert scanner.stale_rejections == 1
@@ -0,0 +1,74 @@
+# tests/test_resampler.py
+import numpy as np
+import pandas as pd
+from data.candle_store import CandleView
+from data.resampler import can_resample, resample_ohlcv
+from conftest import HOUR_MS, FakeExchange
+
+MINUTE_MS = 60_000
+
+
+def make_minutes(start_ms: int, count: int) -> pd.DataFrame:
+    ts = start_ms + np.arange(count) * MINUTE_MS
+    close = np.arange(count, dtype=float) + 1
+    return pd.DataFrame({'open': close - 0.5, 'high': close + 1, 'low': close - 1, 'close': close,
+                         'volume': close, 'vwap': close, 'label': close},
+                        index=pd.DatetimeIndex(ts.astype('datetime64[ms]'), name='timestamp'))
+
+
+def test_can_resample_requires_day_aligned_multiple():
+    assert can_resample(MINUTE_MS, 5 * MINUTE_MS)
+    assert can_resample(MINUTE_MS, 24 * HOUR_MS)
+    assert not can_resample(MINUTE_MS, MINUTE_MS)
+    assert not can_resample(MINUTE_MS, 7 * MINUTE_MS)      # Не делит сутки
+    assert not can_resample(5 * MINUTE_MS, 3 * MINUTE_MS)
+
+
+def test_aggregates_each_column_by_its_rule():
+    # Начало с середины периода: первая 5m свеча неполная
+    bars = resample_ohlcv(make_minutes(3 * MINUTE_MS, 9), 5 * MINUTE_MS)
+
+    assert list(bars.index.as_unit('ms').asi8) == [0, 5 * MINUTE_MS, 10 * MINUTE_MS]
+    assert list(bars['open']) == [0.5, 2.5, 7.5]
+    assert list(bars['close']) == [2.0, 7.0, 9.0]
+    assert list(bars['high']) == [3.0, 8.0, 10.0]
+    assert list(bars['low']) == [0.0, 2.0, 7.0]
+    assert list(bars['volume']) == [3.0, 25.0, 17.0]
+    # vwap взвешен объемом: (3*3 + 4*4 + 5*5 + 6*6 + 7*7) / 25
+    assert np.isclose(bars['vwap'].iloc[1], 135 / 25)
+    assert 'label' not in bars.columns
+
+
+def test_candle_view_matches_dataframe():
+    df = make_minutes(0, 30).drop(columns=['label'])
+    columns = {'timestamp': df.index.as_unit('ms').asi8}
+    columns.update({name: df[name].to_numpy() for name in df.columns})
+
+    from_view = resample_ohlcv(CandleView(columns), 15 * MINUTE_MS)
+
+    pd.testing.assert_frame_equal(from_view, resample_ohlcv(df, 15 * MINUTE_MS))
+
+
+def test_empty_input():
+    bars = resample_ohlcv(make_minutes(0, 0), 5 * MINUTE_MS)
+
+    assert bars.empty and 'label' not in bars.columns
+
+
+def test_collector_derives_missing_timeframe_from_base(collector, fake_exchange):
+    bars = collector.get_historical_data('BTC/USDT', limit=5, timeframe='2h')
+
+    assert {tf for tf, _, _ in fake_exchange.calls} == {'1m'}
+    now = fake_exchange.now
+    assert int(bars.index.as_unit('ms').asi8[-1]) == now - now % (2 * HOUR_MS)
+    first = int(bars.index.as_unit('ms').asi8[0])
+    assert bars['open'].iloc[0] == FakeExchange.price(first)
+    assert bars['volume'].iloc[0] == 120 * 10.0
+    # Незакрытая свеча собрана из минут до текущей включительно
+    assert bars['close'].iloc[-1] == FakeExchange.price(now - now % MINUTE_MS) + 0.5
+
+
+def test_collector_fetches_native_timeframe_on_cold_store(collector, fake_exchange):
+    collector.get_historical_data('BTC/USDT', limit=100, timeframe='1h')
+
+    assert fake_exchange.calls == [('1h', None, 100)]
@@ -0,0 +1,94 @@
+# tests/test_tick_store.py
+import os
+import time
+import numpy as np
+import pytest
+from data.tick_store import INDEX_DTYPE, TickRecorder, TickStore, _decode_block, _encode_block, book_fields, ticker_fields
+
+
+def test_codec_is_lossless():
+    rng = np.random.default_rng(4)
+    ts = np.cumsum(rng.integers(0, 500, size=300)) + 1_700_000_000_000
+    values = np.column_stack([
+        60_000 + np.cumsum(rng.normal(size=300)),        # Цены
+        rng.uniform(0, 1e12, size=300),                 # Объемы любого диапазона
+        1e-9 * (1 + rng.random(300)),                   # Микро-цены
+        np.where(rng.random(300) < 0.1, np.nan, 1.0),   # Пропуски
+    ])
+
+    decoded = _decode_block(_encode_block(ts, values), len(ts), values.shape[1] + 1)
+
+    np.testing.assert_array_equal(decoded[:, 0], ts)
+    np.testing.assert_array_equal(decoded[:, 1:], values)   # Бит в бит, NaN на своих местах
+
+
+def test_repeating_ticks_compress_well():
+    ts = 1_700_000_000_000 + np.arange(1000) * 100
+    values = np.tile([[60_000.5, 60_001.0, 60_000.75, 1234.5]], (1000, 1))
+
+    block = _encode_block(ts, values)
+
+    assert len(block) < ts.nbytes * 5 / 20
+
+
+def test_scan_reads_only_requested_range(tmp_path):
+    store = TickStore(str(tmp_path))
+    fields = ticker_fields()
+    for block in range(3):
+        rows = [(block * 1000 + i * 100, block * 1000 + i * 100 - 5, 1.0 + i, 2.0 + i, 1.5, 10.0)
+                for i in range(10)]
+        store.append_block('binance', 'BTC/USDT', 'ticker', fields, rows)
+
+    df = store.scan('binance', 'BTC/USDT', 'ticker', start=1_200, end=1_500)
+
+    assert list(df.columns) == fields
+    assert list(df.index.as_unit('ms').asi8) == [1_200, 1_300, 1_400, 1_500]
+    assert list(df['bid']) == [3.0, 4.0, 5.0, 6.0]
+    assert len(store.scan('binance', 'BTC/USDT', 'ticker')) == 30
+    assert store.scan('binance', 'ETH/USDT', 'ticker') is None
+
+
+def test_append_rejects_wrong_width(tmp_path):
+    store = TickStore(str(tmp_path))
+
+    with pytest.raises(ValueError):
+        store.append_block('binance', 'BTC/USDT', 'ticker', ticker_fields(), [(1, 2, 3)])
+
+
+def test_recorder_writes_full_blocks_and_flushes_on_close(tmp_path):
+    store = TickStore(str(tmp_path))
+    recorder = TickRecorder(store, book_depth=2, block_size=3, max_block_age=3600)
+    for price in (1.0, 2.0, 3.0, 4.0):
+        recorder.record_ticker('binance', {'symbol': 'BTC/USDT', 'timestamp': 1, 'bid': price,
+                                           'ask': price + 1, 'last': None, 'volume': 5.0})
+    recorder.record_order_book('binance', 'BTC/USDT', {'timestamp': 2, 'bids': [[10.0, 1.0]],
+                                                        'asks': [[11.0, 2.0], [12.0, 3.0]]})
+
+    deadline = time.time() + 5
+    while recorder.recorded < 3 and time.time() < deadline:
+        time.sleep(0.05)
+    # Полный блок записан, неполные ждут - старше max_block_age они еще не стали
+    assert recorder.recorded == 3
+    recorder.close()
+
+    ticks = store.scan('binance', 'BTC/USDT', 'ticker')
+    assert list(ticks['bid']) == [1.0, 2.0, 3.0, 4.0]
+    assert np.isnan(ticks['last']).all()
+    book = store.scan('binance', 'BTC/USDT', 'book')
+    assert list(book.columns) == book_fields(2)
+    assert book['ask_px_1'].iloc[0] == 12.0 and np.isnan(book['bid_px_1'].iloc[0])
+    index = np.fromfile(os.path.join(store._dir('binance', 'BTC/USDT', 'ticker'), 'ticks.idx'), dtype=INDEX_DTYPE)
+    assert list(index['count']) == [3, 1]    # Полный блок и дописанный при закрытии
+
+
+def test_recorder_flushes_partial_block_by_age(tmp_path):
+    store = TickStore(str(tmp_path))
+    recorder = TickRecorder(store, block_size=1000, max_block_age=0.2)
+    recorder.record_ticker('binance', {'symbol': 'BTC/USDT', 'bid': 1.0, 'ask': 2.0})
+
+    deadline = time.time() + 5
+    while recorder.recorded == 0 and time.time() < deadline:
+        time.sleep(0.05)
+
+    assert recorder.recorded == 1
+    recorder.close()
@@ -0,0 +1,95 @@
+# tests/test_trade_aggregator.py
+import numpy as np
+import pytest
+from data.trade_aggregator import TradeAggregator, TRADE_CANDLE_COLUMNS
+
+SECOND_MS = 1000
+
+
+def test_trades_are_bucketed_into_candles():
+    aggregator = TradeAggregator(10 * SECOND_MS)
+
+    bars = aggregator.add_trades([1_000, 4_000, 9_000, 12_000], [10.0, 12.0, 11.0, 20.0],
+                                 [1.0, 1.0, 2.0, 0.5], side=[1, -1, 0, 1])
+
+    assert list(bars.columns) == TRADE_CANDLE_COLUMNS
+    assert list(bars.index.as_unit('ms').asi8) == [0, 10_000]
+    first = bars.iloc[0]
+    assert (first['open'], first['high'], first['low'], first['close']) == (10.0, 12.0, 10.0, 11.0)
+    assert (first['volume'], first['trades']) == (4.0, 3.0)
+    assert first['vwap'] == pytest.approx((10 + 12 + 22) / 4)
+    # Сделка с неизвестной стороной не входит ни в покупки, ни в продажи
+    assert (first['buy_volume'], first['sell_volume']) == (1.0, 1.0)
+
+
+def test_open_candle_continues_in_next_batch():
+    aggregator = TradeAggregator(10 * SECOND_MS)
+    aggregator.add_trades([1_000, 2_000], [10.0, 15.0], [1.0, 1.0])
+
+    bars = aggregator.add_trades([3_000, 11_000], [5.0, 7.0], [2.0, 1.0])
+
+    first = bars.iloc[0]
+    assert (first['open'], first['high'], first['low'], first['close']) == (10.0, 15.0, 5.0, 5.0)
+    assert (first['volume'], first['trades']) == (4.0, 3.0)
+    assert first['vwap'] == pytest.approx((10 + 15 + 10) / 4)
+
+
+def test_late_and_unsorted_trades():
+    aggregator = TradeAggregator(10 * SECOND_MS)
+    aggregator.add_trades([15_000], [1.0], [1.0])
+
+    bars = aggregator.add_trades([18_000, 2_000, 16_000], [3.0, 9.0, 2.0], [1.0, 1.0, 1.0])
+
+    assert aggregator.late_trades == 1
+    assert bars['close'].iloc[-1] == 3.0 and bars['low'].iloc[-1] == 1.0
+    assert aggregator.add_trades([], [], []).empty
+
+
+def test_ccxt_trades_map_sides():
+    trades = [{'timestamp': 1_000, 'price': 10.0, 'amount': 1.0, 'side': 'buy'},
+              {'timestamp': 2_000, 'price': 10.0, 'amount': 2.0, 'side': 'sell'},
+              {'timestamp': 3_000, 'price': 10.0, 'amount': 4.0, 'side': None}]
+
+    bars = TradeAggregator(10 * SECOND_MS).add_ccxt_trades(trades)
+
+    assert (bars['buy_volume'].iloc[0], bars['sell_volume'].iloc[0], bars['volume'].iloc[0]) == (1.0, 2.0, 7.0)
+
+
+class TradeFeed:
+    """fetch_trades по since, как у ccxt: сделки с timestamp >= since, не больше limit"""
+
+    def __init__(self, trades):
+        self.trades = trades
+        self.calls = []
+
+    def __call__(self, symbol, since=None, limit=None):
+        self.calls.append(since)
+        return [t for t in self.trades if t['timestamp'] >= since][:limit]
+
+
+def make_trade(i: int, timestamp: int, side: str = 'buy') -> dict:
+    return {'id': str(i), 'timestamp': timestamp, 'price': 100.0 + i, 'amount': 1.0, 'side': side}
+
+
+def test_ingest_trades_pages_without_duplicates(collector, fake_exchange):
+    start = fake_exchange.now - fake_exchange.now % 60_000
+    # Пять сделок в одной миллисекунде - больше страницы
+    trades = [make_trade(i, start + 500) for i in range(5)] + \
+             [make_trade(5, start + 900, 'sell'), make_trade(6, start + 70_000)]
+    fake_exchange.fetch_trades = TradeFeed(trades)
+    collector.page_limit = 3
+
+    candles = collector.ingest_trades('BTC/USDT', '1m')
+
+    assert list(candles.index.as_unit('ms').asi8) == [start, start + 60_000]
+    # Сделки той же миллисекунды за пределами страницы биржа по since не отдаст
+    assert candles['trades'].sum() == 5
+    assert candles['buy_volume'].iloc[0] == 3 and candles['sell_volume'].iloc[0] == 1
+    stored = collector.store.read('binance', 'BTC/USDT', '1m_trades')
+    assert len(stored) == 2
+
+    fake_exchange.fetch_trades.trades.append(make_trade(7, start + 80_000))
+    update = collector.ingest_trades('BTC/USDT', '1m')
+
+    assert list(update['trades']) == [2.0]
+    assert update['close'].iloc[-1] == 107.0
@@ -0,0 +1,99 @@
+# tests/test_triangular.py
+import itertools
+import math
+import random
+from types import SimpleNamespace
+import pytest
+from monitors.triangular import TriangularDetector
+
+MARKETS = {'BTC/USDT': ('BTC', 'USDT', 0.0), 'ETH/USDT': ('ETH', 'USDT', 0.0), 'ETH/BTC': ('ETH', 'BTC', 0.0)}
+
+
+def make_detector(markets=MARKETS, min_profit=0.0):
+    detector = TriangularDetector(SimpleNamespace(exchange_id='test'), min_profit=min_profit)
+    detector.markets = dict(markets)
+    return detector
+
+
+def book(bid, ask):
+    return {'bid': bid, 'ask': ask}
+
+
+def test_consistent_prices_have_no_cycle():
+    detector = make_detector()
+
+    found = detector.update({'BTC/USDT': book(50_000, 50_010), 'ETH/USDT': book(2_500, 2_501),
+                             'ETH/BTC': book(0.0499, 0.0501)})
+
+    assert found == [] and detector.cycles == {}
+
+
+def test_mispriced_cross_rate_is_found_and_closed():
+    detector = make_detector()
+    detector.update({'BTC/USDT': book(50_000, 50_010), 'ETH/USDT': book(2_500, 2_501),
+                     'ETH/BTC': book(0.0499, 0.0501)})
+
+    [cycle] = detector.update({'ETH/BTC': book(0.051, 0.0511)})
+
+    # USDT → ETH (ask) → BTC (bid ETH/BTC) → USDT (bid BTC/USDT)
+    assert detector._cycle_key(cycle['path']) == detector._cycle_key(['USDT', 'ETH', 'BTC', 'USDT'])
+    assert cycle['path'][0] == cycle['path'][-1]
+    expected = (1 / 2_501 * 0.051 * 50_000 - 1) * 100
+    assert cycle['profit_percent'] == pytest.approx(expected)
+    assert len(detector.cycles) == 1
+
+    # Перекос исчез - цикл снимается; повторный перекос снова обнаруживается
+    assert detector.update({'ETH/BTC': book(0.0499, 0.0501)}) == []
+    assert detector.cycles == {} and detector.suppressed == {}
+    assert len(detector.update({'ETH/BTC': book(0.0515, 0.0516)})) == 1
+
+
+def test_fees_can_remove_profit():
+    markets = {symbol: (base, quote, 0.01) for symbol, (base, quote, _) in MARKETS.items()}
+    detector = make_detector(markets)
+
+    found = detector.update({'BTC/USDT': book(50_000, 50_010), 'ETH/USDT': book(2_500, 2_501),
+                             'ETH/BTC': book(0.051, 0.0511)})
+
+    assert found == []
+
+
+def has_negative_cycle(detector) -> bool:
+    """Беллман-Форд с нуля по всем ребрам"""
+    nodes = list(detector.edges)
+    distance = {node: 0.0 for node in nodes}
+    for _ in range(len(nodes)):
+        changed = False
+        for u in nodes:
+            for v, (weight, _) in detector.edges[u].items():
+                if distance[u] + weight < distance[v] - 1e-9:
+                    distance[v] = distance[u] + weight
+                    changed = True
+        if not changed:
+            return False
+    return True
+
+
+def test_incremental_detection_agrees_with_full_search():
+    currencies = ['USDT', 'BTC', 'ETH', 'SOL', 'XRP']
+    fair = {'USDT': 1.0, 'BTC': 50_000.0, 'ETH': 2_500.0, 'SOL': 100.0, 'XRP': 0.5}
+    markets = {f'{b}/{q}': (b, q, 0.0005) for b, q in itertools.combinations(currencies, 2)}
+    detector = make_detector(markets)
+    rng = random.Random(6)
+    profitable = 0
+
+    for step in range(300):
+        symbols = rng.sample(sorted(markets), rng.randint(1, 3))
+        tickers = {}
+        for symbol in symbols:
+            base, quote, _ = markets[symbol]
+            mid = fair[base] / fair[quote] * math.exp(rng.gauss(0, 0.0006))
+            tickers[symbol] = book(mid * 0.9999, mid * 1.0001)
+        detector.update(tickers)
+
+        assert bool(detector.cycles) == has_negative_cycle(detector), step
+        for cycle in detector.cycles.values():
+            assert cycle['profit_percent'] > 0
+        profitable += bool(detector.cycles)
+
+    assert 0 < profitable < 300
@@ -0,0 +1,112 @@
+# tests/test_valuation.py
+import pytest
+from portfolio import valuation as valuation_module
+from portfolio.valuation import PortfolioValuation
+
+MARKETS = {
+    'BTC/USDT': {'base': 'BTC', 'quote': 'USDT'},
+    'ETH/USDT': {'base': 'ETH', 'quote': 'USDT'},
+    'ETH/BTC': {'base': 'ETH', 'quote': 'BTC'},
+    'XYZ/BTC': {'base': 'XYZ', 'quote': 'BTC'},
+    'XYZ/ETH': {'base': 'XYZ', 'quote': 'ETH'},
+    'USDT/TRY': {'base': 'USDT', 'quote': 'TRY'},
+    'ABC/DEF': {'base': 'ABC', 'quote': 'DEF'},
+    'OLD/USDT': {'base': 'OLD', 'quote': 'USDT', 'active': False},
+    'BTC/USDT:USDT': {'base': 'BTC', 'quote': 'USDT', 'spot': False},
+}
+
+TICKERS = {
+    'BTC/USDT': {'last': 50000.0},
+    'ETH/USDT': {'last': 3000.0},
+    'ETH/BTC': {'last': 0.06},
+    'XYZ/BTC': {'last': None, 'bid': 0.0001, 'ask': 0.0003},
+    'XYZ/ETH': {'last': 0.01},
+    'USDT/TRY': {'last': 40.0},
+}
+
+
+class Markets:
+    def __init__(self, markets):
+        self.markets = markets
+        self.loads = []
+
+    def load_markets(self, reload=False):
+        self.loads.append(reload)
+        return self.markets
+
+
+class Connector:
+    """ExchangeConnector: рынки ccxt и пакетный get_tickers"""
+
+    def __init__(self, markets=MARKETS, tickers=TICKERS):
+        self.exchange = Markets(markets)
+        self.tickers = tickers
+        self.requests = []
+
+    def get_tickers(self, symbols):
+        self.requests.append(list(symbols))
+        return {symbol: self.tickers[symbol] for symbol in symbols if symbol in self.tickers}
+
+
+def test_routes_prefer_bridges_and_skip_inactive_markets():
+    valuation = PortfolioValuation(Connector())
+
+    assert valuation.route('USDT') == []
+    assert valuation.route('BTC') == [('BTC/USDT', True)]
+    assert valuation.route('TRY') == [('USDT/TRY', False)]
+    # Две пары до USDT: через BTC (мост идет раньше ETH)
+    assert valuation.route('XYZ') == [('XYZ/BTC', True), ('BTC/USDT', True)]
+    assert valuation.route('ABC') is None
+    assert valuation.route('OLD') is None
+
+
+def test_value_uses_one_ticker_request_and_cross_rates():
+    connector = Connector()
+    valuation = PortfolioValuation(connector)
+
+    result = valuation.value({'USDT': 100.0, 'BTC': 0.5, 'XYZ': 1000.0, 'TRY': 400.0,
+                              'ABC': 5.0, 'ETH': 0.0})
+
+    assert len(connector.requests) == 1
+    assert sorted(connector.requests[0]) == ['BTC/USDT', 'USDT/TRY', 'XYZ/BTC']
+    assert result['prices']['XYZ'] == pytest.approx(0.0002 * 50000)     # Середина bid/ask
+    assert result['details'] == pytest.approx({'USDT': 100.0, 'BTC': 25000.0, 'XYZ': 10000.0, 'TRY': 10.0})
+    assert result['total_value'] == pytest.approx(35110.0)
+    assert result['unpriced'] == ['ABC']
+
+
+def test_missing_ticker_leaves_currency_unpriced():
+    tickers = dict(TICKERS)
+    del tickers['XYZ/BTC']
+    valuation = PortfolioValuation(Connector(tickers=tickers))
+
+    result = valuation.value({'BTC': 1.0, 'XYZ': 10.0})
+    assert result['details'] == {'BTC': 50000.0}
+    assert result['unpriced'] == ['XYZ']
+
+
+def test_failed_request_keeps_quote_currency():
+    connector = Connector()
+    connector.get_tickers = lambda symbols: 1 / 0
+    valuation = PortfolioValuation(connector)
+
+    result = valuation.value({'USDT': 50.0, 'BTC': 1.0})
+    assert result['total_value'] == 50.0
+    assert result['unpriced'] == ['BTC']
+
+
+def test_markets_reloaded_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(valuation_module.time, 'time', lambda: now[0])
+    connector = Connector()
+    valuation = PortfolioValuation(connector)
+
+    valuation.route('BTC')
+    now[0] += 10
+    valuation.route('ETH')
+    assert connector.exchange.loads == [False]
+
+    connector.exchange.markets = dict(MARKETS, **{'ABC/USDT': {'base': 'ABC', 'quote': 'USDT'}})
+    now[0] += valuation_module.VALUATION['markets_ttl']
+    assert valuation.route('ABC') == [('ABC/USDT', True)]
+    assert connector.exchange.loads == [False, True]
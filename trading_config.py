@@ -79,19 +79,19 @@ class TradingMode:
             balance = exchange.get_balance()
             if balance:
                 print(f"\n{Fore.CYAN}💰 ВАШ РЕАЛЬНЫЙ БАЛАНС:")
-                total = 0
+                valuation = exchange.valuation.value(balance['total'])
+                total = valuation['total_value']
                 for currency, amount in balance['total'].items():
                     if amount > 0:
-                        try:
-                            ticker = exchange.get_ticker(f"{currency}/USDT")
-                            if ticker:
-                                usd = amount * ticker['last']
-                                total += usd
-                                print(f"  {currency}: {amount:.8f} ≈ ${usd:.2f}")
-                        except:
-                            print(f"  {currency}: {amount}")
+                        if currency in valuation['details']:
+                            print(f"  {currency}: {amount:.8f} ≈ ${valuation['details'][currency]:.2f}")
+                        else:
+                            print(f"  {currency}: {amount} (нет цены)")
                 
                 print(f"{Fore.GREEN}  💵 ОБЩАЯ СТОИМОСТЬ: ~${total:.2f}")
+                if valuation['unpriced']:
+                    print(f"{Fore.YELLOW}  ⚠️ Не вошли в стоимость (нет пути к {exchange.valuation.quote}): "
+                          f"{', '.join(valuation['unpriced'])}")
                 
                 if total < 10:
                     print(f"{Fore.YELLOW}⚠️ На счету меньше $10. Увеличьте баланс для торговли.")
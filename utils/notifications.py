@@ -1,93 +1,282 @@
 # utils/notifications.py
 import smtplib
+import queue
+import threading
+import time
 import requests
 from typing import List, Dict
 from colorama import Fore, Style
 import os
+from config import NOTIFICATIONS
+
+
+class _ChannelWorker:
+    """
+    Фоновая отправка уведомлений одного канала
+    Сообщения копятся в ограниченной очереди; пачка, пришедшая за digest_window
+    секунд, уходит одним сводным сообщением. Ошибки отправки повторяются
+    с экспоненциальной задержкой
+    """
+
+    def __init__(self, name: str, send, queue_size: int):
+        self.name = name
+        self.send = send          # send(text, progress): исключение - повторить позже
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self.sent = 0
+        self.failed = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"notify-{name}", daemon=True)
+        self._thread.start()
+
+    def put(self, message: str) -> bool:
+        """Ставит сообщение в очередь, не блокируя; False - очередь переполнена"""
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _collect(self) -> List[str]:
+        """Первое сообщение и все, что пришло следом за окно сводки"""
+        try:
+            batch = [self.queue.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + NOTIFICATIONS['digest_window']
+        while len(batch) < NOTIFICATIONS['max_digest']:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._stop.is_set():
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    @staticmethod
+    def digest(batch: List[str]) -> str:
+        if len(batch) == 1:
+            return batch[0]
+        return f"🔔 {len(batch)} уведомлений:\n" + "\n".join(f"• {message}" for message in batch)
+
+    def _run(self):
+        while not (self._stop.is_set() and self.queue.empty()):
+            batch = self._collect()
+            if batch:
+                self._deliver(self.digest(batch), len(batch))
+
+    def _deliver(self, text: str, count: int):
+        delay = NOTIFICATIONS['backoff']
+        # Состояние этой доставки между попытками (например, сколько частей уже ушло)
+        progress = {}
+        for attempt in range(NOTIFICATIONS['retries'] + 1):
+            try:
+                self.send(text, progress)
+                self.sent += count
+                return
+            except Exception as e:
+                if attempt == NOTIFICATIONS['retries'] or self._stop.is_set():
+                    self.failed += count
+                    print(f"{Fore.RED}❌ Ошибка отправки ({self.name}): {e}")
+                    return
+                # Сервер может сам указать паузу (Telegram: retry_after)
+                wait = getattr(e, 'retry_after', None) or delay
+                self._stop.wait(min(wait, NOTIFICATIONS['max_backoff']))
+                delay = min(delay * 2, NOTIFICATIONS['max_backoff'])
+
+    def close(self, timeout: float = None):
+        """Отправляет оставшееся в очереди и останавливает поток"""
+        self._stop.set()
+        self._thread.join(timeout)
+
+
+class _RetryAfter(Exception):
+    def __init__(self, message: str, retry_after: float = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
 
 class NotificationManager:
-    """Управление уведомлениями"""
+    """
+    Управление уведомлениями
+    Консоль выводится сразу, email и Telegram отправляются фоновыми потоками
+    каналов: вызов send_notification никогда не ждет сети
+    """
     
     def __init__(self):
         self.notification_history = []
-        
-    def send_notification(self, message: str, method: str = 'console'):
+        self._workers = {}        # канал -> _ChannelWorker (создается при первом сообщении)
+        self._workers_lock = threading.Lock()
+        self._smtp = None         # Постоянное SMTP-соединение
+        self._session = None      # requests.Session для Telegram
+    
+    def send_notification(self, message: str, method: str = None):
         """
         Отправляет уведомление выбранным методом
-        method: 'console', 'email', 'telegram'
+        method: 'console', 'email', 'telegram' (по умолчанию - каналы из NOTIFICATIONS)
         """
-        if method == 'console':
-            self._console_notification(message)
-        elif method == 'email':
-            self._email_notification(message)
-        elif method == 'telegram':
-            self._telegram_notification(message)
-        
-        # Сохраняем в историю
-        self.notification_history.append({
-            'message': message,
-            'method': method,
-            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
-        })
+        methods = [method] if method else NOTIFICATIONS['channels']
+        for method in methods:
+            if method == 'console':
+                self._console_notification(message)
+            elif method == 'email':
+                self._enqueue('email', self._email_notification, message)
+            elif method == 'telegram':
+                self._enqueue('telegram', self._telegram_notification, message)
+            
+            # Сохраняем в историю
+            self.notification_history.append({
+                'message': message,
+                'method': method,
+                'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
+            })
+    
+    def _enqueue(self, channel: str, send, message: str):
+        worker = self._workers.get(channel)
+        if worker is None:
+            with self._workers_lock:
+                worker = self._workers.get(channel)
+                if worker is None:
+                    worker = self._workers[channel] = _ChannelWorker(channel, send, NOTIFICATIONS['queue_size'])
+        if not worker.put(message):
+            print(f"{Fore.YELLOW}⚠️ Очередь {channel} переполнена, уведомление пропущено")
     
     def _console_notification(self, message: str):
         """Вывод в консоль"""
         print(f"\n{Fore.MAGENTA}🔔 УВЕДОМЛЕНИЕ: {message}{Style.RESET_ALL}")
     
-    def _email_notification(self, message: str):
-        """Отправка email (требуется настройка)"""
-        # Пример для Gmail
-        try:
-            sender = os.getenv('EMAIL_SENDER', '')
-            password = os.getenv('EMAIL_PASSWORD', '')
-            recipient = os.getenv('EMAIL_RECIPIENT', '')
-            
-            if not all([sender, password, recipient]):
-                print(f"{Fore.YELLOW}⚠️ Email не настроен. Укажите EMAIL_SENDER, EMAIL_PASSWORD, EMAIL_RECIPIENT в .env")
-                return
-            
-            server = smtplib.SMTP('smtp.gmail.com', 587)
-            server.starttls()
-            server.login(sender, password)
-            
-            subject = "Крипто-уведомление"
-            body = f"Subject: {subject}\n\n{message}"
-            
-            server.sendmail(sender, recipient, body)
-            server.quit()
-            
-            print(f"{Fore.GREEN}✅ Email отправлен")
-            
-        except Exception as e:
-            print(f"{Fore.RED}❌ Ошибка отправки email: {e}")
+    def _smtp_connection(self, sender: str, password: str) -> smtplib.SMTP:
+        """SMTP-соединение открывается и авторизуется один раз; переоткрывается после разрыва"""
+        if self._smtp is not None:
+            try:
+                if self._smtp.noop()[0] == 250:
+                    return self._smtp
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._close_smtp()
+        
+        server = smtplib.SMTP(NOTIFICATIONS['smtp_host'], NOTIFICATIONS['smtp_port'], timeout=30)
+        server.starttls()
+        server.login(sender, password)
+        self._smtp = server
+        return server
+    
+    def _close_smtp(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except Exception:
+                pass
+            self._smtp = None
     
-    def _telegram_notification(self, message: str):
-        """Отправка Telegram сообщения"""
+    def _email_notification(self, message: str, progress: Dict = None):
+        """Отправка email (требуется настройка); вызывается потоком канала"""
+        sender = os.getenv('EMAIL_SENDER', '')
+        password = os.getenv('EMAIL_PASSWORD', '')
+        recipient = os.getenv('EMAIL_RECIPIENT', '')
+        
+        if not all([sender, password, recipient]):
+            print(f"{Fore.YELLOW}⚠️ Email не настроен. Укажите EMAIL_SENDER, EMAIL_PASSWORD, EMAIL_RECIPIENT в .env")
+            return
+        
+        subject = "Крипто-уведомление"
+        body = f"Subject: {subject}\n\n{message}"
+        
         try:
-            bot_token = os.getenv('TELEGRAM_BOT_TOKEN', '')
-            chat_id = os.getenv('TELEGRAM_CHAT_ID', '')
-            
-            if not all([bot_token, chat_id]):
-                print(f"{Fore.YELLOW}⚠️ Telegram не настроен. Укажите TELEGRAM_BOT_TOKEN и TELEGRAM_CHAT_ID в .env")
-                return
-            
-            url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
+            self._smtp_connection(sender, password).sendmail(sender, recipient, body.encode('utf-8'))
+        except Exception:
+            # Следующая попытка откроет новое соединение
+            self._close_smtp()
+            raise
+        
+        print(f"{Fore.GREEN}✅ Email отправлен")
+    
+    def _telegram_notification(self, message: str, progress: Dict = None):
+        """
+        Отправка Telegram сообщения; вызывается потоком канала
+        progress: состояние доставки - повтор продолжает с первой неотправленной части
+        """
+        bot_token = os.getenv('TELEGRAM_BOT_TOKEN', '')
+        chat_id = os.getenv('TELEGRAM_CHAT_ID', '')
+        
+        if not all([bot_token, chat_id]):
+            print(f"{Fore.YELLOW}⚠️ Telegram не настроен. Укажите TELEGRAM_BOT_TOKEN и TELEGRAM_CHAT_ID в .env")
+            return
+        
+        if self._session is None:
+            self._session = requests.Session()
+        
+        url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
+        # Telegram принимает до 4096 символов: длинная сводка уходит частями.
+        # Повтор после сбоя не дублирует уже доставленные части
+        progress = {} if progress is None else progress
+        chunks = self._split_message(message, 4096)
+        for index in range(progress.get('sent', 0), len(chunks)):
             data = {
                 'chat_id': chat_id,
-                'text': message,
+                'text': chunks[index],
                 'parse_mode': 'HTML'
             }
             
-            response = requests.post(url, data=data)
+            response = self._session.post(url, data=data, timeout=10)
             
-            if response.status_code == 200:
-                print(f"{Fore.GREEN}✅ Telegram сообщение отправлено")
-            else:
+            if response.status_code == 429:
+                retry_after = response.json().get('parameters', {}).get('retry_after')
+                raise _RetryAfter("Telegram: слишком много запросов", retry_after)
+            if response.status_code >= 500:
+                raise _RetryAfter(f"Telegram: {response.status_code}")
+            if response.status_code != 200:
+                # Ошибка запроса (неверный токен, чат) повтором не исправится
                 print(f"{Fore.RED}❌ Ошибка отправки Telegram: {response.text}")
-                
-        except Exception as e:
-            print(f"{Fore.RED}❌ Ошибка отправки Telegram: {e}")
+                return
+            progress['sent'] = index + 1
+        
+        print(f"{Fore.GREEN}✅ Telegram сообщение отправлено")
+    
+    @staticmethod
+    def _split_message(message: str, limit: int) -> List[str]:
+        """
+        Делит сообщение на части не длиннее limit по границам строк, чтобы не
+        разрезать HTML-теги; по символам режется только строка длиннее limit
+        """
+        chunks, current = [], None
+        for line in message.split('\n'):
+            while len(line) > limit:
+                if current is not None:
+                    chunks.append(current)
+                    current = None
+                chunks.append(line[:limit])
+                line = line[limit:]
+            if current is None:
+                current = line
+            elif len(current) + 1 + len(line) <= limit:
+                current += '\n' + line
+            else:
+                if current:
+                    chunks.append(current)
+                current = line
+        if current:
+            chunks.append(current)
+        return chunks
+    
+    def stats(self) -> Dict[str, Dict]:
+        """Отправлено, не доставлено, пропущено и в очереди по каналам"""
+        return {channel: {'sent': worker.sent, 'failed': worker.failed, 'dropped': worker.dropped,
+                          'queued': worker.queue.qsize()}
+                for channel, worker in self._workers.items()}
+    
+    def close(self, timeout: float = 10):
+        """Дожидается отправки очередей и закрывает соединения"""
+        for worker in list(self._workers.values()):
+            worker.close(timeout)
+        self._workers.clear()
+        self._close_smtp()
+        if self._session is not None:
+            self._session.close()
+            self._session = None
     
     def get_history(self, limit: int = 10) -> List[Dict]:
         """Возвращает историю уведомлений"""
-        return self.notification_history[-limit:]
\ No newline at end of file
+        return self.notification_history[-limit:]